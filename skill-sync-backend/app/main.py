@@ -50,6 +50,21 @@ app.include_router(notifications.router, prefix="/api", tags=["Notifications"])
 app.include_router(candidate_emails.router, prefix="/api", tags=["Candidate Emails"])
 app.include_router(profile.router, prefix="/api", tags=["Profile"])
 
+@app.on_event("startup")
+def warm_up_rag_engine():
+    """Load the embedding model and vector store in the background so startup is not blocked"""
+    if os.getenv("RAG_WARMUP_ON_STARTUP", "true").lower() == "true":
+        from app.services.rag_engine import rag_engine
+        rag_engine.start_warm_up()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    """Stop the background rematch worker and snapshot the in-memory vector index"""
+    from app.services.rematch_queue import rematch_queue
+    rematch_queue.stop()
+    from app.services.rag_engine import rag_engine
+    rag_engine.save_vector_index()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
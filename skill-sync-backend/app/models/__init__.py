@@ -5,6 +5,9 @@ from app.models.internship import Internship
 from app.models.resume import Resume
 from app.models.application import Application, ApplicationStatus
 from app.models.student_internship_match import StudentInternshipMatch
+from app.models.match_job import MatchJob, MatchJobStatus
+from app.models.skill import Skill, ResumeSkill
+from app.models.candidate_contact_key import CandidateContactKey
 
 __all__ = [
     "User", 
@@ -13,5 +16,10 @@ __all__ = [
     "Resume", 
     "Application", 
     "ApplicationStatus",
-    "StudentInternshipMatch"
+    "StudentInternshipMatch",
+    "MatchJob",
+    "MatchJobStatus",
+    "Skill",
+    "ResumeSkill",
+    "CandidateContactKey"
 ]
@@ -2,7 +2,7 @@
 Application Model - Student applications to internships
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
@@ -39,6 +39,12 @@ class Application(Base):
     application_similarity_score = Column(Integer, nullable=True)  # NEW: Score with tailored resume
     used_tailored_resume = Column(Integer, default=0)  # 1 if tailored resume used, 0 if not
     
+    # Materialized rank-candidates score (80% tailored + 20% base when tailored, else base)
+    ranking_score = Column(Float, nullable=True)  # NULL = not scored yet, or cannot be scored (see ranking_computed_at)
+    ranking_base_score = Column(Float, nullable=True)  # base_similarity_score it was computed from (staleness check)
+    ranking_components = Column(JSON, nullable=True)  # Component scores + tailored score for display
+    ranking_computed_at = Column(DateTime(timezone=True), nullable=True)  # Set with a NULL score = no base match or tailored embedding
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -47,5 +53,9 @@ class Application(Base):
     internship = relationship("Internship", back_populates="applications")
     resume = relationship("Resume", backref="applications", foreign_keys=[resume_id])
 
+    __table_args__ = (
+        Index('idx_application_internship_ranking', 'internship_id', 'ranking_score'),
+    )
+
     def __repr__(self):
         return f"<Application Student#{self.student_id} -> Internship#{self.internship_id} ({self.status})>"
@@ -0,0 +1,30 @@
+"""
+Candidate Contact Key Model - Normalized contact details for duplicate flagging
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.database.connection import Base
+
+
+class CandidateContactKey(Base):
+    """
+    One normalized contact value of a student (phone digits, LinkedIn or GitHub URL).
+
+    Maintained by CandidateFlaggingService.sync_contact_keys on profile updates.
+    Two students sharing a (key_type, key_value) pair are flagged as possible
+    duplicates, so flag lookups are index probes instead of a platform-wide scan.
+    """
+    __tablename__ = "candidate_contact_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key_type = Column(String(20), nullable=False)  # same_mobile, same_linkedin, same_github
+    key_value = Column(String(500), nullable=False)  # Normalized phone digits / URL
+
+    __table_args__ = (
+        Index('idx_contact_key_lookup', 'key_type', 'key_value', 'student_id'),
+        Index('idx_contact_key_student', 'student_id', 'key_type', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<CandidateContactKey Student#{self.student_id} {self.key_type}={self.key_value}>"
@@ -0,0 +1,77 @@
+"""
+Match Job Model - Progress records for batch similarity computation runs
+Part of the Hybrid Matching Strategy for performance optimization
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy.sql import func
+from app.database.connection import Base
+import enum
+import uuid
+
+
+class MatchJobStatus(str, enum.Enum):
+    """Match job status enumeration"""
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class MatchJob(Base):
+    """
+    One batch matching run (POST /api/filter/compute-matches).
+    
+    Updated by BatchMatchingService as student chunks finish so clients can
+    poll progress of long (possibly multi-process) runs.
+    """
+    __tablename__ = "match_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(36), unique=True, default=lambda: str(uuid.uuid4()), index=True)
+    status = Column(String(20), default=MatchJobStatus.queued.value, nullable=False)
+    
+    # Run parameters: force_recompute, student_ids, internship_ids, workers
+    parameters = Column(JSON, nullable=True)
+    workers = Column(Integer, default=1)
+    
+    # Progress
+    students_total = Column(Integer, default=0)
+    students_done = Column(Integer, default=0)
+    pairs_total = Column(Integer, default=0)
+    pairs_done = Column(Integer, default=0)
+    matches_computed = Column(Integer, default=0)
+    
+    result = Column(JSON, nullable=True)  # Final statistics from compute_all_matches
+    error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def to_dict(self) -> dict:
+        """Serialize for the polling endpoint"""
+        progress = (self.pairs_done / self.pairs_total * 100) if self.pairs_total else (
+            100.0 if self.status == MatchJobStatus.completed.value else 0.0
+        )
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "parameters": self.parameters,
+            "workers": self.workers,
+            "students_total": self.students_total,
+            "students_done": self.students_done,
+            "pairs_total": self.pairs_total,
+            "pairs_done": self.pairs_done,
+            "matches_computed": self.matches_computed,
+            "progress_percent": round(progress, 1),
+            "result": self.result,
+            "error": self.error,
+            "created_at": str(self.created_at) if self.created_at else None,
+            "started_at": str(self.started_at) if self.started_at else None,
+            "finished_at": str(self.finished_at) if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f"<MatchJob {self.job_id} ({self.status})>"
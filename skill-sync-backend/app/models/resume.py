@@ -2,12 +2,38 @@
 Resume Model - Student resume storage and metadata
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.database.connection import Base
+from app.models.skill import normalize_skill_names
 import uuid
 
+# Degree keywords -> level used by the candidate education filters
+EDUCATION_LEVELS = {'bachelor': 1, 'master': 2, 'phd': 3, 'doctorate': 3}
+
+
+def highest_education_level(parsed_data: dict) -> int:
+    """Highest education level (0 = unknown) found in the parsed education entries"""
+    education = list(parsed_data.get('education') or [])
+    # Older parses nested education under personal_info
+    education += (parsed_data.get('personal_info') or {}).get('education') or []
+    level = 0
+    for entry in education:
+        degree = (entry.get('degree') or '').lower() if isinstance(entry, dict) else str(entry).lower()
+        for name, value in EDUCATION_LEVELS.items():
+            if name in degree:
+                level = max(level, value)
+    return level
+
+
+def parse_experience_years(value) -> float:
+    """Numeric years of experience; free-text LLM values such as "2-3 years" become 0"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
 
 class Resume(Base):
     """Resume database model with intelligent parsing support"""
@@ -25,6 +51,10 @@ class Resume(Base):
     parsed_data = Column(JSON, nullable=True)  # Structured data from Gemini extraction
     extracted_skills = Column(JSON, nullable=True)  # List of skills extracted from resume
     
+    # Typed columns derived from parsed_data on every write (filterable/sortable in SQL)
+    experience_years = Column(Float, nullable=True, index=True)  # parsed_data.total_experience_years
+    education_level = Column(Integer, nullable=True, index=True)  # Highest degree: 0 unknown, 1 bachelor, 2 master, 3 PhD
+    
     # Vector embedding reference (stored in ChromaDB, not in PostgreSQL)
     # REMOVED: embedding column (redundant - ChromaDB is single source of truth)
     embedding_id = Column(String(255), nullable=True, index=True)  # Reference to ChromaDB embedding
@@ -44,6 +74,20 @@ class Resume(Base):
 
     # Relationships
     student = relationship("User", backref="resumes", foreign_keys=[student_id])
+    skills = relationship("Skill", secondary="resume_skills")  # Normalized parsed_data.all_skills
+
+    __table_args__ = (
+        Index('idx_resume_student_active', 'student_id', 'is_active', 'is_tailored'),
+    )
+
+    @validates('parsed_data')
+    def _derive_typed_columns(self, key, parsed_data):
+        """Keep the typed filter columns (and, at flush, resume_skills) in sync with parsed_data"""
+        data = parsed_data if isinstance(parsed_data, dict) else {}
+        self.experience_years = parse_experience_years(data.get('total_experience_years'))
+        self.education_level = highest_education_level(data)
+        self._pending_skill_names = normalize_skill_names(data.get('all_skills'))
+        return parsed_data
 
     def __repr__(self):
         return f"<Resume {self.file_name} for Student#{self.student_id}>"
@@ -0,0 +1,111 @@
+"""
+Skill Models - Normalized resume skills for indexed filtering
+
+Each distinct (lowercased) skill name is stored once in `skills`; `resume_skills`
+links resumes to their skills. Rows are kept in sync with Resume.parsed_data
+by the before_flush hook below, so skill filters are index lookups instead of
+scans over the parsed_data JSON. New names are inserted with ON CONFLICT DO
+NOTHING, so concurrent uploads introducing the same skill do not collide.
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database.connection import Base
+
+# Skill names per IN (...) lookup (stays under SQLite's bound-parameter limit)
+LOOKUP_BATCH_SIZE = 500
+
+
+class Skill(Base):
+    """Distinct skill name (lowercased)"""
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), unique=True, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<Skill {self.name}>"
+
+
+class ResumeSkill(Base):
+    """Resume <-> skill link"""
+    __tablename__ = "resume_skills"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+
+    # (resume_id, skill_id) is the primary key; this one serves "resumes having skill X"
+    __table_args__ = (
+        Index('idx_resume_skills_skill', 'skill_id', 'resume_id'),
+    )
+
+
+def normalize_skill_names(skills) -> list:
+    """Lowercased, stripped, de-duplicated skill names in their original order"""
+    names = []
+    for skill in skills or []:
+        name = str(skill).strip().lower()[:255]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _load_skills(session, names) -> dict:
+    """Existing Skill rows by name, in IN (...) batches"""
+    skills = {}
+    for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+        batch = names[start:start + LOOKUP_BATCH_SIZE]
+        skills.update((s.name, s) for s in session.query(Skill).filter(Skill.name.in_(batch)))
+    return skills
+
+
+def _insert_skill_names(connection, names) -> None:
+    """Insert skill names, skipping any that another transaction inserted first"""
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+            batch = names[start:start + LOOKUP_BATCH_SIZE]
+            connection.execute(
+                insert(Skill.__table__).values([{"name": name} for name in batch])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+        return
+
+    # Other backends: one SAVEPOINT per name, a unique violation means it already exists
+    for name in names:
+        try:
+            with connection.begin_nested():
+                connection.execute(Skill.__table__.insert().values(name=name))
+        except IntegrityError:
+            pass
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_resume_skills(session, flush_context, instances):
+    """Resolve skill names set by Resume._derive_typed_columns into resume_skills links"""
+    from app.models.resume import Resume
+
+    pending = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Resume) and obj.__dict__.get('_pending_skill_names') is not None
+    ]
+    if not pending:
+        return
+
+    names = sorted({name for resume in pending for name in resume._pending_skill_names})
+    with session.no_autoflush:
+        skills = _load_skills(session, names)
+        missing = [name for name in names if name not in skills]
+        if missing:
+            # Concurrent uploads may introduce the same skill: insert-or-ignore, then re-select
+            _insert_skill_names(session.connection(), missing)
+            skills.update(_load_skills(session, missing))
+
+        for resume in pending:
+            resume.skills = [skills[name] for name in resume._pending_skill_names]
+            resume._pending_skill_names = None
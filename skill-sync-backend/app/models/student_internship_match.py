@@ -3,7 +3,7 @@ Student-Internship Match Model - Pre-computed similarity scores
 Part of the Hybrid Matching Strategy for performance optimization
 """
 
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
@@ -38,6 +38,10 @@ class StudentInternshipMatch(Base):
     last_computed = Column(DateTime(timezone=True), server_default=func.now())
     resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True)  # Which resume was used
     
+    # Content hashes of the resume/internship at compute time (for incremental recompute)
+    resume_content_hash = Column(String(64), nullable=True)
+    internship_content_hash = Column(String(64), nullable=True)
+    
     # Relationships
     student = relationship("User", foreign_keys=[student_id])
     internship = relationship("Internship", foreign_keys=[internship_id])
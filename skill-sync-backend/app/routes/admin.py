@@ -265,11 +265,22 @@ def reindex_all_student_resumes(
             students = db.query(UserModel).filter(UserModel.role == UserRole.student).all()
             student_map = {student.email.split('@')[0].lower(): student for student in students}
             
+            # 1. Extract and parse every file; embeddings are generated in one batched pass below
+            parsed = []
             for resume_file in resume_files:
                 try:
                     file_name = os.path.basename(resume_file)
                     logger.info(f"📄 Processing: {file_name}")
                     
+                    # Find matching student by filename (e.g., "alex_resume.pdf" -> "alex")
+                    student_name = file_name.split('_')[0].lower().replace('-', '').replace('.', '')
+                    student = student_map.get(student_name)
+                    
+                    if not student:
+                        logger.warning(f"⚠️  No student found for resume: {file_name}")
+                        failed += 1
+                        continue
+                    
                     # Extract text
                     if resume_file.endswith('.pdf'):
                         text = parser.extract_text_from_pdf(resume_file)
@@ -281,25 +292,32 @@ def reindex_all_student_resumes(
                     
                     # Extract structured data using Gemini
                     structured_data = intelligence_service.extract_structured_data(text)
+                    parsed.append((resume_file, file_name, student, text, structured_data))
                     
-                    # Generate embedding
-                    embedding_text = f"{text}\n\nSkills: {', '.join(structured_data.get('all_skills', []))}"
-                    embedding = rag_engine.generate_embedding(embedding_text)
-                    
-                    # Find matching student by filename (e.g., "alex_resume.pdf" -> "alex")
-                    student_name = file_name.split('_')[0].lower().replace('-', '').replace('.', '')
-                    student = student_map.get(student_name)
-                    
-                    if not student:
-                        logger.warning(f"⚠️  No student found for resume: {file_name}")
-                        failed += 1
-                        continue
-                    
+                except Exception as e:
+                    logger.error(f"  Failed to process {file_name}: {str(e)}")
+                    failed += 1
+            
+            # 2. Generate all embeddings in batches and store them in ChromaDB in bulk
+            def embedding_texts(items):
+                return [
+                    rag_engine.resume_embedding_text(text, structured_data.get('all_skills', []))
+                    for _, _, _, text, structured_data in items
+                ]
+            
+            def index_resumes(items, embeddings):
+                """Create resumes for parsed files, store their embeddings and commit"""
+                batch = []
+                created = []
+                deactivated_ids = []
+                for (resume_file, file_name, student, text, structured_data), embedding in zip(items, embeddings):
                     # Deactivate old resumes
-                    db.query(Resume).filter(
+                    previous = db.query(Resume).filter(
                         Resume.student_id == student.id,
                         Resume.is_active == 1
-                    ).update({"is_active": 0})
+                    )
+                    deactivated_ids.extend(row.id for row in previous.with_entities(Resume.id))
+                    previous.update({"is_active": 0})
                     
                     # Create new resume entry
                     resume = Resume(
@@ -313,33 +331,47 @@ def reindex_all_student_resumes(
                     db.add(resume)
                     db.flush()  # Get the resume.id
                     
-                    # Store in ChromaDB
-                    embedding_id = rag_engine.store_resume_embedding(
-                        resume_id=str(resume.id),
-                        content=text,
-                        skills=structured_data.get('all_skills', []),
-                        metadata={
-                            'student_id': student.id,
-                            'file_name': file_name,
-                            'total_experience': structured_data.get('total_experience_years', 0)
-                        }
-                    )
-                    
-                    # Update resume with embedding_id
-                    resume.embedding_id = embedding_id
+                    batch.append({
+                        "resume_id": str(resume.id),
+                        "content": text,
+                        "skills": structured_data.get('all_skills', []),
+                        "embedding": embedding,
+                        "metadata": rag_engine.resume_metadata(resume)
+                    })
+                    created.append(resume)
                     
                     # Update student profile
                     student.skills = structured_data.get('all_skills', [])
                     student.total_experience_years = structured_data.get('total_experience_years', 0)
-                    
-                    db.commit()
-                    successful += 1
-                    logger.info(f"✅ Successfully processed: {file_name}")
+                
+                # Store in ChromaDB and update resumes with embedding_id
+                embedding_ids = rag_engine.store_resume_embeddings(batch)
+                for resume, embedding_id in zip(created, embedding_ids):
+                    resume.embedding_id = embedding_id
+                
+                db.commit()
+                
+                # Keep the vector store's is_active filter in sync with the deactivated resumes
+                rag_engine.update_resume_metadata({str(resume_id): {"is_active": 0} for resume_id in deactivated_ids})
+                return len(created)
+            
+            if parsed:
+                try:
+                    successful += index_resumes(parsed, rag_engine.document_embeddings(embedding_texts(parsed)))
+                    logger.info(f"✅ Successfully indexed {len(parsed)} resumes")
                     
                 except Exception as e:
-                    logger.error(f"  Failed to process {file_name}: {str(e)}")
+                    # Retry one by one so a single bad resume only fails itself
+                    logger.error(f"  Bulk indexing failed, retrying resumes individually: {str(e)}")
                     db.rollback()
-                    failed += 1
+                    for item in parsed:
+                        try:
+                            successful += index_resumes([item], rag_engine.document_embeddings(embedding_texts([item])))
+                            logger.info(f"✅ Successfully indexed: {item[1]}")
+                        except Exception as e:
+                            logger.error(f"  Failed to index {item[1]}: {str(e)}")
+                            db.rollback()
+                            failed += 1
             
             logger.info(f"🎉 Reindexing completed! Success: {successful}, Failed: {failed}")
             
@@ -379,9 +411,11 @@ def get_system_status(
     """
     Get system status including embedding statistics (Admin only)
     
-    Returns counts of resumes, internships, and matches
+    Returns counts of resumes, internships, and matches, plus embedding
+    cache hit/miss counters
     """
     from app.models import Resume, Internship, StudentInternshipMatch
+    from app.services.rag_engine import rag_engine
     
     # Verify user is admin
     if current_user.role != UserRole.admin:
@@ -417,7 +451,8 @@ def get_system_status(
             },
             'matches': {
                 'total': total_matches
-            }
+            },
+            'embedding_cache': rag_engine.embedding_cache.stats()
         }
         
     except Exception as e:
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr, Field
 from app.database.connection import get_db
 from app.services.auth_service import AuthService
+from app.services.candidate_flagging_service import CandidateFlaggingService
 from app.models.user import User, UserRole
 from app.utils.security import get_current_user
 
@@ -297,6 +298,8 @@ async def update_user(
             user.linkedin_url = request.linkedin_url
         if request.github_url is not None:
             user.github_url = request.github_url
+        # Keep the duplicate-contact flagging index in step with the profile
+        CandidateFlaggingService.sync_contact_keys(db, user)
         if request.hr_contact_name is not None:
             user.hr_contact_name = request.hr_contact_name
         if request.mailing_email is not None:
@@ -417,7 +420,11 @@ async def delete_user(
                     except Exception as e:
                         logger.warning(f"Failed to delete embedding {resume.embedding_id}: {e}")
             
-            # Delete resumes
+            # Delete resumes (and their skill links)
+            from app.models.skill import ResumeSkill
+            db.query(ResumeSkill).filter(
+                ResumeSkill.resume_id.in_([resume.id for resume in resumes])
+            ).delete(synchronize_session=False)
             deleted_data["resumes"] = db.query(Resume).filter(Resume.student_id == user_id).delete()
             
             # Delete matches
@@ -425,6 +432,10 @@ async def delete_user(
                 StudentInternshipMatch.student_id == user_id
             ).delete()
             
+            # Drop the student's duplicate-flagging contact keys
+            from app.models.candidate_contact_key import CandidateContactKey
+            db.query(CandidateContactKey).filter(CandidateContactKey.student_id == user_id).delete()
+            
             logger.info(f"Deleted {deleted_data['resumes']} resumes and {deleted_data['matches']} matches")
         
         elif user.role == UserRole.company:
@@ -3,17 +3,15 @@ Intelligent Filtering Routes - Core Intelligence System APIs
 Handles resume parsing, candidate ranking, and explainable matching
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 import uuid
-import io
-import csv
 from datetime import datetime
 
-from app.database.connection import get_db
+from app.database.connection import get_db, SessionLocal
 from app.models.user import User, UserRole
 from app.models.internship import Internship
 from app.models.resume import Resume
@@ -24,6 +22,8 @@ from app.services.rag_engine import RAGEngine
 from app.services.matching_engine import MatchingEngine
 from app.services.resume_service import ResumeService
 from app.services.candidate_flagging_service import CandidateFlaggingService
+from app.services.candidate_ranking_service import CandidateRankingService
+from app.services.candidate_export_service import CandidateExportService, EXPORT_BATCH_SIZE
 from app.utils.security import get_current_user, get_current_company
 
 router = APIRouter(prefix="/api/filter", tags=["intelligent-filtering"])
@@ -34,6 +34,10 @@ resume_parser = ResumeParser()
 intelligence_service = ResumeIntelligenceService()
 rag_engine = RAGEngine()
 matching_engine = MatchingEngine(rag_engine)
+candidate_ranking = CandidateRankingService(rag_engine, matching_engine)
+
+# Largest rank-candidates page (bigger limits are clamped to it)
+MAX_RANK_PAGE_SIZE = 500
 
 
 @router.post("/parse-resume")
@@ -106,7 +110,8 @@ async def parse_and_extract_resume(
 async def rank_candidates_for_internship(
     internship_id: str,
     include_explanations: bool = True,
-    limit: int = 50,
+    limit: int = Query(50, description="Page size (clamped to 1-500)"),
+    offset: int = Query(0, ge=0, description="Candidates to skip (pagination)"),
     only_applicants: bool = False,
     # Filter parameters
     min_match_score: Optional[float] = Query(None, ge=0, le=100, description="Minimum match score percentage"),
@@ -129,7 +134,9 @@ async def rank_candidates_for_internship(
     
     Query Parameters:
     - **only_applicants**: If True, only ranks students who have already applied (FAST)
-    - **limit**: Maximum number of candidates to return (default: 50)
+    - **limit**: Page size (default: 50); values outside 1-500 are clamped, and the
+      response carries the limit actually used
+    - **offset**: Candidates to skip; the response carries total_candidates and has_more
     - **include_explanations**: Include detailed scoring breakdown (default: True)
     
     Filter Parameters (Slider-based filtering):
@@ -141,6 +148,11 @@ async def rank_candidates_for_internship(
     - **education_level**: Minimum education level (Bachelor, Master, PhD)
     - **exclude_flagged**: Exclude flagged candidates
     
+    Filters, sorting and pagination run in SQL, so response time does not grow
+    with the applicant pool. Applicant scores are computed once per application
+    (and again only when its base match, applied resume or the internship
+    changes) and stored on the application.
+    
     Scoring Components:
     - Application Similarity (70%): Score calculated when student applied
     - Base Similarity (30%): Pre-computed discovery score
@@ -154,8 +166,6 @@ async def rank_candidates_for_internship(
         logger.info(f"🚩 exclude_flagged parameter: {exclude_flagged}")
         logger.info(f"🎯 Filter params: min_match={min_match_score}, max_match={max_match_score}, min_exp={min_experience}, max_exp={max_experience}")
         
-        from app.models.student_internship_match import StudentInternshipMatch
-        
         # Get internship - try both internship_id (UUID) and id (integer) for compatibility
         internship = db.query(Internship).filter(Internship.internship_id == internship_id).first()
         if not internship:
@@ -173,20 +183,32 @@ async def rank_candidates_for_internship(
         if internship.company_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to view this internship")
         
+        # Larger pages are clamped rather than rejected (limit used to be unbounded)
+        limit = min(max(limit, 1), MAX_RANK_PAGE_SIZE)
+        
+        # Filters, sort and pagination run in SQL; only the requested page is serialized
+        ranking_filters = {
+            'min_score': min_match_score,
+            'max_score': max_match_score,
+            'min_experience': min_experience,
+            'max_experience': max_experience,
+            'skills': CandidateRankingService.parse_skills(filter_skills),
+            'min_education': CandidateRankingService.education_rank(education_level),
+            'exclude_flagged': exclude_flagged
+        }
+        required_skills = internship.required_skills or []
+        preferred_skills = internship.preferred_skills or []
+        all_internship_skills = required_skills + preferred_skills
+        
         # HYBRID APPROACH: Use both base and tailored resumes for comprehensive ranking
         if only_applicants:
             # Option 1: Only rank actual applicants with DUAL RESUME ANALYSIS
             logger.info("📊 Using dual resume analysis (base + tailored) for comprehensive ranking...")
-            applications = db.query(Application, User, Resume).join(
-                User, Application.student_id == User.id
-            ).join(
-                Resume, Application.resume_id == Resume.id
-            ).filter(
-                Application.internship_id == internship.id,
-                User.is_active == 1  # Only show active students in rankings
-            ).all()
+            # Score new or stale applications once; ranking reads the stored scores
+            candidate_ranking.refresh_applicant_scores(db, internship)
+            page = candidate_ranking.rank_applicants(db, internship.id, offset=offset, limit=limit, **ranking_filters)
             
-            if not applications:
+            if not page['total_before_filter']:
                 return {
                     "success": True,
                     "message": "No applicants found for this internship",
@@ -195,122 +217,19 @@ async def rank_candidates_for_internship(
                     "performance_note": "Used dual resume analysis"
                 }
             
-            # Build ranked list from applications with DUAL RESUME SCORING
+            # Build the page from the materialized DUAL RESUME SCORES
             ranked_candidates = []
-            for app, student, tailored_resume in applications:
-                # Get base resume (non-tailored, active resume for this student)
-                base_resume = db.query(Resume).filter(
-                    Resume.student_id == student.id,
-                    Resume.is_active == 1,
-                    Resume.is_tailored == 0
-                ).first()
-                
-                # Get pre-computed match for base resume
-                base_match = db.query(StudentInternshipMatch).filter(
-                    StudentInternshipMatch.student_id == student.id,
-                    StudentInternshipMatch.internship_id == internship.id
-                ).first()
-                
-                # DUAL RESUME SCORING: Compute real-time scores for tailored resume if it exists
-                tailored_is_different = tailored_resume.is_tailored == 1
-                
-                if tailored_is_different and tailored_resume.embedding_id:
-                    # Recompute scores for tailored resume on-the-fly
-                    logger.info(f"🎯 Computing tailored resume scores for student {student.id}")
-                    
-                    # Prepare candidate and internship data
-                    tailored_data = {
-                        'all_skills': tailored_resume.parsed_data.get('all_skills', []) if tailored_resume.parsed_data else [],
-                        'total_experience_years': tailored_resume.parsed_data.get('total_experience_years', 0) if tailored_resume.parsed_data else 0,
-                        'education': tailored_resume.parsed_data.get('education', []) if tailored_resume.parsed_data else [],
-                        'certifications': tailored_resume.parsed_data.get('certifications', []) if tailored_resume.parsed_data else []
-                    }
-                    
-                    internship_data = {
-                        'required_skills': internship.required_skills or [],
-                        'preferred_skills': internship.preferred_skills or [],
-                        'min_experience': internship.min_experience or 0,
-                        'max_experience': internship.max_experience or 10,
-                        'required_education': internship.required_education or ''
-                    }
-                    
-                    # Get embeddings from ChromaDB
-                    # Note: get_resume_embedding expects ID without "resume_" prefix
-                    try:
-                        tailored_chroma_id = tailored_resume.embedding_id.replace('resume_', '') if tailored_resume.embedding_id else str(tailored_resume.id)
-                        retrieved_tailored_embedding = rag_engine.get_resume_embedding(tailored_chroma_id)
-                        tailored_embedding = retrieved_tailored_embedding if retrieved_tailored_embedding is not None else []
-                        logger.info(f"📊 Tailored resume embedding: {len(tailored_embedding)} dimensions")
-                    except Exception as e:
-                        logger.error(f"  Error retrieving tailored embedding: {e}")
-                        tailored_embedding = []
-                    
-                    try:
-                        retrieved_internship_embedding = rag_engine.get_internship_embedding(str(internship.id))
-                        internship_embedding = retrieved_internship_embedding if retrieved_internship_embedding is not None else []
-                        logger.info(f"📊 Internship embedding: {len(internship_embedding)} dimensions")
-                    except Exception as e:
-                        logger.error(f"  Error retrieving internship embedding: {e}")
-                        internship_embedding = []
-                    
-                    # Check if tailored embedding is missing - fall back to base resume
-                    # Use proper None check for numpy arrays
-                    if tailored_embedding is None or len(tailored_embedding) == 0:
-                        logger.warning(f"⚠️ Tailored resume {tailored_resume.id} has no embedding, falling back to base resume scoring")
-                        # Treat as if no tailored resume exists - will use base match only below
-                        tailored_is_different = False
-                    
-                    # Only calculate tailored match if embedding exists
-                    # Use proper None check for numpy arrays
-                    if tailored_is_different and (tailored_embedding is not None and len(tailored_embedding) > 0):
-                        # Calculate match for tailored resume
-                        tailored_match_result = matching_engine.calculate_match_score(
-                            candidate_data=tailored_data,
-                            internship_data=internship_data,
-                            candidate_embedding=tailored_embedding,
-                            internship_embedding=internship_embedding
-                        )
-                        
-                        # Weighted combination: 80% tailored + 20% base
-                        if base_match:
-                            final_score = (tailored_match_result['overall_score'] * 0.8) + (base_match.base_similarity_score * 0.2)
-                            semantic_similarity = (tailored_match_result.get('component_scores', {}).get('semantic_similarity') * 0.8) + (base_match.semantic_similarity * 0.2)
-                            skills_match = (tailored_match_result.get('component_scores', {}).get('skills_match') * 0.8) + (base_match.skills_match_score * 0.2)
-                            experience_match = (tailored_match_result.get('component_scores', {}).get('experience_match') * 0.8) + (base_match.experience_match_score * 0.2)
-                        else:
-                            # No base match, use tailored only
-                            logger.warning(f"⚠️ No base match found for student {student.id}, using tailored score only")
-                            final_score = tailored_match_result['overall_score']
-                            semantic_similarity = tailored_match_result.get('component_scores', {}).get('semantic_similarity')
-                            skills_match = tailored_match_result.get('component_scores', {}).get('skills_match')
-                            experience_match = tailored_match_result.get('component_scores', {}).get('experience_match')
-                    else:
-                        # No tailored embedding or same as base, use base match only
-                        if base_match:
-                            final_score = base_match.base_similarity_score
-                            semantic_similarity = base_match.semantic_similarity
-                            skills_match = base_match.skills_match_score
-                            experience_match = base_match.experience_match_score
-                        else:
-                            logger.error(f"  No base match for student {student.id} with missing tailored embedding")
-                            raise ValueError(f"No scoring data available for student {student.id}")
-                else:
-                    # No tailored resume or same as base, use base match only
-                    if base_match:
-                        final_score = base_match.base_similarity_score
-                        semantic_similarity = base_match.semantic_similarity
-                        skills_match = base_match.skills_match_score
-                        experience_match = base_match.experience_match_score
-                    else:
-                        logger.error(f"  No base match or tailored resume for student {student.id}")
-                        raise ValueError(f"No scoring data available for student {student.id}")
+            for app, student, tailored_resume, base_resume in page['rows']:
+                components = app.ranking_components or {}
+                tailored_is_different = bool(components.get('has_tailored'))
+                final_score = app.ranking_score
                 
                 # Build component_scores for frontend display (using computed/combined scores)
                 component_scores = {
-                    'semantic_similarity': round(semantic_similarity, 2),
-                    'skills_match': round(skills_match, 2),
-                    'experience_match': round(experience_match, 2),
-                    'overall_match': round(final_score, 2)
+                    'semantic_similarity': components.get('semantic_similarity'),
+                    'skills_match': components.get('skills_match'),
+                    'experience_match': components.get('experience_match'),
+                    'overall_match': final_score
                 }
                 
                 # COMBINE SKILLS from both base and tailored resumes
@@ -326,11 +245,6 @@ async def rank_candidates_for_internship(
                         all_candidate_skills.append(skill)
                         seen_skills.add(skill_lower)
                 
-                # Build match_details for frontend using COMBINED skills
-                required_skills = internship.required_skills or []
-                preferred_skills = internship.preferred_skills or []
-                all_internship_skills = required_skills + preferred_skills
-                
                 # Separate matching for required and preferred skills
                 matched_required_skills = [s for s in all_candidate_skills if s.lower() in [rs.lower() for rs in required_skills]]
                 missing_required_skills = [s for s in required_skills if s.lower() not in [cs.lower() for cs in all_candidate_skills]]
@@ -388,6 +302,7 @@ async def rank_candidates_for_internship(
                 if tailored_is_different:
                     explanation += "📝 Tailored resume shows strong interest and preparation for this specific role."
                 
+                has_base_match = app.ranking_base_score is not None
                 ranked_candidates.append({
                     'candidate_id': student.id,  # Frontend expects candidate_id
                     'candidate_name': student.full_name,  # Frontend expects candidate_name
@@ -399,8 +314,8 @@ async def rank_candidates_for_internship(
                     'personal_info': tailored_resume.parsed_data.get('personal_info', {}) if tailored_resume.parsed_data else {},
                     'skills': all_candidate_skills,  # COMBINED skills from both resumes
                     'total_experience_years': candidate_exp,
-                    'match_score': round(final_score, 2),  # Frontend expects match_score
-                    'overall_score': round(final_score, 2),  # Keep for backward compatibility
+                    'match_score': final_score,  # Frontend expects match_score
+                    'overall_score': final_score,  # Keep for backward compatibility
                     'component_scores': component_scores,  # Frontend expects this for breakdown display
                     'match_details': match_details,  # Frontend expects this for skills analysis
                     'explanation': explanation,  # Frontend expects this for AI analysis
@@ -408,167 +323,25 @@ async def rank_candidates_for_internship(
                     'application_status': app.status,
                     'applied_at': str(app.created_at),
                     'scoring_breakdown': {
-                        'tailored_score': round(tailored_match_result['overall_score'], 2) if tailored_is_different and 'tailored_match_result' in locals() else None,
-                        'base_similarity': base_match.base_similarity_score if base_match else None,
-                        'final_weight': '80% tailored + 20% base' if tailored_is_different and base_match else ('tailored only' if tailored_is_different else 'base only'),
+                        'tailored_score': components.get('tailored_score'),
+                        'base_similarity': app.ranking_base_score,
+                        'final_weight': '80% tailored + 20% base' if tailored_is_different and has_base_match else ('tailored only' if tailored_is_different else 'base only'),
                         'has_tailored': tailored_is_different
                     }
                 })
             
-            # Sort by score
-            ranked_candidates.sort(key=lambda x: x['overall_score'], reverse=True)
-            
-            # Apply filters before limiting results
-            filtered_candidates = ranked_candidates
-            
-            # Filter by match score
-            if min_match_score is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['match_score'] >= min_match_score]
-                logger.info(f"🔍 Filter: min_match_score >= {min_match_score} → {len(filtered_candidates)} candidates")
-            
-            if max_match_score is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['match_score'] <= max_match_score]
-                logger.info(f"🔍 Filter: max_match_score <= {max_match_score} → {len(filtered_candidates)} candidates")
-            
-            # Filter by experience
-            if min_experience is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['total_experience_years'] >= min_experience]
-                logger.info(f"🔍 Filter: min_experience >= {min_experience} years → {len(filtered_candidates)} candidates")
-            
-            if max_experience is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['total_experience_years'] <= max_experience]
-                logger.info(f"🔍 Filter: max_experience <= {max_experience} years → {len(filtered_candidates)} candidates")
-            
-            # Filter by required skills
-            if filter_skills:
-                filter_skills_list = [s.strip().lower() for s in filter_skills.split(',')]
-                filtered_candidates = [
-                    c for c in filtered_candidates 
-                    if all(any(req_skill in skill.lower() for skill in c['skills']) for req_skill in filter_skills_list)
-                ]
-                logger.info(f"🔍 Filter: required_skills = {filter_skills_list} → {len(filtered_candidates)} candidates")
-            
-            # Filter by education level
-            if education_level:
-                education_hierarchy = {'bachelor': 1, 'master': 2, 'phd': 3, 'doctorate': 3}
-                min_level = education_hierarchy.get(education_level.lower(), 0)
-                
-                def get_highest_education(candidate):
-                    """Extract highest education level from candidate data"""
-                    personal_info = candidate.get('personal_info', {})
-                    education = personal_info.get('education', [])
-                    if not education:
-                        return 0
-                    
-                    max_level = 0
-                    for edu in education:
-                        degree = edu.get('degree', '').lower()
-                        for level_name, level_value in education_hierarchy.items():
-                            if level_name in degree:
-                                max_level = max(max_level, level_value)
-                    return max_level
-                
-                filtered_candidates = [
-                    c for c in filtered_candidates 
-                    if get_highest_education(c) >= min_level
-                ]
-                logger.info(f"🔍 Filter: education_level >= {education_level} → {len(filtered_candidates)} candidates")
-            
-            # ✨ ADD FLAGGING INFORMATION FIRST (before exclude_flagged filter)
-            logger.info("🚩 Detecting flagged candidates...")
-            candidate_ids = [c['candidate_id'] for c in filtered_candidates]
-            logger.info(f"🔍 Checking flag info for {len(candidate_ids)} candidates: {candidate_ids[:5]}...")
-            flag_info = CandidateFlaggingService.get_flag_info_for_candidates(candidate_ids, db)
-            logger.info(f"🚩 Flag info returned for {len(flag_info)} candidates")
-            
-            # Add flag info to each candidate
-            for candidate in filtered_candidates:
-                candidate_id = candidate['candidate_id']
-                if candidate_id in flag_info:
-                    candidate['is_flagged'] = True
-                    candidate['flag_reasons'] = flag_info[candidate_id]['reasons']
-                    candidate['flagged_with'] = flag_info[candidate_id]['flagged_with']
-                    candidate['flag_reason_text'] = CandidateFlaggingService.format_flag_reason(
-                        flag_info[candidate_id]['reasons']
-                    )
-                    logger.info(f"✅ Candidate {candidate_id} is FLAGGED: {candidate['flag_reason_text']}")
-                else:
-                    candidate['is_flagged'] = False
-                    candidate['flag_reasons'] = []
-                    candidate['flagged_with'] = {}
-                    candidate['flag_reason_text'] = None
-            
-            total_flagged_count = sum(1 for c in filtered_candidates if c['is_flagged'])
-            logger.info(f"🚩 Found {total_flagged_count} flagged candidates out of {len(filtered_candidates)} total")
-            
-            # NOW filter out flagged candidates if requested (is_flagged property exists now)
-            if exclude_flagged:
-                pre_filter_count = len(filtered_candidates)
-                # Log which candidates are being filtered out
-                flagged_to_remove = [c for c in filtered_candidates if c.get('is_flagged', False)]
-                logger.info(f"🚫 About to filter out {len(flagged_to_remove)} flagged candidates: {[c['candidate_id'] for c in flagged_to_remove]}")
-                
-                filtered_candidates = [c for c in filtered_candidates if not c.get('is_flagged', False)]
-                logger.info(f"🔍 Filter: exclude_flagged=True → removed {pre_filter_count - len(filtered_candidates)} flagged candidates → {len(filtered_candidates)} remaining")
-                logger.info(f"🚫 Excluded candidates with is_flagged=True")
-            else:
-                logger.info(f"🔍 Filter: exclude_flagged=False → keeping all candidates including {total_flagged_count} flagged")
-            
-            # Now apply limit
-            filtered_candidates = filtered_candidates[:limit]
-            
             # Count how many have tailored resumes
-            tailored_count = sum(1 for c in filtered_candidates if c['scoring_breakdown']['has_tailored'])
-            
-            # Count flagged in final results
-            flagged_count = sum(1 for c in filtered_candidates if c['is_flagged'])
-            logger.info(f"🚩 Final results contain {flagged_count} flagged candidates out of {len(filtered_candidates)}")
-            
-            # Prepare filter summary
-            filters_applied = []
-            if min_match_score is not None:
-                filters_applied.append(f"match_score >= {min_match_score}%")
-            if max_match_score is not None:
-                filters_applied.append(f"match_score <= {max_match_score}%")
-            if min_experience is not None:
-                filters_applied.append(f"experience >= {min_experience} years")
-            if max_experience is not None:
-                filters_applied.append(f"experience <= {max_experience} years")
-            if filter_skills:
-                filters_applied.append(f"skills contain: {filter_skills}")
-            if education_level:
-                filters_applied.append(f"education >= {education_level}")
-            if exclude_flagged:
-                filters_applied.append("excluding flagged candidates")
-            
-            return {
-                "success": True,
-                "message": f"Ranked {len(filtered_candidates)} applicants using dual resume analysis",
-                "total_candidates": len(filtered_candidates),
-                "total_before_filter": len(ranked_candidates),
-                "filters_applied": filters_applied,
-                "ranked_candidates": filtered_candidates,
-                "anonymization_enabled": current_user.anonymization_enabled if hasattr(current_user, 'anonymization_enabled') else False,
-                "performance_note": f"✨ Dual resume analysis: {tailored_count} with tailored resumes, {len(filtered_candidates) - tailored_count} with base only",
-                "methodology": "Combines base resume (20%) + tailored resume (80%) when available",
-                "flagged_candidates_count": flagged_count
-            }
+            tailored_count = sum(1 for c in ranked_candidates if c['scoring_breakdown']['has_tailored'])
+            message = f"Ranked {len(ranked_candidates)} of {page['total']} applicants using dual resume analysis"
+            performance_note = f"✨ Dual resume analysis: {tailored_count} with tailored resumes, {len(ranked_candidates) - tailored_count} with base only"
+            methodology = "Combines base resume (20%) + tailored resume (80%) when available"
         
         else:
             # Option 2: Rank ALL potential candidates using pre-computed base similarity
             logger.info("📊 Using pre-computed matches for discovery ranking...")
-            base_matches = db.query(StudentInternshipMatch, User, Resume).join(
-                User, StudentInternshipMatch.student_id == User.id
-            ).join(
-                Resume, StudentInternshipMatch.resume_id == Resume.id
-            ).filter(
-                StudentInternshipMatch.internship_id == internship.id,
-                User.is_active == 1  # Only show active students in rankings
-            ).order_by(
-                StudentInternshipMatch.base_similarity_score.desc()
-            ).limit(limit).all()
+            page = candidate_ranking.rank_matches(db, internship.id, offset=offset, limit=limit, **ranking_filters)
             
-            if not base_matches:
+            if not page['total_before_filter']:
                 return {
                     "success": True,
                     "message": "No pre-computed matches found. Run batch computation first.",
@@ -578,7 +351,7 @@ async def rank_candidates_for_internship(
                 }
             
             ranked_candidates = []
-            for match, student, resume in base_matches:
+            for match, student, resume in page['rows']:
                 # Build component_scores for frontend display
                 # No fallback values - expose real issues if data is missing
                 component_scores = {
@@ -590,9 +363,6 @@ async def rank_candidates_for_internship(
                 
                 # Build match_details for frontend
                 candidate_skills = resume.parsed_data.get('all_skills', []) if resume.parsed_data else []
-                required_skills = internship.required_skills or []
-                preferred_skills = internship.preferred_skills or []
-                all_internship_skills = required_skills + preferred_skills
                 
                 # Separate matching for required and preferred skills
                 matched_required_skills = [s for s in candidate_skills if s.lower() in [rs.lower() for rs in required_skills]]
@@ -685,136 +455,71 @@ async def rank_candidates_for_internship(
                 else:
                     candidate['scoring_breakdown']['has_tailored'] = False
             
-            # Apply filters before limiting results
-            filtered_candidates = ranked_candidates
-            
-            # Filter by match score
-            if min_match_score is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['match_score'] >= min_match_score]
-                logger.info(f"🔍 Filter: min_match_score >= {min_match_score} → {len(filtered_candidates)} candidates")
-            
-            if max_match_score is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['match_score'] <= max_match_score]
-                logger.info(f"🔍 Filter: max_match_score <= {max_match_score} → {len(filtered_candidates)} candidates")
-            
-            # Filter by experience
-            if min_experience is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['total_experience_years'] >= min_experience]
-                logger.info(f"🔍 Filter: min_experience >= {min_experience} years → {len(filtered_candidates)} candidates")
-            
-            if max_experience is not None:
-                filtered_candidates = [c for c in filtered_candidates if c['total_experience_years'] <= max_experience]
-                logger.info(f"🔍 Filter: max_experience <= {max_experience} years → {len(filtered_candidates)} candidates")
-            
-            # Filter by required skills
-            if filter_skills:
-                filter_skills_list = [s.strip().lower() for s in filter_skills.split(',')]
-                filtered_candidates = [
-                    c for c in filtered_candidates 
-                    if all(any(req_skill in skill.lower() for skill in c['skills']) for req_skill in filter_skills_list)
-                ]
-                logger.info(f"🔍 Filter: required_skills = {filter_skills_list} → {len(filtered_candidates)} candidates")
-            
-            # Filter by education level
-            if education_level:
-                education_hierarchy = {'bachelor': 1, 'master': 2, 'phd': 3, 'doctorate': 3}
-                min_level = education_hierarchy.get(education_level.lower(), 0)
-                
-                def get_highest_education(candidate):
-                    """Extract highest education level from candidate data"""
-                    personal_info = candidate.get('personal_info', {})
-                    education = personal_info.get('education', [])
-                    if not education:
-                        return 0
-                    
-                    max_level = 0
-                    for edu in education:
-                        degree = edu.get('degree', '').lower()
-                        for level_name, level_value in education_hierarchy.items():
-                            if level_name in degree:
-                                max_level = max(max_level, level_value)
-                    return max_level
-                
-                filtered_candidates = [
-                    c for c in filtered_candidates 
-                    if get_highest_education(c) >= min_level
-                ]
-                logger.info(f"🔍 Filter: education_level >= {education_level} → {len(filtered_candidates)} candidates")
-            
-            # ✨ ADD FLAGGING INFORMATION FIRST (before exclude_flagged filter)
-            logger.info("🚩 Detecting flagged candidates...")
-            candidate_ids = [c['candidate_id'] for c in filtered_candidates]
-            flag_info = CandidateFlaggingService.get_flag_info_for_candidates(candidate_ids, db)
-            
-            # Add flag info to each candidate
-            for candidate in filtered_candidates:
-                candidate_id = candidate['candidate_id']
-                if candidate_id in flag_info:
-                    candidate['is_flagged'] = True
-                    candidate['flag_reasons'] = flag_info[candidate_id]['reasons']
-                    candidate['flagged_with'] = flag_info[candidate_id]['flagged_with']
-                    candidate['flag_reason_text'] = CandidateFlaggingService.format_flag_reason(
-                        flag_info[candidate_id]['reasons']
-                    )
-                else:
-                    candidate['is_flagged'] = False
-                    candidate['flag_reasons'] = []
-                    candidate['flagged_with'] = {}
-                    candidate['flag_reason_text'] = None
-            
-            total_flagged_count = sum(1 for c in filtered_candidates if c['is_flagged'])
-            logger.info(f"🚩 Found {total_flagged_count} flagged candidates out of {len(filtered_candidates)} total")
-            
-            # NOW filter out flagged candidates if requested (is_flagged property exists now)
-            if exclude_flagged:
-                pre_filter_count = len(filtered_candidates)
-                # Log which candidates are being filtered out
-                flagged_to_remove = [c for c in filtered_candidates if c.get('is_flagged', False)]
-                logger.info(f"🚫 About to filter out {len(flagged_to_remove)} flagged candidates: {[c['candidate_id'] for c in flagged_to_remove]}")
-                
-                filtered_candidates = [c for c in filtered_candidates if not c.get('is_flagged', False)]
-                logger.info(f"🔍 Filter: exclude_flagged=True → removed {pre_filter_count - len(filtered_candidates)} flagged candidates → {len(filtered_candidates)} remaining")
-                logger.info(f"🚫 Excluded candidates with is_flagged=True")
+            message = f"Ranked {len(ranked_candidates)} of {page['total']} candidates using pre-computed similarity (instant!)"
+            performance_note = "⚡ Pre-computed base similarity: <200ms response time"
+            methodology = "Base similarity from batch computation"
+        
+        logger.info(f"🔍 Filters matched {page['total']}/{page['total_before_filter']} candidates, returning {len(ranked_candidates)} from offset {offset}")
+        
+        # ✨ ADD FLAGGING INFORMATION for the page (flagged candidates were already excluded in SQL when requested)
+        if exclude_flagged:
+            flag_info = {}
+        else:
+            flag_info = CandidateFlaggingService.get_flag_info_for_candidates(
+                [c['candidate_id'] for c in ranked_candidates], db
+            )
+        
+        for candidate in ranked_candidates:
+            candidate_id = candidate['candidate_id']
+            if candidate_id in flag_info:
+                candidate['is_flagged'] = True
+                candidate['flag_reasons'] = flag_info[candidate_id]['reasons']
+                candidate['flagged_with'] = flag_info[candidate_id]['flagged_with']
+                candidate['flag_reason_text'] = CandidateFlaggingService.format_flag_reason(
+                    flag_info[candidate_id]['reasons']
+                )
             else:
-                logger.info(f"🔍 Filter: exclude_flagged=False → keeping all candidates including {total_flagged_count} flagged")
-            
-            # Now apply limit
-            filtered_candidates = filtered_candidates[:limit]
-            
-            # Count flagged in final results
-            flagged_count = sum(1 for c in filtered_candidates if c['is_flagged'])
-            logger.info(f"🚩 Final results contain {flagged_count} flagged candidates out of {len(filtered_candidates)}")
-            
-            # Prepare filter summary
-            filters_applied = []
-            if min_match_score is not None:
-                filters_applied.append(f"match_score >= {min_match_score}%")
-            if max_match_score is not None:
-                filters_applied.append(f"match_score <= {max_match_score}%")
-            if min_experience is not None:
-                filters_applied.append(f"experience >= {min_experience} years")
-            if max_experience is not None:
-                filters_applied.append(f"experience <= {max_experience} years")
-            if filter_skills:
-                filters_applied.append(f"skills contain: {filter_skills}")
-            if education_level:
-                filters_applied.append(f"education >= {education_level}")
-            if exclude_flagged:
-                filters_applied.append("excluding flagged candidates")
-            
-            return {
-                "success": True,
-                "message": f"Ranked {len(filtered_candidates)} candidates using pre-computed similarity (instant!)",
-                "total_candidates": len(filtered_candidates),
-                "total_before_filter": len(ranked_candidates),
-                "filters_applied": filters_applied,
-                "ranked_candidates": filtered_candidates,
-                "anonymization_enabled": current_user.anonymization_enabled if hasattr(current_user, 'anonymization_enabled') else False,
-                "performance_note": "⚡ Pre-computed base similarity: <200ms response time",
-                "methodology": "Base similarity from batch computation",
-                "flagged_candidates_count": flagged_count
-            }
+                candidate['is_flagged'] = False
+                candidate['flag_reasons'] = []
+                candidate['flagged_with'] = {}
+                candidate['flag_reason_text'] = None
+        
+        # Count flagged in final results
+        flagged_count = sum(1 for c in ranked_candidates if c['is_flagged'])
+        logger.info(f"🚩 Page contains {flagged_count} flagged candidates out of {len(ranked_candidates)}")
+        
+        # Prepare filter summary
+        filters_applied = []
+        if min_match_score is not None:
+            filters_applied.append(f"match_score >= {min_match_score}%")
+        if max_match_score is not None:
+            filters_applied.append(f"match_score <= {max_match_score}%")
+        if min_experience is not None:
+            filters_applied.append(f"experience >= {min_experience} years")
+        if max_experience is not None:
+            filters_applied.append(f"experience <= {max_experience} years")
+        if filter_skills:
+            filters_applied.append(f"skills contain: {filter_skills}")
+        if education_level:
+            filters_applied.append(f"education >= {education_level}")
+        if exclude_flagged:
+            filters_applied.append("excluding flagged candidates")
         
+        return {
+            "success": True,
+            "message": message,
+            "total_candidates": page['total'],
+            "total_before_filter": page['total_before_filter'],
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(ranked_candidates) < page['total'],
+            "filters_applied": filters_applied,
+            "ranked_candidates": ranked_candidates,
+            "anonymization_enabled": current_user.anonymization_enabled if hasattr(current_user, 'anonymization_enabled') else False,
+            "performance_note": performance_note,
+            "methodology": methodology,
+            "flagged_candidates_count": flagged_count
+        }
     except Exception as e:
         import traceback
         logger.error(f"  Error ranking candidates: {str(e)}")
@@ -1076,9 +781,12 @@ async def bulk_parse_resumes(
 
 @router.post("/compute-matches")
 async def compute_batch_similarity_matches(
+    background_tasks: BackgroundTasks,
     force_recompute: bool = False,
     student_id: Optional[int] = None,
     internship_id: Optional[int] = None,
+    workers: Optional[int] = None,
+    background: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1099,9 +807,13 @@ async def compute_batch_similarity_matches(
     - Run after individual resume/internship upload
     
     Query Parameters:
-    - **force_recompute**: Delete existing matches and recompute all (default: False)
+    - **force_recompute**: Delete existing matches and recompute all (default: False,
+      which recomputes only missing pairs and pairs whose resume/internship changed)
     - **student_id**: Compute matches only for specific student (optional)
     - **internship_id**: Compute matches only for specific internship (optional)
+    - **workers**: Scoring processes for large runs (default: BATCH_MATCH_WORKERS; admin
+      only, clamped to the number of CPUs)
+    - **background**: Return immediately with a job_id; poll GET /compute-matches/jobs/{job_id}
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -1110,24 +822,72 @@ async def compute_batch_similarity_matches(
         logger.info("🚀 Starting batch similarity computation...")
         
         # Import batch matching service
-        from app.services.batch_matching_service import BatchMatchingService
+        from app.services.batch_matching_service import BatchMatchingService, run_match_job
+        from app.services.match_job_service import MatchJobService, MatchJobTracker
+        from app.services.sharded_matching_engine import clamp_workers
+        
+        # Worker processes are a host resource: only admins may choose them
+        if workers is not None:
+            if current_user.role != UserRole.admin:
+                raise HTTPException(status_code=403, detail="Only admins can set the number of workers")
+            workers = clamp_workers(workers)
+        
+        student_ids = [student_id] if student_id else None
+        internship_ids = [internship_id] if internship_id and not student_id else None
+        job = MatchJobService.create_job(
+            db,
+            parameters={
+                "force_recompute": force_recompute,
+                "student_ids": student_ids,
+                "internship_ids": internship_ids
+            },
+            workers=workers or 1
+        )
+        
+        if background:
+            logger.info(f"Queued match job {job.job_id}")
+            background_tasks.add_task(
+                run_match_job,
+                job.job_id,
+                force_recompute=force_recompute,
+                student_ids=student_ids,
+                internship_ids=internship_ids,
+                workers=workers
+            )
+            return {
+                "success": True,
+                "message": "Batch similarity computation started",
+                "job_id": job.job_id,
+                "status": job.status,
+                "poll_url": f"/api/filter/compute-matches/jobs/{job.job_id}"
+            }
         
         batch_service = BatchMatchingService(db)
+        tracker = MatchJobTracker(job.job_id)
         
         # Compute matches based on parameters
         if student_id:
             logger.info(f"Computing matches for student {student_id}...")
-            result = batch_service.compute_matches_for_student(student_id)
         elif internship_id:
             logger.info(f"Computing matches for internship {internship_id}...")
-            result = batch_service.compute_matches_for_internship(internship_id)
         else:
             logger.info("Computing matches for ALL students and internships...")
-            result = batch_service.compute_all_matches(force_recompute=force_recompute)
+        try:
+            result = batch_service.compute_all_matches(
+                force_recompute=force_recompute,
+                student_ids=student_ids,
+                internship_ids=internship_ids,
+                workers=workers,
+                tracker=tracker
+            )
+        except Exception as e:
+            tracker.fail(str(e))
+            raise
         
         return {
             "success": True,
             "message": "Batch similarity computation completed successfully!",
+            "job_id": job.job_id,
             "statistics": result,
             "performance_impact": {
                 "recommendations_speedup": "5 minutes → 50-200ms",
@@ -1140,6 +900,8 @@ async def compute_batch_similarity_matches(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         logger.error(f"  Error computing batch matches: {str(e)}")
@@ -1150,6 +912,53 @@ async def compute_batch_similarity_matches(
         )
 
 
+@router.get("/compute-matches/jobs/{job_id}")
+async def get_batch_match_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Poll the progress of a batch similarity computation job
+    
+    Returns status (queued, running, completed, failed), students/pairs done
+    out of total, and the final statistics once completed.
+    """
+    from app.services.match_job_service import MatchJobService
+    
+    job = MatchJobService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Match job not found")
+    
+    return {
+        "success": True,
+        "job": job.to_dict()
+    }
+
+
+@router.get("/rematch-queue/status")
+async def get_rematch_queue_status(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Background rematch queue status
+    
+    Shows pending entities (depth), in-flight work, the age of the oldest pending
+    entry and the lag from a resume/internship write to its refreshed match rows.
+    (Admin and company only)
+    """
+    from app.services.rematch_queue import rematch_queue
+    
+    # Queue internals (including last_error) are operational data
+    if current_user.role not in (UserRole.admin, UserRole.company):
+        raise HTTPException(status_code=403, detail="Only admins and companies can view the rematch queue")
+    
+    return {
+        "success": True,
+        "queue": rematch_queue.stats()
+    }
+
+
 @router.get("/rank-candidates/{internship_id}/filtered")
 async def get_filtered_ranked_candidates(
     internship_id: str,
@@ -1194,7 +1003,7 @@ async def get_filtered_ranked_candidates(
     - **page_size**: Items per page (default: 10, max: 100)
     """
     import logging
-    from sqlalchemy import and_, or_, func
+    from sqlalchemy import and_
     logger = logging.getLogger(__name__)
     
     try:
@@ -1264,46 +1073,24 @@ async def get_filtered_ranked_candidates(
         if max_score is not None:
             filters.append(StudentInternshipMatch.base_similarity_score <= max_score)
         
-        # Skills filter
+        # Skills filter (any of the skills, via the resume_skills index)
         if skills:
-            skill_list = [s.strip().lower() for s in skills.split(',')]
-            # This requires querying the parsed_data JSON field
-            skill_filters = []
-            for skill in skill_list:
-                skill_filters.append(
-                    func.json_search(
-                        Resume.parsed_data,
-                        'one',
-                        f'%{skill}%',
-                        None,
-                        '$.all_skills'
-                    ).isnot(None)
-                )
-            if skill_filters:
-                filters.append(or_(*skill_filters))
+            skill_list = CandidateRankingService.parse_skills(skills)
+            filters.append(CandidateRankingService.skills_condition([Resume.id], skill_list, match_all=False))
         
-        # Experience filter
-        if experience_min is not None or experience_max is not None:
-            if experience_min is not None:
-                filters.append(
-                    func.json_extract(Resume.parsed_data, '$.total_experience_years') >= experience_min
-                )
-            if experience_max is not None:
-                filters.append(
-                    func.json_extract(Resume.parsed_data, '$.total_experience_years') <= experience_max
-                )
+        # Experience filter (typed column derived from parsed_data)
+        if experience_min is not None:
+            filters.append(Resume.experience_years >= experience_min)
+        if experience_max is not None:
+            filters.append(Resume.experience_years <= experience_max)
         
-        # Education level filter
+        # Education level filter (minimum level: Bachelor, Master, PhD)
         if education_level:
-            filters.append(
-                func.json_search(
-                    Resume.parsed_data,
-                    'one',
-                    f'%{education_level}%',
-                    None,
-                    '$.education[*].degree'
-                ).isnot(None)
-            )
+            min_education = CandidateRankingService.education_rank(education_level)
+            if min_education:
+                filters.append(Resume.education_level >= min_education)
+            else:
+                logger.warning(f"⚠️ Unknown education level '{education_level}', filter ignored")
         
         # Application status filter (only if filtering applicants)
         if only_applicants and application_status:
@@ -1319,7 +1106,7 @@ async def get_filtered_ranked_candidates(
             else:
                 query = query.order_by(StudentInternshipMatch.base_similarity_score.desc())
         elif sort_by == "experience":
-            exp_field = func.json_extract(Resume.parsed_data, '$.total_experience_years')
+            exp_field = Resume.experience_years
             if sort_order == "asc":
                 query = query.order_by(exp_field.asc())
             else:
@@ -1444,8 +1231,8 @@ async def export_candidate_rankings(
     Export candidate rankings to CSV or XLSX format
     
     Export Formats:
-    - **csv**: CSV format (Excel compatible)
-    - **xlsx**: Native Excel format with formatting
+    - **csv**: CSV format (Excel compatible), streamed row by row
+    - **xlsx**: Native Excel format with formatting (write-only workbook, sent once complete)
     
     Export Types:
     - **filtered**: Export all candidates matching current filters
@@ -1460,9 +1247,7 @@ async def export_candidate_rankings(
     - Key Strengths (brief summary)
     """
     import logging
-    from sqlalchemy import and_, or_, func
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from sqlalchemy import and_
     
     logger = logging.getLogger(__name__)
     
@@ -1532,45 +1317,24 @@ async def export_candidate_rankings(
             if max_score is not None:
                 filters.append(StudentInternshipMatch.base_similarity_score <= max_score)
             
-            # Skills filter
+            # Skills filter (any of the skills, via the resume_skills index)
             if skills:
-                skill_list = [s.strip().lower() for s in skills.split(',')]
-                skill_filters = []
-                for skill in skill_list:
-                    skill_filters.append(
-                        func.json_search(
-                            Resume.parsed_data,
-                            'one',
-                            f'%{skill}%',
-                            None,
-                            '$.all_skills'
-                        ).isnot(None)
-                    )
-                if skill_filters:
-                    filters.append(or_(*skill_filters))
+                skill_list = CandidateRankingService.parse_skills(skills)
+                filters.append(CandidateRankingService.skills_condition([Resume.id], skill_list, match_all=False))
             
-            # Experience filter
-            if experience_min is not None or experience_max is not None:
-                if experience_min is not None:
-                    filters.append(
-                        func.json_extract(Resume.parsed_data, '$.total_experience_years') >= experience_min
-                    )
-                if experience_max is not None:
-                    filters.append(
-                        func.json_extract(Resume.parsed_data, '$.total_experience_years') <= experience_max
-                    )
+            # Experience filter (typed column derived from parsed_data)
+            if experience_min is not None:
+                filters.append(Resume.experience_years >= experience_min)
+            if experience_max is not None:
+                filters.append(Resume.experience_years <= experience_max)
             
-            # Education level filter
+            # Education level filter (minimum level: Bachelor, Master, PhD)
             if education_level:
-                filters.append(
-                    func.json_search(
-                        Resume.parsed_data,
-                        'one',
-                        f'%{education_level}%',
-                        None,
-                        '$.education[*].degree'
-                    ).isnot(None)
-                )
+                min_education = CandidateRankingService.education_rank(education_level)
+                if min_education:
+                    filters.append(Resume.education_level >= min_education)
+                else:
+                    logger.warning(f"⚠️ Unknown education level '{education_level}', filter ignored")
             
             # Application status filter
             if only_applicants and application_status:
@@ -1587,184 +1351,47 @@ async def export_candidate_rankings(
             offset = (page - 1) * page_size
             query = query.offset(offset).limit(page_size)
         
-        # Execute query
-        results = query.all()
-        
-        logger.info(f"✅ Found {len(results)} candidates to export")
-        
-        # Prepare data for export
-        export_data = []
-        for row in results:
-            match = row[0]
-            user = row[1]
-            resume = row[2]
-            application = row[3] if only_applicants and len(row) > 3 else None
-            
-            parsed_data = resume.parsed_data or {}
-            personal_info = parsed_data.get('personal_info', {})
-            
-            # Get top matching skills
-            candidate_skills = parsed_data.get('all_skills', [])
-            required_skills = internship.required_skills or []
-            matched_skills = [s for s in candidate_skills if s.lower() in [rs.lower() for rs in required_skills]]
-            top_skills = ', '.join(matched_skills[:5]) if matched_skills else 'N/A'
-            
-            # Get education level
-            education = parsed_data.get('education', [])
-            education_level_str = education[0].get('degree', 'N/A') if education else 'N/A'
-            
-            # Get key strengths (from projects and certifications)
-            projects = parsed_data.get('projects', [])
-            certifications = parsed_data.get('certifications', [])
-            key_strengths = []
-            if projects:
-                key_strengths.append(f"{len(projects)} projects")
-            if certifications:
-                key_strengths.append(f"{len(certifications)} certifications")
-            if matched_skills:
-                key_strengths.append(f"{len(matched_skills)}/{len(required_skills)} required skills")
-            key_strengths_str = ', '.join(key_strengths) if key_strengths else 'Basic qualification'
-            
-            # Get raw phone number
-            phone_number = personal_info.get('phone', 'N/A')
-            
-            export_data.append({
-                'Candidate Name': user.full_name,
-                'Email': user.email,
-                'Phone': phone_number,
-                'Match Score (%)': round(match.base_similarity_score, 2),
-                'Top Matching Skills': top_skills,
-                'Experience (Years)': parsed_data.get('total_experience_years', 0),
-                'Education Level': education_level_str,
-                'Application Date': str(application.created_at) if application else 'Not Applied',
-                'Application Status': application.status if application else 'Not Applied',
-                'Key Strengths': key_strengths_str,
-                'Semantic Match (%)': round(match.semantic_similarity, 2) if match.semantic_similarity is not None else None,
-                'Skills Match (%)': round(match.skills_match_score, 2) if match.skills_match_score is not None else None,
-                'Experience Match (%)': round(match.experience_match_score, 2) if match.experience_match_score is not None else None
-            })
-        
         # Generate filename
         internship_title = internship.title.replace(' ', '_').replace('/', '-')
         date_str = datetime.now().strftime('%Y%m%d')
         filename = f"{internship_title}_Candidates_{date_str}"
         
-        # Format phone numbers based on export type
-        for row in export_data:
-            phone = row.get('Phone', 'N/A')
-            if phone != 'N/A' and phone:
-                # Ensure phone has proper format with country code
-                if not phone.startswith('+'):
-                    phone = f"+{phone}"
-                
-                # Format based on export type
-                if format.lower() == 'xlsx':
-                    # For XLSX: Format as +91 9876543210 (with space after country code)
-                    # Cell format will be set to text in the XLSX writer
-                    if phone.startswith('+91-'):
-                        phone = phone.replace('+91-', '+91 ')
-                    row['Phone'] = phone
-                else:
-                    # For CSV: Use ="..." formula to force text
-                    if phone.startswith('+91-'):
-                        phone = phone.replace('+91-', '+91 ')
-                    row['Phone'] = f'="{phone}"'
+        export_format = 'xlsx' if format.lower() == 'xlsx' else 'csv'
+        title = internship.title
+        required_skills = list(internship.required_skills or [])
+        
+        def export_rows():
+            """
+            Export rows fetched in batches of EXPORT_BATCH_SIZE from a session owned by
+            the stream (the request session is closed before the body is sent)
+            """
+            stream_db = SessionLocal()
+            try:
+                for row in query.with_session(stream_db).yield_per(EXPORT_BATCH_SIZE):
+                    application = row[3] if only_applicants and len(row) > 3 else None
+                    yield CandidateExportService.export_row(
+                        row[0], row[1], row[2], application, required_skills, export_format
+                    )
+            except Exception as e:
+                logger.error(f"  Error streaming candidate export: {str(e)}")
+                raise
+            finally:
+                stream_db.close()
         
         # Export based on format
-        if format.lower() == 'xlsx':
+        if export_format == 'xlsx':
+            total = query.count()
+            logger.info(f"✅ Found {total} candidates to export")
+            
             # Check if we have data
-            if not export_data:
+            if not total:
                 raise HTTPException(
                     status_code=404,
                     detail="No candidates found to export"
                 )
             
-            # Create Excel file with formatting
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Candidate Rankings"
-            
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Add header with internship info
-            ws.merge_cells('A1:M1')
-            ws['A1'] = f"Candidate Rankings - {internship.title}"
-            ws['A1'].font = Font(bold=True, size=14)
-            ws['A1'].alignment = Alignment(horizontal="center")
-            
-            ws.merge_cells('A2:M2')
-            ws['A2'] = f"Exported on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Total Candidates: {len(export_data)}"
-            ws['A2'].font = Font(size=10, italic=True)
-            ws['A2'].alignment = Alignment(horizontal="center")
-            
-            # Add column headers (starting from row 4)
-            headers = list(export_data[0].keys())
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=4, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Add data rows
-            for row_idx, row_data in enumerate(export_data, start=5):
-                for col_idx, (key, value) in enumerate(row_data.items(), start=1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.border = border
-                    
-                    # Format phone numbers as text to prevent formula interpretation
-                    if key == 'Phone':
-                        cell.number_format = '@'  # @ means text format in Excel
-                    
-                    # Color code only the Match Score cell
-                    if key == 'Match Score (%)':
-                        if value >= 80:
-                            cell.fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")  # Light green
-                        elif value >= 60:
-                            cell.fill = PatternFill(start_color="FFE0B2", end_color="FFE0B2", fill_type="solid")  # Light orange
-                        else:
-                            cell.fill = PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid")  # Light red
-            
-            # Auto-adjust column widths (safer approach)
-            for col_idx in range(1, len(headers) + 1):
-                max_length = 0
-                column_letter = openpyxl.utils.get_column_letter(col_idx)
-                
-                # Check header length
-                header_cell = ws.cell(row=4, column=col_idx)
-                if header_cell.value:
-                    max_length = len(str(header_cell.value))
-                
-                # Check data rows
-                for row_idx in range(5, 5 + len(export_data)):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    if cell.value:
-                        try:
-                            cell_length = len(str(cell.value))
-                            if cell_length > max_length:
-                                max_length = cell_length
-                        except:
-                            pass
-                
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Save to bytes
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
             return StreamingResponse(
-                output,
+                CandidateExportService.stream_xlsx(export_rows(), title, total),
                 media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 headers={
                     "Content-Disposition": f"attachment; filename={filename}.xlsx"
@@ -1772,38 +1399,9 @@ async def export_candidate_rankings(
             )
         
         else:  # CSV format
-            output = io.StringIO()
-            if export_data:
-                # Write header
-                headers = list(export_data[0].keys())
-                output.write(','.join(headers) + '\n')
-                
-                # Write rows with special handling for phone numbers
-                for row in export_data:
-                    row_values = []
-                    for header in headers:
-                        value = row[header]
-                        # Convert value to string
-                        value_str = str(value)
-                        
-                        # Special handling for Phone column - don't quote the formula
-                        if header == 'Phone' and value_str.startswith('="'):
-                            # Don't add extra quotes for formula cells
-                            row_values.append(value_str)
-                        elif ',' in value_str or '"' in value_str or '\n' in value_str:
-                            # Quote fields that contain commas, quotes, or newlines
-                            value_str = value_str.replace('"', '""')
-                            row_values.append(f'"{value_str}"')
-                        else:
-                            row_values.append(value_str)
-                    
-                    output.write(','.join(row_values) + '\n')
-            
-            # Convert to bytes
-            csv_bytes = io.BytesIO(output.getvalue().encode('utf-8'))
-            
+            # Rows are written as they are fetched, so the download starts right away
             return StreamingResponse(
-                csv_bytes,
+                CandidateExportService.stream_csv(export_rows()),
                 media_type="text/csv",
                 headers={
                     "Content-Disposition": f"attachment; filename={filename}.csv"
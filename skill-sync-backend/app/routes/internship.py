@@ -12,6 +12,7 @@ from app.database.connection import get_db
 from app.models import User, Internship, UserRole, Resume, Application, StudentInternshipMatch
 from app.services.parser_service import InternshipParser
 from app.services.rag_engine import rag_engine
+from app.services.rematch_queue import rematch_queue
 from app.services.matching_engine import MatchingEngine
 from app.services.job_description_analyzer import get_job_description_analyzer
 from app.services.internship_document_parser import get_internship_document_parser
@@ -295,6 +296,9 @@ def post_internship(
             }
         )
         
+        # Compute match rows in the background so the new posting shows up in recommendations
+        rematch_queue.enqueue_internship(new_internship.id)
+        
         return new_internship
         
     except Exception as e:
@@ -624,6 +628,8 @@ def update_internship(
             }
         )
         
+        rematch_queue.enqueue_internship(internship.id)
+        
         return internship
         
     except Exception as e:
@@ -14,6 +14,7 @@ from app.models import User, UserRole, Internship, Application, Resume
 from app.models.student_internship_match import StudentInternshipMatch
 from app.utils.security import get_current_user
 from app.services.email_service import email_service
+from app.services.candidate_flagging_service import CandidateFlaggingService
 import io
 import csv
 from openpyxl import Workbook
@@ -142,6 +143,9 @@ def update_my_profile(
                 current_user.linkedin_url = profile_data['linkedin_url']
             if 'github_url' in profile_data:
                 current_user.github_url = profile_data['github_url']
+            
+            # Keep the duplicate-contact flagging index in step with the profile
+            CandidateFlaggingService.sync_contact_keys(db, current_user)
                 
         elif current_user.role == UserRole.company:
             # Company profile update
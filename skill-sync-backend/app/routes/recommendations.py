@@ -197,8 +197,7 @@ def get_recommendations_for_student(
             duration=internship.duration or "",
             stipend=internship.stipend or "",
             match_score=int(match.base_similarity_score),
-            posted_date=internship.created_at.isoformat() if internship.created_at else None,
-            experience_level=internship.experience_level
+            posted_date=internship.created_at.isoformat() if internship.created_at else None
         ))
     
     total_pages = (total + page_size - 1) // page_size
@@ -216,6 +215,8 @@ def get_recommendations_for_student(
 def get_recommended_candidates(
     internship_id: int,
     top_k: int = 20,
+    location: Optional[str] = Query(None, description="Only candidates in this location"),
+    min_experience: Optional[float] = Query(None, ge=0, description="Minimum years of experience"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -224,7 +225,10 @@ def get_recommended_candidates(
     
     - **internship_id**: ID of the internship
     - **top_k**: Number of candidates to return (default: 20)
-    - Uses RAG engine to find best matching candidates
+    - **location** / **min_experience**: Optional candidate filters
+    - Uses RAG engine to find best matching candidates; filters (active
+      resumes only, plus the optional ones) are applied inside the vector
+      search, so top_k valid candidates come back from one query
     """
     if current_user.role != UserRole.company:
         raise HTTPException(
@@ -247,7 +251,8 @@ def get_recommended_candidates(
     # Get matching candidates from RAG engine
     matches = rag_engine.find_matching_candidates(
         internship_id=str(internship_id),
-        top_k=top_k
+        top_k=top_k,
+        where=rag_engine.resume_filter(is_active=True, location=location, min_experience=min_experience)
     )
     
     if not matches:
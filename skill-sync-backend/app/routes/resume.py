@@ -144,10 +144,12 @@ def activate_resume(
         )
     
     # Deactivate all other resumes for this student
-    deactivated_count = db.query(Resume).filter(
+    active = db.query(Resume).filter(
         Resume.student_id == current_user.id,
         Resume.is_active == 1
-    ).update({"is_active": 0})
+    )
+    deactivated_ids = [row.id for row in active.with_entities(Resume.id)]
+    deactivated_count = active.update({"is_active": 0})
     
     logger.info(f"Deactivated {deactivated_count} resumes for user {current_user.id}")
     
@@ -156,6 +158,11 @@ def activate_resume(
     db.commit()
     db.refresh(resume)
     
+    # Mirror the change into the vector store so candidate searches filter on it
+    metadata_updates = {str(resume_id): {"is_active": 0} for resume_id in deactivated_ids}
+    metadata_updates[str(resume.id)] = {"is_active": 1}
+    rag_engine.update_resume_metadata(metadata_updates)
+    
     logger.info(f"Resume {resume_id} activated successfully for user {current_user.id}")
     
     return ResumeResponse.from_orm(resume)
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 from app.database.connection import get_db
 from app.models.user import User, UserRole
 from app.utils.security import get_current_user
+from app.services.candidate_flagging_service import CandidateFlaggingService
 
 router = APIRouter()
 
@@ -52,6 +53,9 @@ async def update_student_profile(
         if request.total_experience_years is not None:
             current_user.total_experience_years = request.total_experience_years
         
+        # Keep the duplicate-contact flagging index in step with the profile
+        CandidateFlaggingService.sync_contact_keys(db, current_user)
+        
         db.commit()
         
         return MessageResponse(
@@ -5,25 +5,40 @@ Part of the Hybrid Matching Strategy for performance optimization
 This service implements "Strategy A: Pre-computed Base Similarity"
 - Runs as a batch job (nightly, on-demand, or after bulk uploads)
 - Calculates similarity between ALL students and ALL open internships
-- Stores results in student_internship_matches table
+- Scores students x internships in blocks with vectorized matrix operations
+  (optionally sharded across a process pool for large runs)
+- Recomputes only missing/stale pairs by default (content_hash + last_computed,
+  checked in SQL so only the stale students/internships are loaded)
+- Upserts results into student_internship_matches in one transaction
 - Enables millisecond-fast recommendations and candidate discovery
 """
 
+import os
 import logging
 from typing import List, Dict, Optional
+import numpy as np
+from sqlalchemy import and_, or_, exists, func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import delete
-from datetime import datetime
+from datetime import datetime, timezone
 
+from app.database.connection import SessionLocal
 from app.models.user import User, UserRole
-from app.models.resume import Resume
+from app.models.resume import Resume, parse_experience_years
 from app.models.internship import Internship
 from app.models.student_internship_match import StudentInternshipMatch
+from app.models.application import Application
 from app.services.matching_engine import MatchingEngine
+from app.services.vectorized_matching_engine import VectorizedMatchingEngine, CandidateFeatures
+from app.services.match_persistence_service import MatchPersistenceService
+from app.services.match_job_service import MatchJobTracker
+from app.services.sharded_matching_engine import ShardedMatchingEngine, clamp_workers
 from app.services.rag_engine import rag_engine
 
 logger = logging.getLogger(__name__)
 
+# IDs per IN (...) when reading existing rows for missing-pair detection
+EXISTING_PAIRS_BATCH_SIZE = 500
+
 
 class BatchMatchingService:
     """
@@ -37,104 +52,250 @@ class BatchMatchingService:
     def __init__(self, db: Session):
         self.db = db
         self.matching_engine = MatchingEngine(rag_engine)
+        self.vectorized_engine = VectorizedMatchingEngine(self.matching_engine)
+        # Number of students scored per matrix block (bounds peak memory)
+        self.block_size = int(os.getenv("BATCH_MATCH_BLOCK_SIZE", "1024"))
+        # Retention: "all" stores every pair; "top_k" keeps each student's top-K internships,
+        # each internship's top-K students, applied pairs and anything at/above the score floor
+        self.retention_mode = os.getenv("MATCH_RETENTION_MODE", "all").lower()
+        self.retention = None
+        if self.retention_mode == "top_k":
+            self.retention = {
+                'top_k_per_student': int(os.getenv("MATCH_TOP_K_PER_STUDENT", "50")),
+                'top_k_per_internship': int(os.getenv("MATCH_TOP_K_PER_INTERNSHIP", "200")),
+                'score_floor': float(os.getenv("MATCH_SCORE_FLOOR", "70"))
+            }
+        # Two-stage mode: fully score only each student's N nearest internships by
+        # embedding (0 = score every pair); N grows until sampled recall meets the target
+        self.ann_candidates = int(os.getenv("MATCH_ANN_CANDIDATES", "0"))
+        self.ann_recall_target = float(os.getenv("MATCH_ANN_RECALL_TARGET", "0.95"))
+        self.ann_recall_k = int(os.getenv("MATCH_ANN_RECALL_K", "10"))
+        self.ann_recall_sample = int(os.getenv("MATCH_ANN_RECALL_SAMPLE", "200"))
+        # Scoring processes for large runs (1 = score in this process)
+        self.workers = int(os.getenv("BATCH_MATCH_WORKERS", "1"))
+    
+    @property
+    def stores_all_pairs(self) -> bool:
+        """False when retention or two-stage scoring leaves some pairs without a row"""
+        return self.retention is None and self.ann_candidates <= 0
     
     def compute_all_matches(
         self, 
         force_recompute: bool = False,
         student_ids: Optional[List[int]] = None,
-        internship_ids: Optional[List[int]] = None
+        internship_ids: Optional[List[int]] = None,
+        workers: Optional[int] = None,
+        tracker: Optional[MatchJobTracker] = None
     ) -> Dict:
         """
         Compute base similarity scores for all student-internship pairs.
         
+        By default this is incremental: only pairs whose stored match is missing
+        or stale (see _find_stale_pairs) are scored and upserted, so re-running
+        with no changes does almost no work.
+        
         Args:
-            force_recompute: If True, delete existing matches and recompute all
+            force_recompute: If True, recompute every pair in scope and remove rows
+                that were not recomputed (e.g. pairs without embeddings)
             student_ids: Optional list of specific student IDs to compute (None = all)
             internship_ids: Optional list of specific internship IDs to compute (None = all)
+            workers: Scoring processes (None = BATCH_MATCH_WORKERS), clamped to
+                1..os.cpu_count(). Student chunks are sharded across a process pool
+                when there is more than one chunk.
+            tracker: Optional MatchJobTracker that receives progress updates
         
         Returns:
             Dictionary with computation statistics
         """
         logger.info("🚀 Starting batch similarity computation...")
+        workers = clamp_workers(self.workers if workers is None else workers)
         start_time = datetime.now()
         
-        # Step 1: Get all students with active resumes
-        students_query = self.db.query(User, Resume).join(
-            Resume, Resume.student_id == User.id
-        ).filter(
-            User.role == UserRole.student,
-            Resume.is_active == 1
-        )
-        
-        if student_ids:
-            students_query = students_query.filter(User.id.in_(student_ids))
-        
-        students_with_resumes = students_query.all()
-        logger.info(f"📊 Found {len(students_with_resumes)} students with active resumes")
-        
-        # Step 2: Get all active internships
-        internships_query = self.db.query(Internship).filter(
-            Internship.is_active == 1
-        )
-        
+        # Step 1: Scope - each student's latest active resume (matching the unique
+        # (student, internship) index) and the active internships, counted in SQL
+        latest_resumes = self._latest_resumes(student_ids)
+        internship_scope = select(Internship.id).where(Internship.is_active == 1)
         if internship_ids:
-            internships_query = internships_query.filter(Internship.id.in_(internship_ids))
+            internship_scope = internship_scope.where(Internship.id.in_(internship_ids))
         
-        internships = internships_query.all()
-        logger.info(f"📊 Found {len(internships)} active internships")
+        n_scope_students = self.db.query(func.count()).select_from(latest_resumes).scalar()
+        n_scope_internships = self.db.query(func.count()).select_from(internship_scope.subquery()).scalar()
+        logger.info(f"📊 Found {n_scope_students} students with active resumes")
+        logger.info(f"📊 Found {n_scope_internships} active internships")
         
-        if not students_with_resumes or not internships:
+        if not n_scope_students or not n_scope_internships:
             logger.warning("⚠️  No students or internships to process")
-            return {
+            result = {
                 "success": True,
                 "students_processed": 0,
                 "internships_processed": 0,
                 "matches_computed": 0,
                 "duration_seconds": 0
             }
+            if tracker:
+                tracker.complete(result)
+            return result
         
-        # Step 3: Delete existing matches if force_recompute
-        if force_recompute:
-            delete_query = delete(StudentInternshipMatch)
-            if student_ids:
-                delete_query = delete_query.where(StudentInternshipMatch.student_id.in_(student_ids))
-            if internship_ids:
-                delete_query = delete_query.where(StudentInternshipMatch.internship_id.in_(internship_ids))
+        # Step 2: Select pairs to compute. Existing rows are upserted in place (never
+        # deleted up front) so readers keep seeing the previous scores until commit.
+        run_started = datetime.now(timezone.utc)
+        pairs_total = n_scope_students * n_scope_internships
+        
+        # Top-K mode: students/internships whose every pair is recomputed, so their
+        # rows that are not rewritten this run have dropped out of the top-K
+        refreshed_student_ids: List[int] = []
+        refreshed_internship_ids: List[int] = []
+        
+        stale = None
+        batch_students = batch_internships = None  # None = everything in scope
+        if not force_recompute:
+            # Incremental mode: SQL returns the stale students/internships, and only
+            # they are loaded and scored
+            stale = self._find_stale_pairs(latest_resumes, internship_scope, n_scope_students, n_scope_internships)
+            batch_students, batch_internships = stale['batch_students'], stale['batch_internships']
+            
+            if batch_students is not None and not batch_students:
+                logger.info(f"✅ All {pairs_total} matches are up to date, nothing to recompute")
+                result = {
+                    "success": True,
+                    "students_processed": 0,
+                    "internships_processed": 0,
+                    "matches_computed": 0,
+                    "matches_failed": 0,
+                    "pairs_skipped": pairs_total,
+                    "duration_seconds": (datetime.now() - start_time).total_seconds(),
+                    "avg_time_per_match": 0
+                }
+                if tracker:
+                    tracker.complete(result)
+                return result
             
-            deleted = self.db.execute(delete_query)
-            self.db.commit()
-            logger.info(f"🗑️  Deleted {deleted.rowcount} existing matches")
+            if not self.stores_all_pairs:
+                refreshed_student_ids = sorted(stale['students'])
+                refreshed_internship_ids = sorted(stale['internships'])
+                if len(stale['internships']) == n_scope_internships:
+                    refreshed_student_ids = self._scope_student_ids(latest_resumes)
+                if len(stale['students']) == n_scope_students:
+                    refreshed_internship_ids = self._scope_internship_ids(internship_scope)
+        
+        # Step 3: Load only the students/internships in the batch
+        students_query = self.db.query(User, Resume).join(
+            latest_resumes, latest_resumes.c.resume_id == Resume.id
+        ).join(
+            User, User.id == Resume.student_id
+        )
+        if batch_students is not None:
+            students_query = students_query.filter(User.id.in_(sorted(batch_students)))
+        students_with_resumes = students_query.order_by(User.id).all()
+        
+        internships_query = self.db.query(Internship).filter(Internship.id.in_(internship_scope))
+        if batch_internships is not None:
+            internships_query = internships_query.filter(Internship.id.in_(sorted(batch_internships)))
+        internships = internships_query.order_by(Internship.id).all()
+        
+        if stale is None:
+            stale_mask = np.ones((len(students_with_resumes), len(internships)), dtype=bool)
+        else:
+            stale_mask = self._stale_mask(stale, students_with_resumes, internships, latest_resumes, internship_scope)
+            logger.info(f"🔎 {int(stale_mask.sum())}/{pairs_total} pairs are missing or stale")
+        
+        applied_pairs = None
+        if not self.stores_all_pairs:
+            applied_pairs = self._load_applied_pairs(students_with_resumes, internships)
+        
+        # Step 4: Build feature arrays and embedding matrices once for the whole batch
+        candidate_data = [self._prepare_candidate_data(resume) for _, resume in students_with_resumes]
+        internship_data = [self._prepare_internship_data(internship) for internship in internships]
+        candidate_features, internship_features = self.vectorized_engine.build_features(
+            candidate_data, internship_data
+        )
+        
+        resume_embeddings, _ = rag_engine.get_resume_embeddings(
+            [self._resume_chroma_id(resume) for _, resume in students_with_resumes]
+        )
+        internship_embeddings, _ = rag_engine.get_internship_embeddings(
+            [str(internship.id) for internship in internships]
+        )
+        candidate_matrix, candidate_valid = self.vectorized_engine.normalize_embedding_matrix(resume_embeddings)
+        internship_matrix, internship_valid = self.vectorized_engine.normalize_embedding_matrix(internship_embeddings)
+        logger.info(f"📐 Loaded embedding matrices: students {candidate_matrix.shape}, internships {internship_matrix.shape}")
+        
+        ann_candidates, ann_recall = 0, None
+        if 0 < self.ann_candidates < len(internships):
+            ann_candidates, ann_recall = self._calibrate_ann(
+                candidate_features, candidate_matrix, candidate_valid,
+                internship_features, internship_matrix, internship_valid
+            )
         
-        # Step 4: Compute matches for all pairs
+        # Step 5: Score student blocks against all internships with matrix operations
+        # and stream rows into the match table (single transaction, committed at the end)
         matches_computed = 0
         matches_failed = 0
+        students_done = 0
+        pairs_done = 0
+        n_students = len(students_with_resumes)
+        pairs_to_compute = int(stale_mask.sum())
+        writer = MatchPersistenceService(self.db, expected_rows=pairs_to_compute)
         
-        for student, resume in students_with_resumes:
-            student_matches = []
-            
-            for internship in internships:
-                try:
-                    # Calculate match score using matching engine
-                    match_result = self._calculate_match(
-                        student=student,
-                        resume=resume,
-                        internship=internship
-                    )
-                    
-                    if match_result:
-                        student_matches.append(match_result)
-                        matches_computed += 1
-                    
-                except Exception as e:
-                    logger.error(f"  Error computing match for student {student.id} and internship {internship.id}: {str(e)}")
-                    matches_failed += 1
-                    continue
+        use_pool = workers > 1 and n_students > self.block_size
+        if tracker:
+            tracker.start(students_total=n_students, pairs_total=pairs_to_compute, workers=workers if use_pool else 1)
+        
+        if use_pool:
+            # Several chunks per worker keeps the pool balanced
+            chunk_size = min(self.block_size, max(1, -(-n_students // (workers * 4))))
+            blocks = ShardedMatchingEngine(workers, chunk_size).score(
+                self.vectorized_engine.weights,
+                candidate_features, candidate_matrix, candidate_valid,
+                internship_features, internship_matrix, internship_valid,
+                stale_mask,
+                retention=self.retention,
+                pinned_mask=applied_pairs,
+                ann_candidates=ann_candidates
+            )
+        else:
+            blocks = self._score_blocks(
+                candidate_features, candidate_matrix, candidate_valid,
+                internship_features, internship_matrix, internship_valid,
+                stale_mask,
+                applied_pairs,
+                ann_candidates
+            )
+        
+        for start, end, pairs in blocks:
+            block_matches = self._build_match_rows(
+                students_with_resumes[start:end], internships, pairs
+            )
+            writer.write(block_matches)
             
-            # Batch insert matches for this student
-            if student_matches:
-                self.db.bulk_insert_mappings(StudentInternshipMatch, student_matches)
-                self.db.commit()
-                logger.info(f"✅ Computed {len(student_matches)} matches for student {student.id} ({student.full_name})")
+            matches_computed += len(block_matches)
+            matches_failed += pairs['failed']
+            students_done += end - start
+            pairs_done += int(stale_mask[start:end].sum())
+            if tracker:
+                tracker.update(students_done, pairs_done, matches_computed)
+            logger.info(f"✅ Computed {len(block_matches)} matches for students {start + 1}-{end} of {n_students}")
+        
+        if tracker:
+            tracker.update(students_done, pairs_done, matches_computed, force=True)
+        
+        if force_recompute:
+            writer.delete_not_refreshed(run_started, student_ids=student_ids, internship_ids=internship_ids)
+        elif not self.stores_all_pairs:
+            if refreshed_student_ids:
+                writer.delete_not_refreshed(
+                    run_started, refreshed_student_ids, self._scope_internship_ids(internship_scope)
+                )
+            if refreshed_internship_ids:
+                writer.delete_not_refreshed(
+                    run_started, self._scope_student_ids(latest_resumes), refreshed_internship_ids
+                )
+        if self.retention is not None:
+            writer.prune_to_top_k(**self.retention)
+        write_stats = writer.finish()
+        
+        if matches_failed:
+            logger.error(f"  Skipped {matches_failed} pairs with missing or zero embeddings")
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -145,8 +306,14 @@ class BatchMatchingService:
             "internships_processed": len(internships),
             "matches_computed": matches_computed,
             "matches_failed": matches_failed,
+            "pairs_skipped": pairs_total - int(stale_mask.sum()),
             "duration_seconds": duration,
-            "avg_time_per_match": duration / matches_computed if matches_computed > 0 else 0
+            "avg_time_per_match": duration / matches_computed if matches_computed > 0 else 0,
+            "write_mode": write_stats["write_mode"],
+            "rows_per_second": write_stats["rows_per_second"],
+            "workers": workers if use_pool else 1,
+            "ann_candidates": ann_candidates,
+            "ann_recall": ann_recall
         }
         
         logger.info(f"🎉 Batch computation complete!")
@@ -156,63 +323,400 @@ class BatchMatchingService:
         logger.info(f"   Failed: {result['matches_failed']}")
         logger.info(f"   Duration: {result['duration_seconds']:.2f}s")
         logger.info(f"   Avg time per match: {result['avg_time_per_match']:.3f}s")
+        logger.info(f"   Write throughput: {result['rows_per_second']} rows/s ({result['write_mode']})")
+        if ann_candidates:
+            logger.info(f"   Two-stage: {ann_candidates} nearest internships/student, recall {ann_recall:.3f}")
         
+        if tracker:
+            tracker.complete(result)
         return result
     
-    def _calculate_match(
-        self, 
-        student: User, 
-        resume: Resume, 
-        internship: Internship
-    ) -> Optional[Dict]:
+    def _score_blocks(
+        self,
+        candidate_features,
+        candidate_matrix: np.ndarray,
+        candidate_valid: np.ndarray,
+        internship_features,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray,
+        pair_mask: np.ndarray,
+        pinned_mask: Optional[np.ndarray] = None,
+        ann_candidates: int = 0
+    ):
+        """Score student blocks in this process, yielding (start, end, compacted pairs)"""
+        for start in range(0, len(candidate_features), self.block_size):
+            end = min(start + self.block_size, len(candidate_features))
+            yield start, end, self.vectorized_engine.score_selected(
+                candidates=candidate_features.slice(start, end),
+                candidate_matrix=candidate_matrix[start:end],
+                candidate_valid=candidate_valid[start:end],
+                internships=internship_features,
+                internship_matrix=internship_matrix,
+                internship_valid=internship_valid,
+                pairs=pair_mask[start:end],
+                retention=self.retention,
+                pinned=pinned_mask[start:end] if pinned_mask is not None else None,
+                ann_candidates=ann_candidates
+            )
+    
+    def _calibrate_ann(
+        self,
+        candidate_features,
+        candidate_matrix: np.ndarray,
+        candidate_valid: np.ndarray,
+        internship_features,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray
+    ):
         """
-        Calculate similarity score between a student and an internship.
+        Choose the stage-one shortlist size and measure its recall.
+        
+        Recall is the share of each sampled student's exhaustive top-k internships
+        (by overall score) that the shortlist contains. The shortlist doubles from
+        MATCH_ANN_CANDIDATES until recall reaches MATCH_ANN_RECALL_TARGET.
         
-        Returns dictionary with match data for bulk insert, or None on failure.
+        Returns:
+            Tuple of (shortlist size, measured recall); size 0 means score every pair
         """
-        # Prepare candidate data
-        candidate_data = {
-            'all_skills': resume.parsed_data.get('all_skills', []) if resume.parsed_data else [],
-            'total_experience_years': resume.parsed_data.get('total_experience_years', 0) if resume.parsed_data else 0,
-            'education': resume.parsed_data.get('education', []) if resume.parsed_data else [],
-            'projects': resume.parsed_data.get('projects', []) if resume.parsed_data else [],
-            'certifications': resume.parsed_data.get('certifications', []) if resume.parsed_data else []
+        n_internships = len(internship_features)
+        sample_rows = np.flatnonzero(candidate_valid)
+        if sample_rows.size == 0:
+            return 0, None
+        if sample_rows.size > self.ann_recall_sample:
+            sample_rows = np.random.default_rng(0).choice(sample_rows, self.ann_recall_sample, replace=False)
+        sample_rows = np.sort(sample_rows)
+        
+        sample_features = CandidateFeatures(**{
+            key: value if key == 'skill_relation' else value[sample_rows]
+            for key, value in vars(candidate_features).items()
+        })
+        exhaustive = self.vectorized_engine.score_block(
+            sample_features, candidate_matrix[sample_rows], candidate_valid[sample_rows],
+            internship_features, internship_matrix, internship_valid
+        )
+        overall = np.where(exhaustive['valid'], exhaustive['overall_score'], -np.inf)
+        k = max(1, min(self.ann_recall_k, int(internship_valid.sum())))
+        truth = np.zeros(overall.shape, dtype=bool)
+        np.put_along_axis(truth, np.argpartition(-overall, k - 1, axis=1)[:, :k], True, axis=1)
+        truth &= exhaustive['valid']
+        
+        candidates = self.ann_candidates
+        while True:
+            shortlist = self.vectorized_engine.nearest_internships(
+                candidate_matrix[sample_rows], internship_matrix, internship_valid, candidates
+            )
+            recall = float((truth & shortlist).sum() / max(truth.sum(), 1))
+            logger.info(f"🎯 Shortlist of {candidates} internships: recall@{k} = {recall:.3f}")
+            if recall >= self.ann_recall_target or candidates >= n_internships:
+                break
+            candidates = min(candidates * 2, n_internships)
+        
+        if candidates >= n_internships:
+            return 0, 1.0
+        return candidates, recall
+    
+    def _latest_resumes(self, student_ids: Optional[List[int]] = None):
+        """Subquery (student_id, resume_id): each student's latest active resume"""
+        query = self.db.query(
+            Resume.student_id.label('student_id'),
+            func.max(Resume.id).label('resume_id')
+        ).join(
+            User, User.id == Resume.student_id
+        ).filter(
+            User.role == UserRole.student,
+            Resume.is_active == 1
+        )
+        if student_ids:
+            query = query.filter(Resume.student_id.in_(student_ids))
+        return query.group_by(Resume.student_id).subquery()
+    
+    def _scope_student_ids(self, latest_resumes) -> List[int]:
+        """IDs of the students in scope"""
+        return [student_id for student_id, in self.db.query(latest_resumes.c.student_id)]
+    
+    def _scope_internship_ids(self, internship_scope) -> List[int]:
+        """IDs of the internships in scope"""
+        return list(self.db.execute(internship_scope).scalars())
+    
+    def _find_stale_pairs(self, latest_resumes, internship_scope, n_students: int, n_internships: int) -> Dict:
+        """
+        Find the students and internships whose stored matches need recomputing.
+        
+        Staleness is decided in SQL over student_internship_matches joined to the
+        current resume and internship, so a run with nothing to do reads no match
+        rows into Python. A student is stale when a stored match has a different
+        resume_id or resume content_hash, or the resume was updated after the
+        match's last_computed; an internship likewise on its content_hash and
+        updated_at (covers structured fields such as skills or experience bounds).
+        
+        When every pair is stored, missing rows are stale too: students with fewer
+        rows than there are internships (and vice versa) come from grouped
+        COUNT(*) queries. In "top_k" or two-stage mode missing rows are expected,
+        so an entity without rows is stale only when it is new, plus applied pairs
+        that have no row.
+        
+        Returns:
+            Dictionary with 'students' / 'internships' (all of their pairs are stale),
+            'short_students' / 'short_internships' (their absent rows are stale),
+            'pairs' (single stale (student_id, internship_id) pairs) and
+            'batch_students' / 'batch_internships' (IDs to load, None = all in scope)
+        """
+        match = StudentInternshipMatch
+        scope_students = select(latest_resumes.c.student_id)
+        resume_updated = func.coalesce(Resume.updated_at, Resume.created_at)
+        internship_updated = func.coalesce(Internship.updated_at, Internship.created_at)
+        
+        students = {student_id for student_id, in self.db.query(match.student_id).join(
+            latest_resumes, latest_resumes.c.student_id == match.student_id
+        ).join(
+            Resume, Resume.id == latest_resumes.c.resume_id
+        ).filter(
+            match.internship_id.in_(internship_scope),
+            or_(
+                match.resume_id != Resume.id,
+                match.resume_content_hash.is_distinct_from(Resume.content_hash),
+                match.last_computed.is_(None),
+                resume_updated > match.last_computed
+            )
+        ).distinct()}
+        internships = {internship_id for internship_id, in self.db.query(match.internship_id).join(
+            Internship, Internship.id == match.internship_id
+        ).filter(
+            match.internship_id.in_(internship_scope),
+            match.student_id.in_(scope_students),
+            or_(
+                match.internship_content_hash.is_distinct_from(Internship.content_hash),
+                match.last_computed.is_(None),
+                internship_updated > match.last_computed
+            )
+        ).distinct()}
+        
+        rows_per_student = self.db.query(latest_resumes.c.student_id).join(
+            Resume, Resume.id == latest_resumes.c.resume_id
+        ).outerjoin(
+            match, and_(match.student_id == latest_resumes.c.student_id, match.internship_id.in_(internship_scope))
+        ).group_by(latest_resumes.c.student_id)
+        rows_per_internship = self.db.query(Internship.id).outerjoin(
+            match, and_(match.internship_id == Internship.id, match.student_id.in_(scope_students))
+        ).filter(
+            Internship.id.in_(internship_scope)
+        ).group_by(Internship.id)
+        
+        short_students, short_internships, pairs = set(), set(), set()
+        if self.stores_all_pairs:
+            short_students = {row[0] for row in rows_per_student.having(func.count(match.id) < n_internships)}
+            short_internships = {row[0] for row in rows_per_internship.having(func.count(match.id) < n_students)}
+        else:
+            # An entity without rows is new unless it predates the latest stored match
+            # (it was scored then and simply kept no rows)
+            last_run = self.db.query(func.max(match.last_computed)).filter(
+                match.student_id.in_(scope_students),
+                match.internship_id.in_(internship_scope)
+            ).scalar()
+            if last_run is not None:
+                rows_per_student = rows_per_student.filter(
+                    or_(resume_updated.is_(None), resume_updated > last_run)
+                )
+                rows_per_internship = rows_per_internship.filter(
+                    or_(internship_updated.is_(None), internship_updated > last_run)
+                )
+            students |= {row[0] for row in rows_per_student.having(func.count(match.id) == 0)}
+            internships |= {row[0] for row in rows_per_internship.having(func.count(match.id) == 0)}
+            
+            # Applied pairs are always retained, so score those without a row
+            pairs = {tuple(row) for row in self.db.query(Application.student_id, Application.internship_id).filter(
+                Application.student_id.in_(scope_students),
+                Application.internship_id.in_(internship_scope),
+                ~exists().where(
+                    match.student_id == Application.student_id,
+                    match.internship_id == Application.internship_id
+                )
+            )}
+        
+        # A stale internship makes its pair with every student stale, and vice versa
+        return {
+            'students': students,
+            'internships': internships,
+            'short_students': short_students,
+            'short_internships': short_internships,
+            'pairs': pairs,
+            'batch_students': None if internships else students | short_students | {s for s, _ in pairs},
+            'batch_internships': None if students else internships | short_internships | {i for _, i in pairs}
         }
+    
+    def _stale_mask(
+        self,
+        stale: Dict,
+        students_with_resumes: List,
+        internships: List[Internship],
+        latest_resumes,
+        internship_scope
+    ) -> np.ndarray:
+        """
+        Boolean stale mask (n_students, n_internships) over the loaded batch only
+        
+        Missing pairs lie in short students x short internships; the rows that do
+        exist there are read from the smaller side, in chunks.
+        """
+        student_index = {student.id: i for i, (student, _) in enumerate(students_with_resumes)}
+        internship_index = {internship.id: j for j, internship in enumerate(internships)}
+        
+        def flags(ids, index):
+            return np.array([key in ids for key in index], dtype=bool)
         
-        # Prepare internship data
-        internship_data = {
+        mask = flags(stale['students'], student_index)[:, None] | flags(stale['internships'], internship_index)[None, :]
+        
+        short_rows = flags(stale['short_students'], student_index)
+        short_cols = flags(stale['short_internships'], internship_index)
+        if short_rows.any() and short_cols.any():
+            missing = short_rows[:, None] & short_cols[None, :]
+            match = StudentInternshipMatch
+            if len(stale['short_students']) <= len(stale['short_internships']):
+                ids, column = sorted(stale['short_students']), match.student_id
+                other_side = match.internship_id.in_(internship_scope)
+            else:
+                ids, column = sorted(stale['short_internships']), match.internship_id
+                other_side = match.student_id.in_(select(latest_resumes.c.student_id))
+            for start in range(0, len(ids), EXISTING_PAIRS_BATCH_SIZE):
+                existing = self.db.query(match.student_id, match.internship_id).filter(
+                    column.in_(ids[start:start + EXISTING_PAIRS_BATCH_SIZE]),
+                    other_side
+                )
+                for student_id, internship_id in existing:
+                    i = student_index.get(student_id)
+                    j = internship_index.get(internship_id)
+                    if i is not None and j is not None:
+                        missing[i, j] = False
+            mask |= missing
+        
+        for student_id, internship_id in stale['pairs']:
+            i = student_index.get(student_id)
+            j = internship_index.get(internship_id)
+            if i is not None and j is not None:
+                mask[i, j] = True
+        return mask
+    
+    def _load_applied_pairs(
+        self,
+        students_with_resumes: List,
+        internships: List[Internship]
+    ) -> np.ndarray:
+        """Mask of student-internship pairs with an application (always retained)"""
+        student_index = {student.id: i for i, (student, _) in enumerate(students_with_resumes)}
+        internship_index = {internship.id: j for j, internship in enumerate(internships)}
+        applied = np.zeros((len(students_with_resumes), len(internships)), dtype=bool)
+        
+        applications = self.db.query(Application.student_id, Application.internship_id).filter(
+            Application.internship_id.in_(list(internship_index))
+        )
+        for student_id, internship_id in applications:
+            i = student_index.get(student_id)
+            if i is not None:
+                applied[i, internship_index[internship_id]] = True
+        return applied
+    
+    def _build_match_rows(
+        self,
+        students_with_resumes: List,
+        internships: List[Internship],
+        pairs: Dict
+    ) -> List[Dict]:
+        """
+        Convert compacted block pairs (VectorizedMatchingEngine.select_pairs) into
+        match rows for the persistence layer.
+        
+        Rounding uses Python's round() so stored values are identical to
+        MatchingEngine.calculate_match_score.
+        """
+        computed_at = datetime.now(timezone.utc)
+        overall = pairs['overall_score'].tolist()
+        semantic = pairs['semantic_similarity'].tolist()
+        skills = pairs['skills_match'].tolist()
+        experience = pairs['experience_match'].tolist()
+        
+        rows = []
+        for k, (row_idx, col_idx) in enumerate(zip(pairs['rows'].tolist(), pairs['cols'].tolist())):
+            student, resume = students_with_resumes[row_idx]
+            internship = internships[col_idx]
+            rows.append({
+                'student_id': student.id,
+                'internship_id': internship.id,
+                'resume_id': resume.id,
+                'base_similarity_score': round(overall[k], 2),
+                'semantic_similarity': round(semantic[k], 2),
+                'skills_match_score': round(skills[k], 2),
+                'experience_match_score': round(experience[k], 2),
+                'resume_content_hash': resume.content_hash,
+                'internship_content_hash': internship.content_hash,
+                'last_computed': computed_at
+            })
+        return rows
+    
+    @staticmethod
+    def _prepare_candidate_data(resume: Resume) -> Dict:
+        """Build MatchingEngine candidate data from a resume"""
+        parsed = resume.parsed_data or {}
+        return {
+            'all_skills': parsed.get('all_skills', []),
+            # Typed column (parsed safely by the Resume model), not the raw LLM value
+            'total_experience_years': resume.experience_years if resume.experience_years is not None
+            else parse_experience_years(parsed.get('total_experience_years')),
+            'education': parsed.get('education', []),
+            'projects': parsed.get('projects', []),
+            'certifications': parsed.get('certifications', [])
+        }
+    
+    @staticmethod
+    def _prepare_internship_data(internship: Internship) -> Dict:
+        """Build MatchingEngine internship data from an internship"""
+        return {
             'required_skills': internship.required_skills or [],
             'preferred_skills': internship.preferred_skills or [],
             'min_experience': internship.min_experience or 0,
             'max_experience': internship.max_experience or 10,
             'required_education': internship.required_education or ''
         }
-        
-        # Get embeddings from ChromaDB (fallback to empty if not available)
-        # Note: get_resume_embedding expects ID without "resume_" prefix
+    
+    @staticmethod
+    def _resume_chroma_id(resume: Resume) -> str:
+        """ChromaDB resume ID without the "resume_" prefix (as the RAG getters expect)"""
+        return resume.embedding_id.replace('resume_', '') if resume.embedding_id else str(resume.id)
+    
+    @staticmethod
+    def _get_resume_embedding(resume: Resume) -> List[float]:
+        """Get a resume embedding from ChromaDB (empty list if not available)"""
         try:
-            resume_chroma_id = resume.embedding_id.replace('resume_', '') if resume.embedding_id else str(resume.id)
-            candidate_embedding = rag_engine.get_resume_embedding(resume_chroma_id)
-            if candidate_embedding is None:
-                candidate_embedding = []
-        except Exception as e:
-            candidate_embedding = []
-        
-        # Get internship embedding from RAG engine
+            embedding = rag_engine.get_resume_embedding(BatchMatchingService._resume_chroma_id(resume))
+            return embedding if embedding is not None else []
+        except Exception:
+            return []
+    
+    @staticmethod
+    def _get_internship_embedding(internship: Internship) -> List[float]:
+        """Get an internship embedding from ChromaDB (empty list if not available)"""
         try:
-            internship_chroma_id = str(internship.id)
-            internship_embedding = rag_engine.get_internship_embedding(internship_chroma_id)
-            if internship_embedding is None:
-                internship_embedding = []
-        except Exception as e:
-            internship_embedding = []
-        
-        # Calculate match score
+            embedding = rag_engine.get_internship_embedding(str(internship.id))
+            return embedding if embedding is not None else []
+        except Exception:
+            return []
+    
+    def _calculate_match(
+        self, 
+        student: User, 
+        resume: Resume, 
+        internship: Internship
+    ) -> Optional[Dict]:
+        """
+        Calculate similarity score between a single student and internship.
+        
+        Reference (per-pair) implementation of the scores produced by
+        compute_all_matches. Returns dictionary with match data for insertion.
+        """
         match_result = self.matching_engine.calculate_match_score(
-            candidate_data=candidate_data,
-            internship_data=internship_data,
-            candidate_embedding=candidate_embedding,
-            internship_embedding=internship_embedding
+            candidate_data=self._prepare_candidate_data(resume),
+            internship_data=self._prepare_internship_data(internship),
+            candidate_embedding=self._get_resume_embedding(resume),
+            internship_embedding=self._get_internship_embedding(internship)
         )
         
         # Prepare data for insertion
@@ -227,34 +731,68 @@ class BatchMatchingService:
             'last_computed': datetime.now()
         }
     
-    def compute_matches_for_student(self, student_id: int) -> Dict:
+    def compute_matches_for_student(self, student_id: int, force_recompute: bool = False) -> Dict:
         """
         Compute matches for a specific student (useful after resume upload).
         
         Args:
             student_id: ID of the student to compute matches for
+            force_recompute: If True, recompute all of the student's matches
         
         Returns:
             Dictionary with computation statistics
         """
         logger.info(f"Computing matches for student {student_id}...")
         return self.compute_all_matches(
-            force_recompute=True,
+            force_recompute=force_recompute,
             student_ids=[student_id]
         )
     
-    def compute_matches_for_internship(self, internship_id: int) -> Dict:
+    def compute_matches_for_internship(self, internship_id: int, force_recompute: bool = False) -> Dict:
         """
         Compute matches for a specific internship (useful after internship posting).
         
         Args:
             internship_id: ID of the internship to compute matches for
+            force_recompute: If True, recompute all of the internship's matches
         
         Returns:
             Dictionary with computation statistics
         """
         logger.info(f"Computing matches for internship {internship_id}...")
         return self.compute_all_matches(
-            force_recompute=True,
+            force_recompute=force_recompute,
             internship_ids=[internship_id]
         )
+
+
+def run_match_job(
+    job_id: str,
+    force_recompute: bool = False,
+    student_ids: Optional[List[int]] = None,
+    internship_ids: Optional[List[int]] = None,
+    workers: Optional[int] = None
+):
+    """
+    Run a batch matching job with its own database session (for background tasks).
+    
+    Progress and the final statistics are recorded on the MatchJob with job_id.
+    """
+    db = SessionLocal()
+    tracker = MatchJobTracker(job_id)
+    try:
+        BatchMatchingService(db).compute_all_matches(
+            force_recompute=force_recompute,
+            student_ids=student_ids,
+            internship_ids=internship_ids,
+            workers=workers,
+            tracker=tracker
+        )
+    except Exception as e:
+        import traceback
+        logger.error(f"  Match job {job_id} failed: {str(e)}")
+        logger.error(traceback.format_exc())
+        db.rollback()
+        tracker.fail(str(e))
+    finally:
+        db.close()
@@ -0,0 +1,252 @@
+"""
+Candidate Export Service - Streaming CSV/XLSX writers for export-candidates
+
+- Rows come from a server-side cursor (Query.yield_per), one batch at a time
+- CSV is produced as a generator of encoded chunks, so the download starts with
+  the first batch and memory stays bounded by EXPORT_BATCH_SIZE rows
+- XLSX uses openpyxl's write-only mode with named styles registered once; rows
+  are spilled to a temporary file and the finished workbook is streamed from it
+"""
+
+import os
+import tempfile
+import logging
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Bytes of CSV buffered before a chunk is sent
+CSV_CHUNK_BYTES = 64 * 1024
+# Bytes per read when streaming the finished XLSX file
+XLSX_READ_BYTES = 1024 * 1024
+
+HEADERS = [
+    'Candidate Name', 'Email', 'Phone', 'Match Score (%)', 'Top Matching Skills',
+    'Experience (Years)', 'Education Level', 'Application Date', 'Application Status',
+    'Key Strengths', 'Semantic Match (%)', 'Skills Match (%)', 'Experience Match (%)'
+]
+PHONE_COLUMN = HEADERS.index('Phone')
+SCORE_COLUMN = HEADERS.index('Match Score (%)')
+# Column widths for write-only sheets (fixed up front, data cannot be measured first)
+COLUMN_WIDTHS = [25, 30, 18, 16, 40, 18, 30, 28, 20, 40, 20, 18, 22]
+
+
+class CandidateExportService:
+    """Turns (match, user, resume, application) rows into export rows and files"""
+
+    @staticmethod
+    def export_row(match, user, resume, application, required_skills: List[str], format: str) -> List:
+        """
+        One export row, values in HEADERS order
+
+        Args:
+            match: StudentInternshipMatch
+            user: Candidate User
+            resume: Candidate's active Resume
+            application: Application or None
+            required_skills: Internship required skills
+            format: 'csv' or 'xlsx' (phone formatting differs)
+
+        Returns:
+            List of cell values
+        """
+        parsed_data = resume.parsed_data or {}
+        personal_info = parsed_data.get('personal_info', {})
+
+        # Get top matching skills
+        candidate_skills = parsed_data.get('all_skills', [])
+        required_lower = [rs.lower() for rs in required_skills]
+        matched_skills = [s for s in candidate_skills if s.lower() in required_lower]
+        top_skills = ', '.join(matched_skills[:5]) if matched_skills else 'N/A'
+
+        # Get education level
+        education = parsed_data.get('education', [])
+        education_level_str = education[0].get('degree', 'N/A') if education else 'N/A'
+
+        # Get key strengths (from projects and certifications)
+        projects = parsed_data.get('projects', [])
+        certifications = parsed_data.get('certifications', [])
+        key_strengths = []
+        if projects:
+            key_strengths.append(f"{len(projects)} projects")
+        if certifications:
+            key_strengths.append(f"{len(certifications)} certifications")
+        if matched_skills:
+            key_strengths.append(f"{len(matched_skills)}/{len(required_skills)} required skills")
+        key_strengths_str = ', '.join(key_strengths) if key_strengths else 'Basic qualification'
+
+        return [
+            user.full_name,
+            user.email,
+            CandidateExportService.format_phone(personal_info.get('phone', 'N/A'), format),
+            round(match.base_similarity_score, 2),
+            top_skills,
+            parsed_data.get('total_experience_years', 0),
+            education_level_str,
+            str(application.created_at) if application else 'Not Applied',
+            application.status if application else 'Not Applied',
+            key_strengths_str,
+            round(match.semantic_similarity, 2) if match.semantic_similarity is not None else None,
+            round(match.skills_match_score, 2) if match.skills_match_score is not None else None,
+            round(match.experience_match_score, 2) if match.experience_match_score is not None else None
+        ]
+
+    @staticmethod
+    def format_phone(phone: Optional[str], format: str) -> Optional[str]:
+        """
+        Phone with country code: plain text for XLSX (the cell is text-formatted),
+        a ="..." formula for CSV so spreadsheet apps keep it as text
+        """
+        if phone == 'N/A' or not phone:
+            return phone
+        # Ensure phone has proper format with country code
+        if not phone.startswith('+'):
+            phone = f"+{phone}"
+        # Format as +91 9876543210 (with space after country code)
+        if phone.startswith('+91-'):
+            phone = phone.replace('+91-', '+91 ')
+        return phone if format == 'xlsx' else f'="{phone}"'
+
+    @staticmethod
+    def csv_line(values: List) -> str:
+        """CSV line; the phone formula is written unquoted"""
+        row_values = []
+        for index, value in enumerate(values):
+            value_str = str(value)
+            if index == PHONE_COLUMN and value_str.startswith('="'):
+                # Don't add extra quotes for formula cells
+                row_values.append(value_str)
+            elif ',' in value_str or '"' in value_str or '\n' in value_str:
+                # Quote fields that contain commas, quotes, or newlines
+                value_str = value_str.replace('"', '""')
+                row_values.append(f'"{value_str}"')
+            else:
+                row_values.append(value_str)
+        return ','.join(row_values) + '\n'
+
+    @staticmethod
+    def stream_csv(rows: Iterable[List]) -> Iterator[bytes]:
+        """
+        Encode export rows as CSV chunks of about CSV_CHUNK_BYTES
+
+        The header is written with the first row (no rows -> empty body).
+        """
+        buffer = []
+        size = 0
+        for count, values in enumerate(rows):
+            if count == 0:
+                buffer.append(','.join(HEADERS) + '\n')
+            line = CandidateExportService.csv_line(values)
+            buffer.append(line)
+            size += len(line)
+            if size >= CSV_CHUNK_BYTES:
+                yield ''.join(buffer).encode('utf-8')
+                buffer = []
+                size = 0
+        if buffer:
+            yield ''.join(buffer).encode('utf-8')
+
+    @staticmethod
+    def _register_styles(wb: Workbook):
+        """Named styles shared by every cell (registered once per workbook)"""
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        styles = [
+            NamedStyle(name='export_title', font=Font(bold=True, size=14)),
+            NamedStyle(name='export_subtitle', font=Font(size=10, italic=True)),
+            NamedStyle(
+                name='export_header', font=Font(bold=True, color="FFFFFF", size=12), border=border,
+                fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+                alignment=Alignment(horizontal="center", vertical="center", wrap_text=True)
+            ),
+            NamedStyle(name='export_cell', border=border),
+            # Phone numbers as text to prevent formula interpretation
+            NamedStyle(name='export_phone', border=border, number_format='@'),
+            # Match score colour bands: light green / light orange / light red
+            NamedStyle(name='export_score_high', border=border,
+                       fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")),
+            NamedStyle(name='export_score_mid', border=border,
+                       fill=PatternFill(start_color="FFE0B2", end_color="FFE0B2", fill_type="solid")),
+            NamedStyle(name='export_score_low', border=border,
+                       fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid")),
+        ]
+        for style in styles:
+            wb.add_named_style(style)
+
+    @staticmethod
+    def _cell(ws, value, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    @staticmethod
+    def write_xlsx(rows: Iterable[List], title: str, total: int, output) -> int:
+        """
+        Write export rows to an XLSX file with a write-only workbook
+
+        Args:
+            rows: Export rows (HEADERS order), consumed once
+            title: Internship title for the heading
+            total: Candidate count shown in the heading
+            output: Path or binary file object
+
+        Returns:
+            Number of rows written
+        """
+        wb = Workbook(write_only=True)
+        CandidateExportService._register_styles(wb)
+        ws = wb.create_sheet("Candidate Rankings")
+        for index, width in enumerate(COLUMN_WIDTHS, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+
+        cell = CandidateExportService._cell
+        ws.append([cell(ws, f"Candidate Rankings - {title}", 'export_title')])
+        ws.append([cell(
+            ws, f"Exported on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Total Candidates: {total}",
+            'export_subtitle'
+        )])
+        ws.append([])
+        ws.append([cell(ws, header, 'export_header') for header in HEADERS])
+
+        written = 0
+        for values in rows:
+            cells = [cell(ws, value, 'export_cell') for value in values]
+            cells[PHONE_COLUMN].style = 'export_phone'
+            score = values[SCORE_COLUMN]
+            cells[SCORE_COLUMN].style = (
+                'export_score_high' if score >= 80 else 'export_score_mid' if score >= 60 else 'export_score_low'
+            )
+            ws.append(cells)
+            written += 1
+
+        wb.save(output)
+        return written
+
+    @staticmethod
+    def stream_xlsx(rows: Iterable[List], title: str, total: int) -> Iterator[bytes]:
+        """
+        Build the workbook in a temporary file, then stream it in chunks
+
+        An XLSX file is a zip archive that is only complete once every row is
+        written, so bytes flow after the last row; memory stays bounded.
+        """
+        with tempfile.TemporaryFile() as spool:
+            written = CandidateExportService.write_xlsx(rows, title, total, spool)
+            logger.info(f"📊 XLSX export written: {written} rows, {spool.tell()} bytes")
+            spool.seek(0)
+            while True:
+                chunk = spool.read(XLSX_READ_BYTES)
+                if not chunk:
+                    break
+                yield chunk
@@ -9,18 +9,25 @@ This service identifies potential duplicate candidate profiles by comparing:
 **Important:** Only candidates who have uploaded at least one active resume are flagged.
 This ensures we only flag active candidates who are actually participating in the platform,
 reducing false positives from incomplete or inactive profiles.
+
+Normalized contact values live in the candidate_contact_keys table, kept up to date
+by sync_contact_keys on profile edits, so flag lookups are indexed queries.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, exists
 from typing import List, Dict, Optional
 from app.models.user import User, UserRole
+from app.models.candidate_contact_key import CandidateContactKey
 import logging
 import re
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Flag reasons, in display order
+FLAG_REASONS = ['same_mobile', 'same_linkedin', 'same_github']
+
 
 class CandidateFlaggingService:
     """
@@ -76,6 +83,147 @@ class CandidateFlaggingService:
         
         return digits if digits else None
     
+    @staticmethod
+    def contact_keys(user: User) -> Dict[str, str]:
+        """
+        Normalized contact keys of a student, by flag reason
+        
+        Args:
+            user: The user whose phone/LinkedIn/GitHub are normalized
+        
+        Returns:
+            Dictionary like {'same_mobile': '15551234567', 'same_github': 'github.com/jane'}
+            (empty for non-students)
+        """
+        if user.role != UserRole.student:
+            return {}
+        keys = {
+            'same_mobile': CandidateFlaggingService.normalize_phone(user.phone),
+            'same_linkedin': CandidateFlaggingService.normalize_url(user.linkedin_url),
+            'same_github': CandidateFlaggingService.normalize_url(user.github_url)
+        }
+        return {key_type: value for key_type, value in keys.items() if value}
+    
+    @staticmethod
+    def sync_contact_keys(db: Session, user: User) -> None:
+        """
+        Bring the user's rows in candidate_contact_keys in line with their profile
+        
+        Call after changing phone, linkedin_url or github_url; the caller commits.
+        
+        Args:
+            db: Database session
+            user: The (possibly modified) user
+        """
+        wanted = CandidateFlaggingService.contact_keys(user)
+        existing = {
+            key.key_type: key for key in db.query(CandidateContactKey).filter(
+                CandidateContactKey.student_id == user.id
+            )
+        }
+        for key_type, key in existing.items():
+            if key_type not in wanted:
+                db.delete(key)
+            elif key.key_value != wanted[key_type]:
+                key.key_value = wanted[key_type]
+        for key_type, value in wanted.items():
+            if key_type not in existing:
+                db.add(CandidateContactKey(student_id=user.id, key_type=key_type, key_value=value))
+    
+    @staticmethod
+    def rebuild_contact_keys(db: Session, batch_size: int = 1000) -> int:
+        """
+        Recreate candidate_contact_keys for every student (backfill / repair)
+        
+        Args:
+            db: Database session
+            batch_size: Students loaded per batch
+        
+        Returns:
+            Number of contact keys written
+        """
+        db.query(CandidateContactKey).delete(synchronize_session=False)
+        written = 0
+        last_id = 0
+        while True:
+            students = db.query(User).filter(
+                User.role == UserRole.student,
+                User.id > last_id
+            ).order_by(User.id).limit(batch_size).all()
+            if not students:
+                break
+            rows = [
+                {'student_id': student.id, 'key_type': key_type, 'key_value': value}
+                for student in students
+                for key_type, value in CandidateFlaggingService.contact_keys(student).items()
+            ]
+            db.bulk_insert_mappings(CandidateContactKey, rows)
+            written += len(rows)
+            last_id = students[-1].id
+        db.commit()
+        logger.info(f"✅ Rebuilt {written} contact keys")
+        return written
+    
+    @staticmethod
+    def _has_active_resume(student_id):
+        """SQL condition: the student has uploaded at least one active resume"""
+        from app.models.resume import Resume
+        
+        return exists().where(Resume.student_id == student_id, Resume.is_active == 1)
+    
+    @staticmethod
+    def is_flagged(student_id):
+        """
+        SQL condition: the student shares a contact key with another student
+        
+        Both students must have an active resume. Usable in any query over a
+        student id column (e.g. to exclude flagged candidates in SQL).
+        
+        Args:
+            student_id: Student id column / expression
+        
+        Returns:
+            SQLAlchemy boolean clause
+        """
+        mine = aliased(CandidateContactKey)
+        other = aliased(CandidateContactKey)
+        shared = exists().where(
+            mine.student_id == student_id,
+            other.key_type == mine.key_type,
+            other.key_value == mine.key_value,
+            other.student_id != mine.student_id,
+            CandidateFlaggingService._has_active_resume(other.student_id)
+        )
+        return and_(shared, CandidateFlaggingService._has_active_resume(student_id))
+    
+    @staticmethod
+    def _flag_info(db: Session, candidate_ids: Optional[List[int]] = None) -> Dict[int, Dict]:
+        """Flag info from one self-join of candidate_contact_keys (all students when no IDs)"""
+        mine = aliased(CandidateContactKey)
+        other = aliased(CandidateContactKey)
+        query = db.query(mine.student_id, mine.key_type, other.student_id).join(
+            other, and_(
+                other.key_type == mine.key_type,
+                other.key_value == mine.key_value,
+                other.student_id != mine.student_id
+            )
+        ).filter(
+            CandidateFlaggingService._has_active_resume(mine.student_id),
+            CandidateFlaggingService._has_active_resume(other.student_id)
+        )
+        if candidate_ids is not None:
+            query = query.filter(mine.student_id.in_(candidate_ids))
+        
+        flagged_candidates = {}
+        for student_id, reason, other_id in query.order_by(mine.student_id, other.student_id):
+            info = flagged_candidates.setdefault(student_id, {'reasons': [], 'flagged_with': {}})
+            info['flagged_with'].setdefault(reason, []).append(other_id)
+        
+        # Reasons in a stable order: mobile, LinkedIn, GitHub
+        for info in flagged_candidates.values():
+            info['reasons'] = [reason for reason in FLAG_REASONS if reason in info['flagged_with']]
+        return flagged_candidates
+    
     @staticmethod
     def detect_flagged_candidates(db: Session) -> Dict[int, Dict]:
         """
@@ -83,6 +231,7 @@ class CandidateFlaggingService:
         
         Only flags candidates who have uploaded at least one resume.
         This ensures we only flag active candidates who are actually participating.
+        Reads the candidate_contact_keys index (see sync_contact_keys).
         
         Returns a dictionary mapping student_id to flag information:
         {
@@ -96,110 +245,9 @@ class CandidateFlaggingService:
             }
         }
         """
-        from app.models.resume import Resume
-        
         logger.info("🔍 Starting candidate flagging detection...")
-        
-        # Get all students who have uploaded at least one resume
-        # Only flag active candidates with resumes
-        students_with_resumes = db.query(User.id).join(
-            Resume, Resume.student_id == User.id
-        ).filter(
-            User.role == UserRole.student,
-            Resume.is_active == 1
-        ).distinct().all()
-        
-        student_ids_with_resumes = {student.id for student in students_with_resumes}
-        
-        logger.info(f"📊 Total students with resumes: {len(student_ids_with_resumes)}")
-        
-        # Get all students with contact info who have uploaded resumes
-        students = db.query(User).filter(
-            User.role == UserRole.student,
-            User.id.in_(student_ids_with_resumes)
-        ).all()
-        
-        # Build normalized lookup maps
-        phone_map = {}  # normalized_phone -> [student_ids]
-        linkedin_map = {}  # normalized_linkedin -> [student_ids]
-        github_map = {}  # normalized_github -> [student_ids]
-        
-        for student in students:
-            # Normalize and map phone
-            if student.phone:
-                normalized_phone = CandidateFlaggingService.normalize_phone(student.phone)
-                if normalized_phone:
-                    if normalized_phone not in phone_map:
-                        phone_map[normalized_phone] = []
-                    phone_map[normalized_phone].append(student.id)
-            
-            # Normalize and map LinkedIn
-            if student.linkedin_url:
-                normalized_linkedin = CandidateFlaggingService.normalize_url(student.linkedin_url)
-                if normalized_linkedin:
-                    if normalized_linkedin not in linkedin_map:
-                        linkedin_map[normalized_linkedin] = []
-                    linkedin_map[normalized_linkedin].append(student.id)
-            
-            # Normalize and map GitHub
-            if student.github_url:
-                normalized_github = CandidateFlaggingService.normalize_url(student.github_url)
-                if normalized_github:
-                    if normalized_github not in github_map:
-                        github_map[normalized_github] = []
-                    github_map[normalized_github].append(student.id)
-        
-        # Find duplicates (groups with more than 1 student)
-        flagged_candidates = {}
-        
-        # Check phone duplicates
-        for normalized_phone, student_ids in phone_map.items():
-            if len(student_ids) > 1:
-                logger.warning(f"⚠️ Found {len(student_ids)} students with same phone: {normalized_phone}")
-                for student_id in student_ids:
-                    if student_id not in flagged_candidates:
-                        flagged_candidates[student_id] = {
-                            'reasons': [],
-                            'flagged_with': {}
-                        }
-                    flagged_candidates[student_id]['reasons'].append('same_mobile')
-                    # Store OTHER students with same phone
-                    flagged_candidates[student_id]['flagged_with']['same_mobile'] = [
-                        sid for sid in student_ids if sid != student_id
-                    ]
-        
-        # Check LinkedIn duplicates
-        for normalized_linkedin, student_ids in linkedin_map.items():
-            if len(student_ids) > 1:
-                logger.warning(f"⚠️ Found {len(student_ids)} students with same LinkedIn: {normalized_linkedin}")
-                for student_id in student_ids:
-                    if student_id not in flagged_candidates:
-                        flagged_candidates[student_id] = {
-                            'reasons': [],
-                            'flagged_with': {}
-                        }
-                    flagged_candidates[student_id]['reasons'].append('same_linkedin')
-                    flagged_candidates[student_id]['flagged_with']['same_linkedin'] = [
-                        sid for sid in student_ids if sid != student_id
-                    ]
-        
-        # Check GitHub duplicates
-        for normalized_github, student_ids in github_map.items():
-            if len(student_ids) > 1:
-                logger.warning(f"⚠️ Found {len(student_ids)} students with same GitHub: {normalized_github}")
-                for student_id in student_ids:
-                    if student_id not in flagged_candidates:
-                        flagged_candidates[student_id] = {
-                            'reasons': [],
-                            'flagged_with': {}
-                        }
-                    flagged_candidates[student_id]['reasons'].append('same_github')
-                    flagged_candidates[student_id]['flagged_with']['same_github'] = [
-                        sid for sid in student_ids if sid != student_id
-                    ]
-        
+        flagged_candidates = CandidateFlaggingService._flag_info(db)
         logger.info(f"✅ Flagging detection complete. Found {len(flagged_candidates)} flagged candidates")
-        
         return flagged_candidates
     
     @staticmethod
@@ -210,24 +258,18 @@ class CandidateFlaggingService:
         """
         Get flagging information for a specific list of candidates
         
+        One indexed query on candidate_contact_keys, independent of platform size.
+        
         Args:
             candidate_ids: List of candidate/student IDs to check
             db: Database session
-            
+        
         Returns:
             Dictionary mapping candidate_id to flag info
         """
-        # Get all flagged candidates globally
-        all_flagged = CandidateFlaggingService.detect_flagged_candidates(db)
-        
-        # Filter to only requested candidates
-        result = {}
-        for candidate_id in candidate_ids:
-            if candidate_id in all_flagged:
-                result[candidate_id] = all_flagged[candidate_id]
-        
-        return result
-    
+        if not candidate_ids:
+            return {}
+        return CandidateFlaggingService._flag_info(db, list(candidate_ids))
     @staticmethod
     def format_flag_reason(reasons: List[str]) -> str:
         """
@@ -0,0 +1,361 @@
+"""
+Candidate Ranking Service - SQL query layer behind rank-candidates
+
+- Applicant scores (80% tailored + 20% base, or base only) are materialized on
+  applications and recomputed only for rows that are unscored or whose base
+  match, applied resume or internship changed since (ranking_computed_at), so
+  ranking no longer re-scores the whole pool
+- Score, experience, skills, education and flagged filters, the sort and
+  LIMIT/OFFSET run in the database over applications, resumes and
+  student_internship_matches; only one page of rows is ever loaded
+- Experience and education level come from the typed columns the Resume model
+  derives from parsed_data; skills from the normalized resume_skills table
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+
+from sqlalchemy import and_, or_, case, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.user import User
+from app.models.internship import Internship
+from app.models.resume import Resume, EDUCATION_LEVELS
+from app.models.application import Application
+from app.models.student_internship_match import StudentInternshipMatch
+from app.models.skill import Skill, ResumeSkill
+from app.services.candidate_flagging_service import CandidateFlaggingService
+
+logger = logging.getLogger(__name__)
+
+TAILORED_WEIGHT = 0.8
+BASE_WEIGHT = 0.2
+
+
+class CandidateRankingService:
+    """
+    Materializes applicant scores and pages ranked candidates with SQL filters.
+
+    Usage:
+        ranking = CandidateRankingService(rag_engine, matching_engine)
+        ranking.refresh_applicant_scores(db, internship)
+        page = ranking.rank_applicants(db, internship.id, offset=0, limit=50, min_score=60)
+    """
+
+    def __init__(self, rag_engine, matching_engine):
+        self.rag_engine = rag_engine
+        self.matching_engine = matching_engine
+
+    @staticmethod
+    def parse_skills(filter_skills: Optional[str]) -> List[str]:
+        """Comma-separated skill filter -> lowercased substrings"""
+        if not filter_skills:
+            return []
+        return [s.strip().lower() for s in filter_skills.split(',')]
+
+    @staticmethod
+    def education_rank(education_level: Optional[str]) -> int:
+        """Minimum education level name (Bachelor, Master, PhD) -> level, 0 when unknown"""
+        if not education_level:
+            return 0
+        return EDUCATION_LEVELS.get(education_level.lower(), 0)
+
+    @staticmethod
+    def skills_condition(resume_ids: List, skills: List[str], match_all: bool = True):
+        """
+        SQL condition: the resume(s) list skills containing the given substrings
+
+        Matching skill names are looked up in the small skills table, then the
+        resumes through the resume_skills (skill_id, resume_id) index.
+
+        Args:
+            resume_ids: Resume id columns; a skill may be found on any of them
+            skills: Lowercased substrings
+            match_all: Every substring must match (otherwise any one)
+
+        Returns:
+            SQLAlchemy boolean clause
+        """
+        def having(*substrings):
+            resumes = select(ResumeSkill.resume_id).join(Skill, Skill.id == ResumeSkill.skill_id).where(
+                or_(*[Skill.name.contains(substring, autoescape=True) for substring in substrings])
+            )
+            return or_(*[resume_id.in_(resumes) for resume_id in resume_ids])
+
+        if match_all:
+            return and_(*[having(skill) for skill in skills])
+        return having(*skills)
+
+    @staticmethod
+    def _stale_applications(db: Session, internship_id: int):
+        """
+        Applications never scored, or scored before their inputs changed
+
+        An application is stale when its base match appeared, disappeared or changed
+        score, or when the applied resume or the internship (requirements, skills)
+        was updated after ranking_computed_at. Applications that could not be scored
+        keep a NULL score with ranking_computed_at set and are not retried until
+        one of these inputs changes.
+        """
+        computed_at = Application.ranking_computed_at
+        return db.query(Application, Resume, StudentInternshipMatch).join(
+            Resume, Application.resume_id == Resume.id
+        ).join(
+            Internship, Application.internship_id == Internship.id
+        ).outerjoin(
+            StudentInternshipMatch, and_(
+                StudentInternshipMatch.student_id == Application.student_id,
+                StudentInternshipMatch.internship_id == Application.internship_id
+            )
+        ).filter(
+            Application.internship_id == internship_id,
+            or_(
+                computed_at.is_(None),
+                and_(StudentInternshipMatch.id.is_(None), Application.ranking_base_score.isnot(None)),
+                and_(StudentInternshipMatch.id.isnot(None), or_(
+                    Application.ranking_base_score.is_(None),
+                    Application.ranking_base_score != StudentInternshipMatch.base_similarity_score
+                )),
+                func.coalesce(Resume.updated_at, Resume.created_at) > computed_at,
+                func.coalesce(Internship.updated_at, Internship.created_at) > computed_at
+            )
+        ).all()
+    
+    def refresh_applicant_scores(self, db: Session, internship: Internship) -> int:
+        """
+        Score the internship's stale applications and store the result on each row
+
+        Args:
+            db: Database session
+            internship: Internship whose applications are ranked
+
+        Returns:
+            Number of applications (re)scored
+        """
+        stale = self._stale_applications(db, internship.id)
+        if not stale:
+            return 0
+
+        # Embeddings in bulk: the stale tailored resumes + the internship once
+        # Note: the RAG getters expect IDs without "resume_" prefix
+        tailored_resumes = [r for _, r, _ in stale if r.is_tailored == 1 and r.embedding_id]
+        tailored_embeddings = {}
+        internship_embedding = []
+        if tailored_resumes:
+            tailored_matrix, tailored_missing = self.rag_engine.get_resume_embeddings(
+                [r.embedding_id.replace('resume_', '') for r in tailored_resumes]
+            )
+            tailored_embeddings = {
+                r.id: row.tolist()
+                for r, row, missing in zip(tailored_resumes, tailored_matrix, tailored_missing) if not missing
+            }
+            internship_matrix, internship_missing = self.rag_engine.get_internship_embeddings([str(internship.id)])
+            internship_embedding = [] if internship_missing[0] else internship_matrix[0].tolist()
+
+        internship_data = {
+            'required_skills': internship.required_skills or [],
+            'preferred_skills': internship.preferred_skills or [],
+            'min_experience': internship.min_experience or 0,
+            'max_experience': internship.max_experience or 10,
+            'required_education': internship.required_education or ''
+        }
+
+        computed_at = datetime.now(timezone.utc)
+        updates = []
+        for application, resume, base_match in stale:
+            tailored_embedding = tailored_embeddings.get(resume.id)
+            if resume.is_tailored == 1 and not tailored_embedding:
+                logger.warning(f"⚠️ Tailored resume {resume.id} has no embedding, falling back to base resume scoring")
+
+            tailored_score = None
+            if tailored_embedding:
+                parsed = resume.parsed_data or {}
+                result = self.matching_engine.calculate_match_score(
+                    candidate_data={
+                        'all_skills': parsed.get('all_skills', []),
+                        'total_experience_years': resume.experience_years or 0,
+                        'education': parsed.get('education', []),
+                        'certifications': parsed.get('certifications', [])
+                    },
+                    internship_data=internship_data,
+                    candidate_embedding=tailored_embedding,
+                    internship_embedding=internship_embedding
+                )
+                tailored_score = result['overall_score']
+                tailored = result.get('component_scores', {})
+                scores = [tailored_score, tailored.get('semantic_similarity') or 0,
+                          tailored.get('skills_match') or 0, tailored.get('experience_match') or 0]
+                if base_match:
+                    base = [base_match.base_similarity_score, base_match.semantic_similarity or 0,
+                            base_match.skills_match_score or 0, base_match.experience_match_score or 0]
+                    scores = [t * TAILORED_WEIGHT + b * BASE_WEIGHT for t, b in zip(scores, base)]
+                else:
+                    logger.warning(f"⚠️ No base match found for student {application.student_id}, using tailored score only")
+            elif base_match:
+                scores = [base_match.base_similarity_score, base_match.semantic_similarity or 0,
+                          base_match.skills_match_score or 0, base_match.experience_match_score or 0]
+            else:
+                # Sentinel: stamped with a NULL score so it is not re-queried until its inputs change
+                logger.error(f"  No base match or tailored resume for student {application.student_id}, not ranked")
+                updates.append({
+                    'id': application.id,
+                    'ranking_score': None,
+                    'ranking_base_score': None,
+                    'ranking_components': None,
+                    'ranking_computed_at': computed_at
+                })
+                continue
+
+            final_score, semantic_similarity, skills_match, experience_match = scores
+            updates.append({
+                'id': application.id,
+                'ranking_score': round(final_score, 2),
+                'ranking_base_score': base_match.base_similarity_score if base_match else None,
+                'ranking_components': {
+                    'semantic_similarity': round(semantic_similarity, 2),
+                    'skills_match': round(skills_match, 2),
+                    'experience_match': round(experience_match, 2),
+                    'tailored_score': round(tailored_score, 2) if tailored_score is not None else None,
+                    'has_tailored': tailored_score is not None
+                },
+                'ranking_computed_at': computed_at
+            })
+
+        if updates:
+            db.bulk_update_mappings(Application, updates)
+            db.commit()
+        scored = sum(1 for update in updates if update['ranking_score'] is not None)
+        logger.info(f"📊 Scored {scored}/{len(stale)} new or stale applications for internship {internship.id}")
+        return scored
+
+    @staticmethod
+    def _filters(
+        score,
+        experience,
+        resume_ids: List,
+        education,
+        student_id,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None,
+        skills: Optional[List[str]] = None,
+        min_education: int = 0,
+        exclude_flagged: bool = False
+    ) -> List:
+        """SQL conditions shared by the applicant and discovery rankings"""
+        conditions = []
+        if min_score is not None:
+            conditions.append(score >= min_score)
+        if max_score is not None:
+            conditions.append(score <= max_score)
+        if min_experience is not None:
+            conditions.append(experience >= min_experience)
+        if max_experience is not None:
+            conditions.append(experience <= max_experience)
+        # Every requested skill must be a substring of some skill on any of the resumes
+        if skills:
+            conditions.append(CandidateRankingService.skills_condition(resume_ids, skills))
+        if min_education:
+            conditions.append(func.coalesce(education, 0) >= min_education)
+        if exclude_flagged:
+            conditions.append(~CandidateFlaggingService.is_flagged(student_id))
+        return conditions
+
+    def rank_applicants(self, db: Session, internship_id: int, offset: int = 0, limit: int = 50, **filters) -> Dict:
+        """
+        One page of scored applicants, best first
+
+        Experience is the applied resume's, falling back to the base resume's when
+        zero; skills match on either resume; education is the applied resume's.
+
+        Args:
+            db: Database session
+            internship_id: Internship primary key
+            offset: Rows to skip
+            limit: Page size
+            **filters: min_score, max_score, min_experience, max_experience,
+                skills, min_education, exclude_flagged
+
+        Returns:
+            Dictionary with 'rows' [(Application, User, applied Resume, base Resume or None)],
+            'total' (after filters) and 'total_before_filter'
+        """
+        applied_resume = aliased(Resume)
+        base_resume = aliased(Resume)
+        base_resume_id = db.query(func.min(Resume.id)).filter(
+            Resume.student_id == Application.student_id,
+            Resume.is_active == 1,
+            Resume.is_tailored == 0
+        ).correlate(Application).scalar_subquery()
+
+        query = db.query(Application, User, applied_resume, base_resume).join(
+            User, Application.student_id == User.id
+        ).join(
+            applied_resume, Application.resume_id == applied_resume.id
+        ).outerjoin(
+            base_resume, base_resume.id == base_resume_id
+        ).filter(
+            Application.internship_id == internship_id,
+            Application.ranking_score.isnot(None),
+            User.is_active == 1  # Only show active students in rankings
+        )
+        total_before_filter = query.count()
+
+        applied_experience = func.coalesce(applied_resume.experience_years, 0)
+        experience = case(
+            (applied_experience == 0, func.coalesce(base_resume.experience_years, 0)),
+            else_=applied_experience
+        )
+        conditions = self._filters(
+            Application.ranking_score, experience,
+            [applied_resume.id, base_resume.id],
+            applied_resume.education_level, Application.student_id, **filters
+        )
+        if conditions:
+            query = query.filter(*conditions)
+
+        total = query.count() if conditions else total_before_filter
+        rows = query.order_by(
+            Application.ranking_score.desc(), Application.id
+        ).offset(offset).limit(limit).all()
+        return {'rows': rows, 'total': total, 'total_before_filter': total_before_filter}
+
+    def rank_matches(self, db: Session, internship_id: int, offset: int = 0, limit: int = 50, **filters) -> Dict:
+        """
+        One page of pre-computed matches (all students), best first
+
+        Args:
+            db: Database session
+            internship_id: Internship primary key
+            offset: Rows to skip
+            limit: Page size
+            **filters: Same keys as rank_applicants
+
+        Returns:
+            Dictionary with 'rows' [(StudentInternshipMatch, User, Resume)],
+            'total' (after filters) and 'total_before_filter'
+        """
+        query = db.query(StudentInternshipMatch, User, Resume).join(
+            User, StudentInternshipMatch.student_id == User.id
+        ).join(
+            Resume, StudentInternshipMatch.resume_id == Resume.id
+        ).filter(
+            StudentInternshipMatch.internship_id == internship_id,
+            User.is_active == 1  # Only show active students in rankings
+        )
+        total_before_filter = query.count()
+
+        conditions = self._filters(
+            StudentInternshipMatch.base_similarity_score, func.coalesce(Resume.experience_years, 0),
+            [Resume.id], Resume.education_level, StudentInternshipMatch.student_id, **filters
+        )
+        if conditions:
+            query = query.filter(*conditions)
+
+        total = query.count() if conditions else total_before_filter
+        rows = query.order_by(
+            StudentInternshipMatch.base_similarity_score.desc(), StudentInternshipMatch.id
+        ).offset(offset).limit(limit).all()
+        return {'rows': rows, 'total': total, 'total_before_filter': total_before_filter}
@@ -0,0 +1,219 @@
+"""
+Embedding Backends - Interchangeable CPU encoders for the sentence embedding model
+
+- "torch": SentenceTransformer in fp32 PyTorch (the original backend)
+- "onnx": the same model exported to ONNX, run with ONNX Runtime
+- "onnx-int8": the model's dynamically int8-quantized ONNX export
+- "server": client of the shared embedding server process (app/services/embedding_server.py)
+
+The ONNX backends tokenize with `tokenizers` and run mean pooling + L2
+normalization in NumPy, so API workers using them never import torch or
+transformers. All backends expose SentenceTransformer's encode() signature,
+so RAGEngine treats them interchangeably.
+
+Selected with EMBEDDING_BACKEND; see tests/test_embedding_backends.py for the
+parity check and scripts/benchmark_embeddings.py for throughput / RSS.
+"""
+
+import os
+import logging
+from typing import List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8", "server")
+
+# Hugging Face repo holding tokenizer.json and the ONNX exports of each model
+HUB_REPOS = {
+    'all-MiniLM-L6-v2': 'sentence-transformers/all-MiniLM-L6-v2'
+}
+
+
+class EmbeddingBackend:
+    """
+    Base class for embedding encoders.
+
+    Subclasses implement _encode_batch(); encode() mirrors
+    SentenceTransformer.encode (a single string returns a vector, a list
+    returns a matrix).
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def cache_namespace(self) -> str:
+        """Embedding cache namespace; vectors from different backends differ slightly"""
+        return self.model_name if self.name == "torch" else f"{self.model_name}+{self.name}"
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Encode one text or a list of texts
+
+        Args:
+            sentences: Text or list of texts
+            batch_size: Texts per forward pass
+
+        Returns:
+            float32 vector (single text) or matrix (list of texts)
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        batches = [self._encode_batch(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)]
+        matrix = np.concatenate(batches, axis=0).astype(np.float32, copy=False)
+        return matrix[0] if single else matrix
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def get_sentence_embedding_dimension(self) -> int:
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """fp32 PyTorch SentenceTransformer (imports torch + transformers)"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        return self.model.encode(sentences, batch_size=batch_size, convert_to_numpy=convert_to_numpy, **kwargs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime encoder (fp32 or int8-quantized export) with NumPy pooling
+
+    Reproduces the SentenceTransformer pipeline of all-MiniLM-L6-v2:
+    WordPiece tokenization truncated to max_seq_length, transformer forward
+    pass, attention-masked mean pooling, L2 normalization.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantized: bool = False,
+        onnx_file: Optional[str] = None,
+        max_seq_length: Optional[int] = None,
+        threads: Optional[int] = None
+    ):
+        """
+        Initialize ONNX backend
+
+        Args:
+            model_name: Sentence embedding model name
+            quantized: Use the int8 dynamically quantized export
+            onnx_file: Model file inside the hub repo, or a local .onnx path
+            max_seq_length: Token truncation length (the model's limit is 256)
+            threads: ONNX Runtime intra-op threads (0 = runtime default)
+        """
+        super().__init__(model_name)
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if quantized else "onnx"
+        default_file = (
+            os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx") if quantized
+            else os.getenv("EMBEDDING_ONNX_FILE", "onnx/model.onnx")
+        )
+        onnx_file = onnx_file or default_file
+        max_seq_length = max_seq_length or int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+        threads = threads if threads is not None else int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+        model_path = onnx_file if os.path.isfile(onnx_file) else self._download(onnx_file)
+        self.tokenizer = Tokenizer.from_file(self._download("tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dimension = int(self.session.get_outputs()[0].shape[-1])
+        logger.info(f"✅ Loaded ONNX embedding model: {model_path}")
+
+    def _download(self, filename: str) -> str:
+        """Resolve a file of the model's hub repo (local HF cache first)"""
+        from huggingface_hub import hf_hub_download
+
+        repo_id = HUB_REPOS.get(self.model_name, self.model_name)
+        try:
+            return hf_hub_download(repo_id, filename, local_files_only=True)
+        except Exception:
+            return hf_hub_download(repo_id, filename)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        }
+
+        # Exports differ in which inputs they declare; feed only those
+        token_embeddings = self.session.run(
+            None, {name: value for name, value in feeds.items() if name in self.input_names}
+        )[0]
+        return self.mean_pool(token_embeddings, attention_mask)
+
+    @staticmethod
+    def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Attention-masked mean over tokens, then L2 normalization"""
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+def create_embedding_backend(name: Optional[str] = None, model_name: str = 'all-MiniLM-L6-v2') -> EmbeddingBackend:
+    """
+    Build the configured embedding backend
+
+    Args:
+        name: "torch", "onnx", "onnx-int8" or "server" (default EMBEDDING_BACKEND, else "torch")
+        model_name: Sentence embedding model name
+
+    Returns:
+        EmbeddingBackend instance
+    """
+    name = (name or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if name == "torch":
+        return SentenceTransformerBackend(model_name)
+    if name == "onnx":
+        return OnnxBackend(model_name)
+    if name == "onnx-int8":
+        return OnnxBackend(model_name, quantized=True)
+    if name == "server":
+        from app.services.embedding_server import EmbeddingServerClient
+        return EmbeddingServerClient(model_name)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}' (expected one of {', '.join(BACKENDS)})")
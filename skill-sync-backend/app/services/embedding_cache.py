@@ -0,0 +1,308 @@
+"""
+Embedding Cache - Content-addressed store for embedding vectors
+
+- Keys are SHA-256 of the model name plus the exact text given to the model,
+  so unchanged text is never encoded twice (across requests, restarts and
+  reindex runs) and a model change never serves stale vectors
+- Vectors live in a local SQLite blob table (float32 bytes)
+- A bounded in-memory LRU sits in front of SQLite for hot texts
+- The disk table is kept under a size budget by evicting least recently used rows
+- Hit/miss counters are exposed via stats()
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-level (memory LRU + SQLite) cache of embedding vectors.
+
+    Usage:
+        cache = EmbeddingCache("all-MiniLM-L6-v2")
+        vectors = cache.get_many(texts)      # None where missing
+        cache.put_many(texts, vectors)
+        cache.stats()
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        path: Optional[str] = None,
+        memory_items: Optional[int] = None,
+        max_disk_mb: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize embedding cache
+
+        Args:
+            model_name: Embedding model name, part of every cache key
+            path: SQLite file for the persistent store
+            memory_items: Max vectors held in the in-memory LRU
+            max_disk_mb: Size budget of the SQLite store before LRU eviction
+            enabled: When False, every lookup misses and nothing is stored
+        """
+        self.model_name = model_name
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.db")
+        self.memory_items = memory_items if memory_items is not None else int(
+            os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "4096")
+        )
+        max_disk_mb = max_disk_mb if max_disk_mb is not None else float(
+            os.getenv("EMBEDDING_CACHE_MAX_MB", "512")
+        )
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.enabled = enabled if enabled is not None else (
+            os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+        )
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+        if self.enabled:
+            try:
+                self._open()
+            except Exception as e:
+                # Degrade to memory-only rather than failing engine start-up
+                logger.warning(f"⚠️  Embedding cache disk store unavailable ({self.path}): {str(e)}")
+                self._conn = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        row = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        self._disk_bytes = int(row[0])
+        logger.info(f"✅ Embedding cache ready at {self.path} ({self._disk_bytes / 1048576:.1f} MB)")
+
+    def key(self, text: str) -> str:
+        """SHA-256 cache key of model name + exact model input"""
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Cached vector for text, or None"""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Cached vectors for many texts
+
+        Args:
+            texts: Exact model inputs
+
+        Returns:
+            Vectors aligned with texts (None where not cached)
+        """
+        if not self.enabled:
+            with self._lock:
+                self._misses += len(texts)
+            return [None] * len(texts)
+
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            disk_keys = {key for key in keys if key not in found}
+            if disk_keys and self._conn is not None:
+                for vector_key, vector in self._read_disk(list(disk_keys)).items():
+                    found[vector_key] = vector
+                    self._remember(vector_key, vector)
+
+            results = []
+            for key in keys:
+                vector = found.get(key)
+                if vector is None:
+                    self._misses += 1
+                    results.append(None)
+                else:
+                    if key in disk_keys:
+                        self._disk_hits += 1
+                    else:
+                        self._memory_hits += 1
+                    results.append(vector.tolist())
+            return results
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Load vectors for keys from SQLite and refresh their LRU timestamp (caller holds the lock)"""
+        found = {}
+        try:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Embedding cache read failed: {str(e)}")
+        return found
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, text: str, vector: List[float]):
+        """Store the vector for text"""
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """
+        Store vectors for many texts
+
+        Args:
+            texts: Exact model inputs
+            vectors: Embeddings aligned with texts
+        """
+        if not self.enabled or not texts:
+            return
+
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            entries[self.key(text)] = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            for key, vector in entries.items():
+                self._remember(key, vector)
+            if self._conn is None:
+                return
+            now = time.time()
+            try:
+                self._conn.execute("BEGIN")
+                for key, vector in entries.items():
+                    blob = vector.tobytes()
+                    previous = self._conn.execute(
+                        "SELECT LENGTH(vector) FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                        (key, blob, now)
+                    )
+                    self._disk_bytes += len(blob) - (previous[0] if previous else 0)
+                self._conn.execute("COMMIT")
+                self._writes += len(entries)
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                logger.warning(f"⚠️  Embedding cache write failed: {str(e)}")
+                return
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the memory LRU, dropping the least recently used entries (caller holds the lock)"""
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete least recently used rows until the store is 10% under budget (caller holds the lock)"""
+        target = int(self.max_disk_bytes * 0.9)
+        try:
+            rows = self._conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used"
+            )
+            doomed = []
+            freed = 0
+            for key, size in rows:
+                if self._disk_bytes - freed <= target:
+                    break
+                doomed.append((key,))
+                freed += size
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+            self._disk_bytes -= freed
+            self._evictions += len(doomed)
+            logger.info(f"🧹 Evicted {len(doomed)} cached embeddings ({freed / 1048576:.1f} MB)")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Embedding cache eviction failed: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Introspection / maintenance
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and store sizes"""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            disk_entries = 0
+            if self._conn is not None:
+                try:
+                    disk_entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "enabled": self.enabled,
+                "model": self.model_name,
+                "path": self.path if self._conn is not None else None,
+                "hits": hits,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.memory_items,
+                "disk_entries": disk_entries,
+                "disk_bytes": self._disk_bytes,
+                "disk_budget_bytes": self.max_disk_bytes
+            }
+
+    def clear(self):
+        """Drop every cached vector (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._disk_bytes = 0
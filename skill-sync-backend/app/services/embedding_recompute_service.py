@@ -122,24 +122,14 @@ class EmbeddingRecomputeService:
             
             # Recompute embedding
             # 1. Generate embedding
-            extracted_skills = resume.extracted_skills or []
-            if isinstance(extracted_skills, str):
-                import json
-                try:
-                    extracted_skills = json.loads(extracted_skills)
-                except:
-                    extracted_skills = []
+            extracted_skills = EmbeddingRecomputeService._resume_skills(resume)
             
             # 2. Store embedding in ChromaDB and get embedding_id
             embedding_id = rag_engine.store_resume_embedding(
                 resume_id=str(resume.id),
                 content=resume.parsed_content,
                 skills=extracted_skills,
-                metadata={
-                    "student_id": resume.student_id,
-                    "file_name": resume.file_name,
-                    "is_tailored": bool(resume.is_tailored)
-                }
+                metadata=rag_engine.resume_metadata(resume)
             )
             
             # 3. Update PostgreSQL with embedding_id and content hash
@@ -226,6 +216,141 @@ class EmbeddingRecomputeService:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _resume_skills(resume: Resume) -> List[str]:
+        """Extracted skills as a list (older rows store a JSON string)"""
+        extracted_skills = resume.extracted_skills or []
+        if isinstance(extracted_skills, str):
+            import json
+            try:
+                extracted_skills = json.loads(extracted_skills)
+            except:
+                extracted_skills = []
+        return extracted_skills
+    
+    @staticmethod
+    def recompute_resume_embeddings(resumes: List[Resume], db: Session) -> List[Dict]:
+        """
+        Recompute embeddings for many resumes with batched encoding
+        
+        Stale resumes are embedded and written to ChromaDB in chunks of
+        EMBEDDING_WRITE_BATCH_SIZE, with one commit per chunk. If a chunk
+        fails, its resumes are retried one by one so a single bad row only
+        fails itself.
+        
+        Args:
+            resumes: Resume objects
+            db: Database session
+            
+        Returns:
+            List of per-resume result dicts (same shape as recompute_resume_embedding)
+        """
+        results = {}
+        stale = []
+        for resume in resumes:
+            if EmbeddingRecomputeService.should_recompute_resume(resume):
+                stale.append(resume)
+            else:
+                results[resume.id] = {
+                    'success': True,
+                    'cached': True,
+                    'resume_id': resume.id,
+                    'message': 'Using cached embedding'
+                }
+        
+        chunk_size = rag_engine.write_batch_size
+        for start in range(0, len(stale), chunk_size):
+            chunk = stale[start:start + chunk_size]
+            try:
+                embedding_ids = rag_engine.store_resume_embeddings([
+                    {
+                        "resume_id": str(resume.id),
+                        "content": resume.parsed_content,
+                        "skills": EmbeddingRecomputeService._resume_skills(resume),
+                        "metadata": rag_engine.resume_metadata(resume)
+                    }
+                    for resume in chunk
+                ])
+                for resume, embedding_id in zip(chunk, embedding_ids):
+                    resume.embedding_id = embedding_id
+                    resume.content_hash = EmbeddingRecomputeService.compute_content_hash(resume.parsed_content)
+                db.commit()
+                for resume in chunk:
+                    results[resume.id] = {
+                        'success': True,
+                        'cached': False,
+                        'resume_id': resume.id,
+                        'message': 'Embedding recomputed successfully'
+                    }
+            except Exception:
+                db.rollback()
+                for resume in chunk:
+                    results[resume.id] = EmbeddingRecomputeService.recompute_resume_embedding(resume, db)
+        
+        return [results[resume.id] for resume in resumes]
+    
+    @staticmethod
+    def recompute_internship_embeddings(internships: List[Internship], db: Session) -> List[Dict]:
+        """
+        Recompute embeddings for many internships with batched encoding
+        
+        Args:
+            internships: Internship objects
+            db: Database session
+            
+        Returns:
+            List of per-internship result dicts (same shape as recompute_internship_embedding)
+        """
+        results = {}
+        stale = []
+        for internship in internships:
+            if EmbeddingRecomputeService.should_recompute_internship(internship):
+                stale.append(internship)
+            else:
+                results[internship.id] = {
+                    'success': True,
+                    'cached': True,
+                    'internship_id': internship.id,
+                    'message': 'Using cached embedding'
+                }
+        
+        chunk_size = rag_engine.write_batch_size
+        for start in range(0, len(stale), chunk_size):
+            chunk = stale[start:start + chunk_size]
+            try:
+                rag_engine.store_internship_embeddings([
+                    {
+                        "internship_id": str(internship.id),
+                        "title": internship.title,
+                        "description": internship.description,
+                        "required_skills": internship.required_skills or [],
+                        "metadata": {
+                            "company_id": internship.company_id,
+                            "location": internship.location
+                        }
+                    }
+                    for internship in chunk
+                ])
+                for internship in chunk:
+                    content = f"{internship.title}\n{internship.description}"
+                    if internship.required_skills:
+                        content += f"\n{' '.join(internship.required_skills)}"
+                    internship.content_hash = EmbeddingRecomputeService.compute_content_hash(content)
+                db.commit()
+                for internship in chunk:
+                    results[internship.id] = {
+                        'success': True,
+                        'cached': False,
+                        'internship_id': internship.id,
+                        'message': 'Embedding recomputed successfully'
+                    }
+            except Exception:
+                db.rollback()
+                for internship in chunk:
+                    results[internship.id] = EmbeddingRecomputeService.recompute_internship_embedding(internship, db)
+        
+        return [results[internship.id] for internship in internships]
+    
     @staticmethod
     def recompute_all_embeddings(db: Session) -> Dict:
         """
@@ -258,8 +383,7 @@ class EmbeddingRecomputeService:
         resumes = db.query(Resume).all()
         results['resumes']['total'] = len(resumes)
         
-        for resume in resumes:
-            result = EmbeddingRecomputeService.recompute_resume_embedding(resume, db)
+        for result in EmbeddingRecomputeService.recompute_resume_embeddings(resumes, db):
             results['resumes']['details'].append(result)
             
             if result['success']:
@@ -274,8 +398,7 @@ class EmbeddingRecomputeService:
         internships = db.query(Internship).filter(Internship.is_active == 1).all()
         results['internships']['total'] = len(internships)
         
-        for internship in internships:
-            result = EmbeddingRecomputeService.recompute_internship_embedding(internship, db)
+        for result in EmbeddingRecomputeService.recompute_internship_embeddings(internships, db):
             results['internships']['details'].append(result)
             
             if result['success']:
@@ -289,121 +412,28 @@ class EmbeddingRecomputeService:
         return results
     
     @staticmethod
-    def recalculate_all_matches(db: Session) -> Dict:
+    def recalculate_all_matches(db: Session, incremental: bool = True) -> Dict:
         """
         Recalculate student-internship matches after embeddings are updated
         
+        Matches are upserted in a single transaction by BatchMatchingService,
+        so recommendations keep serving the previous scores while this runs.
+        
         Args:
             db: Database session
+            incremental: If True, only recompute pairs whose resume or internship
+                changed since the match was computed. If False, recompute all pairs.
             
         Returns:
             Dict with results
         """
-        from app.services.matching_engine import MatchingEngine
+        from app.services.batch_matching_service import BatchMatchingService
         
-        results = {
-            'total_matches': 0,
-            'successful': 0,
-            'failed': 0,
+        batch_result = BatchMatchingService(db).compute_all_matches(force_recompute=not incremental)
+        return {
+            'total_matches': batch_result['matches_computed'],
+            'successful': batch_result['matches_computed'],
+            'failed': batch_result.get('matches_failed', 0),
+            'skipped': batch_result.get('pairs_skipped', 0),
             'details': []
         }
-        
-        # Get all students with resumes
-        students_with_resumes = db.query(Resume.student_id).filter(
-            Resume.is_active == 1
-        ).distinct().all()
-        
-        student_ids = [s[0] for s in students_with_resumes]
-        
-        # Get all active internships
-        internships = db.query(Internship).filter(Internship.is_active == 1).all()
-        
-        # Clear existing matches
-        db.query(StudentInternshipMatch).delete()
-        db.commit()
-        
-        matching_engine = MatchingEngine(rag_engine)
-        
-        # Calculate matches for each student-internship pair
-        for student_id in student_ids:
-            # Get active resume (base resume)
-            resume = db.query(Resume).filter(
-                Resume.student_id == student_id,
-                Resume.is_active == 1,
-                Resume.is_tailored == 0
-            ).first()
-            
-            if not resume:
-                continue
-            
-            for internship in internships:
-                try:
-                    # Prepare candidate data
-                    candidate_data = {
-                        'all_skills': resume.parsed_data.get('all_skills', []) if resume.parsed_data else [],
-                        'total_experience_years': resume.parsed_data.get('total_experience_years', 0) if resume.parsed_data else 0,
-                        'education': resume.parsed_data.get('education', []) if resume.parsed_data else [],
-                        'projects': resume.parsed_data.get('projects', []) if resume.parsed_data else [],
-                        'certifications': resume.parsed_data.get('certifications', []) if resume.parsed_data else []
-                    }
-                    
-                    # Prepare internship data
-                    internship_data = {
-                        'required_skills': internship.required_skills or [],
-                        'preferred_skills': internship.preferred_skills or [],
-                        'min_experience': internship.min_experience or 0,
-                        'max_experience': internship.max_experience or 10,
-                        'required_education': internship.required_education or ''
-                    }
-                    
-                    # Get embeddings from ChromaDB
-                    # Note: get_resume_embedding expects ID without "resume_" prefix
-                    try:
-                        resume_chroma_id = resume.embedding_id.replace('resume_', '') if resume.embedding_id else str(resume.id)
-                        candidate_embedding = rag_engine.get_resume_embedding(resume_chroma_id)
-                        if candidate_embedding is None:
-                            candidate_embedding = []
-                    except Exception as e:
-                        candidate_embedding = []
-                    
-                    try:
-                        internship_chroma_id = str(internship.id)  # Just use ID directly
-                        internship_embedding = rag_engine.get_internship_embedding(internship_chroma_id)
-                        if internship_embedding is None:
-                            internship_embedding = []
-                    except Exception as e:
-                        internship_embedding = []
-                    
-                    # Calculate match
-                    match_result = matching_engine.calculate_match_score(
-                        candidate_data=candidate_data,
-                        internship_data=internship_data,
-                        candidate_embedding=candidate_embedding,
-                        internship_embedding=internship_embedding
-                    )
-                    
-                    # Store match
-                    match_record = StudentInternshipMatch(
-                        student_id=student_id,
-                        internship_id=internship.id,
-                        base_similarity_score=int(match_result['overall_score']),
-                        semantic_similarity=match_result['component_scores'].get('semantic_similarity', 0),
-                        skills_match_score=int(match_result['component_scores'].get('skills_match', 0)),
-                        experience_match_score=int(match_result['component_scores'].get('experience_match', 0)),
-                        resume_id=resume.id
-                    )
-                    
-                    db.add(match_record)
-                    results['total_matches'] += 1
-                    results['successful'] += 1
-                    
-                except Exception as e:
-                    results['failed'] += 1
-                    results['details'].append({
-                        'student_id': student_id,
-                        'internship_id': internship.id,
-                        'error': str(e)
-                    })
-        
-        db.commit()
-        return results
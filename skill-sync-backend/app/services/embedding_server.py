@@ -0,0 +1,388 @@
+"""
+Embedding Server - One shared model process for all API workers
+
+- A single process loads the embedding model once and serves encode
+  requests over a Unix domain socket
+- Requests arriving from concurrent API workers are micro-batched: the
+  batcher waits up to EMBEDDING_SERVER_MAX_WAIT_MS for more requests (or
+  until EMBEDDING_SERVER_MAX_BATCH texts) and encodes them in one forward pass
+- API workers set EMBEDDING_BACKEND=server; RAGEngine then uses
+  EmbeddingServerClient, which has the same encode() signature as the
+  in-process backends
+
+Run the server (one per host, before starting uvicorn):
+    python -m app.services.embedding_server
+
+Wire format: every message is a 4-byte big-endian length followed by the
+payload. Requests are one JSON frame; responses are a JSON header frame
+followed, for encode requests, by a frame of raw float32 vectors.
+"""
+
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.embedding_backends import EmbeddingBackend, create_embedding_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/skillsync-embeddings.sock"
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("embedding server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = struct.unpack(">I", _recv_exact(sock, 4))
+    return _recv_exact(sock, size)
+
+
+class _PendingRequest:
+    """One client encode request waiting for its slice of a micro-batch"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    """
+    Unix-socket embedding server with cross-request micro-batching.
+
+    Usage:
+        server = EmbeddingServer()
+        server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EmbeddingBackend] = None,
+        socket_path: Optional[str] = None,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        """
+        Initialize embedding server
+
+        Args:
+            backend: Encoder to serve (default EMBEDDING_SERVER_BACKEND)
+            socket_path: Unix socket to listen on
+            max_batch: Max texts encoded per forward pass
+            max_wait_ms: How long the batcher waits for more requests
+        """
+        self.backend = backend or create_embedding_backend(os.getenv("EMBEDDING_SERVER_BACKEND", "torch"))
+        self.socket_path = socket_path or os.getenv("EMBEDDING_SERVER_SOCKET", DEFAULT_SOCKET_PATH)
+        self.max_batch = max_batch if max_batch is not None else int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "128"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(
+            os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5")
+        )) / 1000.0
+
+        self._requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._listener: Optional[socket.socket] = None
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._started_at = time.time()
+        self._request_count = 0
+        self._batch_count = 0
+        self._text_count = 0
+        self._encode_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Bind the socket and start the accept and batcher threads"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen(64)
+        threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True).start()
+        threading.Thread(target=self._accept_loop, name="embedding-accept", daemon=True).start()
+        logger.info(f"✅ Embedding server ({self.backend.cache_namespace}) listening on {self.socket_path}")
+
+    def serve_forever(self):
+        self.start()
+        try:
+            self._stopping.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn: socket.socket):
+        """Handle requests from one client connection until it closes"""
+        with conn:
+            while not self._stopping.is_set():
+                try:
+                    request = json.loads(_recv_frame(conn))
+                except (ConnectionError, OSError, ValueError):
+                    return
+
+                op = request.get("op")
+                try:
+                    if op == "encode":
+                        pending = _PendingRequest(request.get("texts") or [])
+                        self._requests.put(pending)
+                        pending.done.wait()
+                        if pending.error:
+                            _send_frame(conn, json.dumps({"ok": False, "error": pending.error}).encode())
+                            continue
+                        vectors = np.ascontiguousarray(pending.vectors, dtype=np.float32)
+                        _send_frame(conn, json.dumps({"ok": True, "shape": list(vectors.shape)}).encode())
+                        _send_frame(conn, vectors.tobytes())
+                    elif op == "info":
+                        _send_frame(conn, json.dumps({"ok": True, **self.info()}).encode())
+                    elif op == "stats":
+                        _send_frame(conn, json.dumps({"ok": True, **self.stats()}).encode())
+                    else:
+                        _send_frame(conn, json.dumps({"ok": False, "error": f"unknown op {op}"}).encode())
+                except OSError:
+                    return
+
+    # ------------------------------------------------------------------
+    # Micro-batching
+    # ------------------------------------------------------------------
+
+    def _next_batch(self) -> List[_PendingRequest]:
+        """Block for one request, then collect more until the batch is full or max_wait passes"""
+        while not self._stopping.is_set():
+            try:
+                first = self._requests.get(timeout=0.5)
+                break
+            except queue.Empty:
+                continue
+        else:
+            return []
+
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(pending)
+            size += len(pending.texts)
+        return batch
+
+    def _batch_loop(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            texts = [text for pending in batch for text in pending.texts]
+            started = time.perf_counter()
+            try:
+                vectors = self.backend.encode(texts, batch_size=self.max_batch, convert_to_numpy=True) if texts else \
+                    np.zeros((0, self.backend.get_sentence_embedding_dimension()), dtype=np.float32)
+                error = None
+            except Exception as e:
+                vectors, error = None, str(e)
+                logger.error(f"  Embedding batch of {len(texts)} texts failed: {error}")
+            elapsed = time.perf_counter() - started
+
+            position = 0
+            for pending in batch:
+                if error:
+                    pending.error = error
+                else:
+                    pending.vectors = vectors[position:position + len(pending.texts)]
+                position += len(pending.texts)
+                pending.done.set()
+
+            with self._stats_lock:
+                self._request_count += len(batch)
+                self._batch_count += 1
+                self._text_count += len(texts)
+                self._encode_seconds += elapsed
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def info(self) -> Dict:
+        return {
+            "model": self.backend.model_name,
+            "backend": self.backend.name,
+            "cache_namespace": self.backend.cache_namespace,
+            "dimension": self.backend.get_sentence_embedding_dimension(),
+            "pid": os.getpid()
+        }
+
+    def stats(self) -> Dict:
+        """Request, batch and throughput counters"""
+        with self._stats_lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started_at, 1),
+                "requests": self._request_count,
+                "batches": self._batch_count,
+                "texts": self._text_count,
+                "avg_texts_per_batch": round(self._text_count / self._batch_count, 2) if self._batch_count else 0.0,
+                "avg_requests_per_batch": round(self._request_count / self._batch_count, 2) if self._batch_count else 0.0,
+                "encode_seconds": round(self._encode_seconds, 3),
+                "queue_depth": self._requests.qsize()
+            }
+
+
+class EmbeddingServerClient(EmbeddingBackend):
+    """
+    Client for EmbeddingServer with the in-process backends' encode() signature
+
+    Keeps one connection per thread and reconnects once on a broken
+    connection. When the server is unreachable and
+    EMBEDDING_SERVER_FALLBACK=true, encodes with a local backend instead.
+    """
+
+    name = "server"
+
+    def __init__(self, model_name: str, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        super().__init__(model_name)
+        self.socket_path = socket_path or os.getenv("EMBEDDING_SERVER_SOCKET", DEFAULT_SOCKET_PATH)
+        self.timeout = timeout if timeout is not None else float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "60"))
+        self.fallback_enabled = os.getenv("EMBEDDING_SERVER_FALLBACK", "false").lower() == "true"
+        self._local = threading.local()
+        self._info: Optional[Dict] = None
+        self._fallback: Optional[EmbeddingBackend] = None
+        self._fallback_lock = threading.Lock()
+
+    @property
+    def cache_namespace(self) -> str:
+        """Namespace of the backend the server actually runs"""
+        info = self.info()
+        return info.get("cache_namespace", self.model_name) if info else self.model_name
+
+    def info(self) -> Optional[Dict]:
+        """Server model/backend description (None when unreachable)"""
+        if self._info is None:
+            try:
+                header, _ = self._call({"op": "info"})
+            except (ConnectionError, OSError):
+                return None
+            header.pop("ok", None)
+            self._info = header
+        return self._info
+
+    def stats(self) -> Optional[Dict]:
+        """Server batching counters (None when unreachable)"""
+        try:
+            header, _ = self._call({"op": "stats"})
+        except (ConnectionError, OSError):
+            return None
+        header.pop("ok", None)
+        return header
+
+    def get_sentence_embedding_dimension(self) -> int:
+        info = self.info()
+        if info:
+            return int(info["dimension"])
+        return self._local_backend().get_sentence_embedding_dimension()
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        self._local.conn = None
+
+    def _call(self, request: Dict) -> Tuple[Dict, Optional[bytes]]:
+        """Send one request (retrying once on a stale connection) and read the response"""
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                _send_frame(conn, json.dumps(request).encode())
+                header = json.loads(_recv_frame(conn))
+                body = _recv_frame(conn) if header.get("ok") and request.get("op") == "encode" else None
+                return header, body
+            except (ConnectionError, OSError):
+                self._drop_connection()
+                if attempt == 1:
+                    raise
+        raise ConnectionError("unreachable")
+
+    def _local_backend(self) -> EmbeddingBackend:
+        with self._fallback_lock:
+            if self._fallback is None:
+                if not self.fallback_enabled:
+                    raise ConnectionError(
+                        f"Embedding server not reachable at {self.socket_path} "
+                        "(start it with `python -m app.services.embedding_server`)"
+                    )
+                logger.warning(f"⚠️  Embedding server unreachable at {self.socket_path}; loading a local model")
+                self._fallback = create_embedding_backend(os.getenv("EMBEDDING_SERVER_BACKEND", "torch"), self.model_name)
+            return self._fallback
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        try:
+            header, body = self._call({"op": "encode", "texts": texts})
+        except (ConnectionError, OSError):
+            return self._local_backend().encode(texts, batch_size=len(texts))
+        if not header.get("ok"):
+            raise RuntimeError(f"Embedding server error: {header.get('error')}")
+        return np.frombuffer(body, dtype=np.float32).reshape(header["shape"])
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    EmbeddingServer().serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Match Job Service - Creates and updates MatchJob progress records
+
+Job updates are written through their own database session so progress is
+visible to pollers while the batch run's match writes are still uncommitted.
+"""
+
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.match_job import MatchJob, MatchJobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class MatchJobService:
+    """Service for batch matching job records"""
+
+    @staticmethod
+    def create_job(db: Session, parameters: Dict, workers: int = 1) -> MatchJob:
+        """
+        Create a queued job record
+
+        Args:
+            db: Database session
+            parameters: Run parameters (force_recompute, student_ids, internship_ids)
+            workers: Number of scoring processes requested
+
+        Returns:
+            The new MatchJob
+        """
+        job = MatchJob(parameters=parameters, workers=workers, status=MatchJobStatus.queued.value)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: str) -> Optional[MatchJob]:
+        """Get a job by its public job_id"""
+        return db.query(MatchJob).filter(MatchJob.job_id == job_id).first()
+
+
+class MatchJobTracker:
+    """
+    Progress reporter handed to BatchMatchingService.compute_all_matches
+
+    Usage:
+        tracker = MatchJobTracker(job_id)
+        tracker.start(students_total=..., pairs_total=...)
+        tracker.update(students_done=..., pairs_done=..., matches_computed=...)
+        tracker.complete(result)  # or tracker.fail(error)
+    """
+
+    # Minimum seconds between progress writes (first/last updates are always written)
+    UPDATE_INTERVAL = 1.0
+
+    def __init__(self, job_id: str, session_factory=SessionLocal):
+        self.job_id = job_id
+        self.session_factory = session_factory
+        self._last_update = 0.0
+
+    def start(self, students_total: int, pairs_total: int, workers: int = 1):
+        self._save(
+            status=MatchJobStatus.running.value,
+            students_total=students_total,
+            pairs_total=pairs_total,
+            workers=workers,
+            started_at=datetime.now(timezone.utc)
+        )
+
+    def update(self, students_done: int, pairs_done: int, matches_computed: int, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_update < self.UPDATE_INTERVAL:
+            return
+        self._last_update = now
+        self._save(students_done=students_done, pairs_done=pairs_done, matches_computed=matches_computed)
+
+    def complete(self, result: Dict):
+        self._save(
+            status=MatchJobStatus.completed.value,
+            matches_computed=result.get("matches_computed", 0),
+            result=result,
+            finished_at=datetime.now(timezone.utc)
+        )
+
+    def fail(self, error: str):
+        self._save(
+            status=MatchJobStatus.failed.value,
+            error=error,
+            finished_at=datetime.now(timezone.utc)
+        )
+
+    def _save(self, **fields):
+        """Write fields to the job record in a short, separate transaction"""
+        db = self.session_factory()
+        try:
+            db.query(MatchJob).filter(MatchJob.job_id == self.job_id).update(fields, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️  Could not update match job {self.job_id}: {str(e)}")
+        finally:
+            db.close()
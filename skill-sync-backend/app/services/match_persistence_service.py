@@ -0,0 +1,233 @@
+"""
+Match Persistence Service - Streams pre-computed match rows into student_internship_matches
+
+- Upserts with INSERT ... ON CONFLICT (student_id, internship_id) DO UPDATE
+  against idx_unique_student_internship (no delete-then-insert)
+- For very large PostgreSQL runs, COPYs rows into a temporary staging table
+  and merges them with a single INSERT ... SELECT ... ON CONFLICT
+- Everything is written in one transaction, so readers see either the previous
+  scores or the new ones, never a half-empty table
+"""
+
+import os
+import io
+import csv
+import time
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from sqlalchemy import delete, bindparam, text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.student_internship_match import StudentInternshipMatch
+
+logger = logging.getLogger(__name__)
+
+MATCH_TABLE = StudentInternshipMatch.__table__
+CONFLICT_COLUMNS = ['student_id', 'internship_id']
+STAGING_TABLE = "student_internship_matches_staging"
+
+
+class MatchPersistenceService:
+    """
+    Buffered writer for match rows.
+
+    Usage:
+        writer = MatchPersistenceService(db, expected_rows=len(pairs))
+        writer.write(rows)          # any number of times
+        stats = writer.finish()     # flushes and commits once
+    """
+
+    def __init__(self, db: Session, expected_rows: int = 0):
+        self.db = db
+        self.batch_size = int(os.getenv("MATCH_UPSERT_BATCH_SIZE", "5000"))
+        copy_threshold = int(os.getenv("MATCH_COPY_THRESHOLD", "200000"))
+
+        self.dialect = db.get_bind().dialect.name
+        self.use_copy = self.dialect == "postgresql" and expected_rows >= copy_threshold
+
+        self._buffer: List[Dict] = []
+        self._columns: Optional[List[str]] = None
+        self._staging_created = False
+        self.rows_written = 0
+        self._write_seconds = 0.0
+
+    def write(self, rows: List[Dict]):
+        """Buffer rows and write every full batch"""
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.batch_size:
+            batch = self._buffer[:self.batch_size]
+            self._buffer = self._buffer[self.batch_size:]
+            self._write_batch(batch)
+
+    def delete_not_refreshed(
+        self,
+        computed_before: datetime,
+        student_ids: Optional[List[int]] = None,
+        internship_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Delete rows in scope that this run did not rewrite (used by full recomputes).
+
+        Runs inside the same transaction as the upserts, after pending rows are written.
+        """
+        self.flush()
+        delete_query = delete(StudentInternshipMatch).where(
+            StudentInternshipMatch.last_computed < computed_before
+        )
+        if student_ids:
+            delete_query = delete_query.where(StudentInternshipMatch.student_id.in_(student_ids))
+        if internship_ids:
+            delete_query = delete_query.where(StudentInternshipMatch.internship_id.in_(internship_ids))
+
+        deleted = self.db.execute(delete_query).rowcount
+        logger.info(f"🗑️  Removed {deleted} matches that were not recomputed")
+        return deleted
+
+    def prune_to_top_k(self, top_k_per_student: int, top_k_per_internship: int, score_floor: float) -> int:
+        """
+        Delete rows outside top-K retention (used when MATCH_RETENTION_MODE=top_k).
+
+        A row is kept if it ranks in its student's top-K, in its internship's top-K,
+        scores at or above the floor, or belongs to an application. Ranking uses
+        window functions over the table, inside the run's transaction.
+        """
+        self.flush()
+        start = time.perf_counter()
+        deleted = self.db.execute(text(
+            f"DELETE FROM {MATCH_TABLE.name} WHERE id IN ("
+            f"SELECT ranked.id FROM ("
+            f"SELECT id, student_id, internship_id, base_similarity_score, "
+            f"ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY base_similarity_score DESC, id) AS student_rank, "
+            f"ROW_NUMBER() OVER (PARTITION BY internship_id ORDER BY base_similarity_score DESC, id) AS internship_rank "
+            f"FROM {MATCH_TABLE.name}) ranked "
+            f"WHERE ranked.student_rank > :top_k_per_student "
+            f"AND ranked.internship_rank > :top_k_per_internship "
+            f"AND ranked.base_similarity_score < :score_floor "
+            f"AND NOT EXISTS (SELECT 1 FROM applications a "
+            f"WHERE a.student_id = ranked.student_id AND a.internship_id = ranked.internship_id))"
+        ), {
+            "top_k_per_student": top_k_per_student,
+            "top_k_per_internship": top_k_per_internship,
+            "score_floor": score_floor
+        }).rowcount
+        self._write_seconds += time.perf_counter() - start
+        logger.info(f"✂️  Pruned {deleted} matches outside top-{top_k_per_student}/student, "
+                    f"top-{top_k_per_internship}/internship (floor {score_floor})")
+        return deleted
+
+    def flush(self):
+        """Write any buffered rows (and merge the staging table in COPY mode)"""
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._write_batch(batch)
+        if self._staging_created:
+            self._merge_staging()
+
+    def finish(self) -> Dict:
+        """
+        Flush remaining rows and commit the whole run.
+
+        Returns:
+            Dictionary with write statistics
+        """
+        try:
+            self.flush()
+            commit_start = time.perf_counter()
+            self.db.commit()
+            self._write_seconds += time.perf_counter() - commit_start
+        except Exception:
+            self.db.rollback()
+            raise
+
+        stats = {
+            "rows_written": self.rows_written,
+            "write_mode": "copy" if self.use_copy else "upsert",
+            "write_seconds": round(self._write_seconds, 3),
+            "rows_per_second": round(self.rows_written / self._write_seconds, 1) if self._write_seconds > 0 else 0
+        }
+        logger.info(f"💾 Wrote {stats['rows_written']} matches via {stats['write_mode']} "
+                    f"({stats['rows_per_second']} rows/s)")
+        return stats
+
+    # ------------------------------------------------------------------
+    # Write paths
+    # ------------------------------------------------------------------
+
+    def _write_batch(self, rows: List[Dict]):
+        if not rows:
+            return
+        if self._columns is None:
+            self._columns = list(rows[0].keys())
+
+        start = time.perf_counter()
+        if self.use_copy:
+            self._copy_to_staging(rows)
+        elif self.dialect in ("postgresql", "sqlite"):
+            self._upsert(rows)
+        else:
+            self._delete_then_insert(rows)
+        self._write_seconds += time.perf_counter() - start
+        self.rows_written += len(rows)
+
+    def _upsert(self, rows: List[Dict]):
+        """INSERT ... ON CONFLICT (student_id, internship_id) DO UPDATE, executed as one batch"""
+        insert = postgresql.insert if self.dialect == "postgresql" else sqlite.insert
+        stmt = insert(MATCH_TABLE)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=CONFLICT_COLUMNS,
+            set_={col: stmt.excluded[col] for col in self._columns if col not in CONFLICT_COLUMNS}
+        )
+        self.db.execute(stmt, rows)
+
+    def _delete_then_insert(self, rows: List[Dict]):
+        """Fallback for dialects without ON CONFLICT (still inside the run's transaction)"""
+        self.db.execute(
+            delete(MATCH_TABLE).where(
+                MATCH_TABLE.c.student_id == bindparam('b_student_id'),
+                MATCH_TABLE.c.internship_id == bindparam('b_internship_id')
+            ),
+            [{'b_student_id': r['student_id'], 'b_internship_id': r['internship_id']} for r in rows]
+        )
+        self.db.execute(MATCH_TABLE.insert(), rows)
+
+    def _copy_to_staging(self, rows: List[Dict]):
+        """COPY rows into a temporary staging table (PostgreSQL only)"""
+        columns = ", ".join(self._columns)
+        if not self._staging_created:
+            self.db.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DROP AS "
+                f"SELECT {columns} FROM {MATCH_TABLE.name} WITH NO DATA"
+            ))
+            self._staging_created = True
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                '' if row[col] is None else (row[col].isoformat() if isinstance(row[col], datetime) else row[col])
+                for col in self._columns
+            ])
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _merge_staging(self):
+        """Merge staged rows into the match table with a single upsert"""
+        start = time.perf_counter()
+        columns = ", ".join(self._columns)
+        updates = ", ".join(
+            f"{col} = EXCLUDED.{col}" for col in self._columns if col not in CONFLICT_COLUMNS
+        )
+        self.db.execute(text(
+            f"INSERT INTO {MATCH_TABLE.name} ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+            f"ON CONFLICT ({', '.join(CONFLICT_COLUMNS)}) DO UPDATE SET {updates}"
+        ))
+        self.db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        self._write_seconds += time.perf_counter() - start
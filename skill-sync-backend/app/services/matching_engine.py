@@ -18,6 +18,17 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Education keywords and their levels (checked in order, first match wins for requirements)
+EDUCATION_HIERARCHY = {
+    'phd': 5,
+    'doctorate': 5,
+    'master': 4,
+    'mba': 4,
+    'bachelor': 3,
+    'diploma': 2,
+    'certificate': 1
+}
+
 
 class MatchingEngine:
     """
@@ -163,6 +174,27 @@ class MatchingEngine:
         logger.debug(f"   Calculated similarity: {similarity:.4f}")
         return similarity
     
+    @staticmethod
+    def _normalized_skills(skills: List[str]) -> set:
+        """Distinct skills normalized for comparison (lowercase, trim)"""
+        return {skill.lower().strip() for skill in skills}
+    
+    @staticmethod
+    def _skills_satisfied(candidates: set, skills: List[str]) -> List[bool]:
+        """
+        Whether each skill is matched by a normalized candidate skill
+        (skill in candidate or candidate in skill); exact matches are a set lookup
+        and the substring scan runs only for the rest
+        """
+        satisfied = []
+        for skill in skills:
+            skill = skill.lower().strip()
+            satisfied.append(
+                skill in candidates
+                or any(skill in candidate or candidate in skill for candidate in candidates)
+            )
+        return satisfied
+    
     def _calculate_skills_match(
         self,
         candidate_skills: List[str],
@@ -178,30 +210,18 @@ class MatchingEngine:
         if not required_skills:
             return 100.0
         
-        # Normalize skills for comparison (lowercase, trim)
-        candidate_skills_normalized = [s.lower().strip() for s in candidate_skills]
-        required_skills_normalized = [s.lower().strip() for s in required_skills]
-        preferred_skills_normalized = [s.lower().strip() for s in preferred_skills]
-        
         # Count matched required skills
-        matched_required = sum(
-            1 for skill in required_skills_normalized
-            if any(skill in cand_skill or cand_skill in skill 
-                   for cand_skill in candidate_skills_normalized)
-        )
+        candidates = self._normalized_skills(candidate_skills)
+        matched_required = sum(self._skills_satisfied(candidates, required_skills))
         
         # Required skills score (70% weight)
-        required_score = (matched_required / len(required_skills_normalized)) * 70
+        required_score = (matched_required / len(required_skills)) * 70
         
         # Count matched preferred skills
         preferred_score = 0
-        if preferred_skills_normalized:
-            matched_preferred = sum(
-                1 for skill in preferred_skills_normalized
-                if any(skill in cand_skill or cand_skill in skill 
-                       for cand_skill in candidate_skills_normalized)
-            )
-            preferred_score = (matched_preferred / len(preferred_skills_normalized)) * 30
+        if preferred_skills:
+            matched_preferred = sum(self._skills_satisfied(candidates, preferred_skills))
+            preferred_score = (matched_preferred / len(preferred_skills)) * 30
         else:
             preferred_score = 30  # Full points if no preferred skills specified
         
@@ -250,32 +270,8 @@ class MatchingEngine:
         if not required_education or not candidate_education:
             return 70.0  # Neutral score if no education requirement
         
-        required_lower = required_education.lower()
-        
-        education_hierarchy = {
-            'phd': 5,
-            'doctorate': 5,
-            'master': 4,
-            'mba': 4,
-            'bachelor': 3,
-            'diploma': 2,
-            'certificate': 1
-        }
-        
-        # Determine required level
-        required_level = 0
-        for key, level in education_hierarchy.items():
-            if key in required_lower:
-                required_level = level
-                break
-        
-        # Determine candidate's highest level
-        candidate_level = 0
-        for edu in candidate_education:
-            degree = edu.get('degree', '').lower()
-            for key, level in education_hierarchy.items():
-                if key in degree:
-                    candidate_level = max(candidate_level, level)
+        required_level = self.get_required_education_level(required_education)
+        candidate_level = self.get_candidate_education_level(candidate_education)
         
         if candidate_level >= required_level:
             return 100.0
@@ -284,8 +280,28 @@ class MatchingEngine:
         else:
             return 50.0
     
+    @staticmethod
+    def get_required_education_level(required_education: str) -> int:
+        """Map an education requirement to its level (0 if not recognised)"""
+        required_lower = (required_education or '').lower()
+        for key, level in EDUCATION_HIERARCHY.items():
+            if key in required_lower:
+                return level
+        return 0
+    
+    @staticmethod
+    def get_candidate_education_level(candidate_education: List[Dict]) -> int:
+        """Get the candidate's highest recognised education level (0 if none)"""
+        candidate_level = 0
+        for edu in candidate_education or []:
+            degree = (edu.get('degree') or '').lower()
+            for key, level in EDUCATION_HIERARCHY.items():
+                if key in degree:
+                    candidate_level = max(candidate_level, level)
+        return candidate_level
+    
+    @staticmethod
     def _calculate_additional_credentials(
-        self,
         projects: List[Dict],
         certifications: List[Dict]
     ) -> float:
@@ -321,16 +337,8 @@ class MatchingEngine:
         required_skills: List[str]
     ) -> List[str]:
         """Get list of matched skills"""
-        candidate_skills_normalized = [s.lower().strip() for s in candidate_skills]
-        matched = []
-        
-        for skill in required_skills:
-            skill_lower = skill.lower().strip()
-            if any(skill_lower in cand_skill or cand_skill in skill_lower
-                   for cand_skill in candidate_skills_normalized):
-                matched.append(skill)
-        
-        return matched
+        satisfied = self._skills_satisfied(self._normalized_skills(candidate_skills), required_skills)
+        return [skill for skill, is_matched in zip(required_skills, satisfied) if is_matched]
     
     def _get_missing_skills(
         self,
@@ -4,53 +4,213 @@ Handles embeddings, vector storage, and similarity matching
 """
 
 import os
+import time
 import logging
+import threading
 from typing import List, Dict, Optional, Tuple
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from dotenv import load_dotenv
 
-from app.utils.gemini_key_manager import get_gemini_key_manager
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_backends import create_embedding_backend
+from app.services.vector_index import VectorIndex
+from app.utils.text_chunker import chunk_document
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Attributes built on first use, grouped by the initializer that builds them
+_LAZY_MODEL = ("embedding_model", "embedding_cache")
+_LAZY_STORE = (
+    "chroma_client", "resume_collection", "internship_collection",
+    "resume_chunk_collection", "internship_chunk_collection"
+)
+_LAZY_KEYS = ("key_manager",)
+_LAZY_INDEX = ("resume_index", "internship_index")
+
+# Metadata fields similarity queries can filter on (`where`); copied onto
+# section chunks so chunked max-sim queries filter the same way
+FILTER_FIELDS = (
+    "student_id", "is_tailored", "is_active", "internship_id",
+    "location", "experience_years", "company_id"
+)
+
 
 class RAGEngine:
-    """RAG engine for semantic matching between resumes and internships"""
+    """
+    RAG engine for semantic matching between resumes and internships
+    
+    Construction only reads configuration. The embedding model, the ChromaDB
+    client/collections and the Gemini key manager are built on first access
+    (thread-safe, once each), so importing the module costs nothing for
+    workers and scripts that never embed. Call warm_up() / start_warm_up()
+    to pay the cost ahead of the first request.
+    """
     
     def __init__(self):
-        """Initialize RAG engine with HuggingFace embeddings and ChromaDB"""
-        # Initialize HuggingFace embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("✅ Initialized HuggingFace embedding model: all-MiniLM-L6-v2")
-        
-        # Initialize ChromaDB client
-        db_path = os.getenv("CHROMA_DB_PATH", "./data/chroma_db")
-        os.makedirs(db_path, exist_ok=True)
-        
-        self.chroma_client = chromadb.PersistentClient(
-            path=db_path,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        """Initialize RAG engine configuration (heavy resources load lazily)"""
+        self.model_name = 'all-MiniLM-L6-v2'
+        self.db_path = os.getenv("CHROMA_DB_PATH", "./data/chroma_db")
         
-        # Create or get collections
-        self.resume_collection = self.chroma_client.get_or_create_collection(
-            name="resumes",
-            metadata={"description": "Student resume embeddings"}
-        )
+        # Chunked mode: documents are split on section boundaries so nothing is
+        # lost to the model's 256 word-piece truncation; the main collections hold
+        # the pooled chunk vector and the *_chunks collections hold each chunk
+        self.chunking_enabled = os.getenv("EMBEDDING_CHUNKING_ENABLED", "false").lower() == "true"
+        self.chunk_max_words = int(os.getenv("EMBEDDING_CHUNK_MAX_WORDS", "160"))
         
-        self.internship_collection = self.chroma_client.get_or_create_collection(
-            name="internships",
-            metadata={"description": "Internship posting embeddings"}
-        )
+        # Max IDs per collection.get() call for bulk embedding reads
+        self.fetch_batch_size = int(os.getenv("EMBEDDING_FETCH_BATCH_SIZE", "500"))
+        
+        # Texts per encode call and records per collection.upsert() call for bulk indexing
+        self.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.write_batch_size = int(os.getenv("EMBEDDING_WRITE_BATCH_SIZE", "1000"))
+        
+        # How long collection_stats() counts are reused before re-counting
+        self.stats_cache_seconds = float(os.getenv("RAG_STATS_CACHE_SECONDS", "30"))
+        
+        # In-process float32 snapshot of the resume / internship vectors that answers
+        # similarity queries without ChromaDB (which stays the source of truth)
+        self.vector_index_enabled = os.getenv("VECTOR_INDEX_ENABLED", "false").lower() == "true"
+        self.vector_index_path = os.getenv("VECTOR_INDEX_PATH", "./data/vector_index")
+        
+        self._init_lock = threading.RLock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self.ready_seconds: Optional[float] = None
+    
+    def __getattr__(self, name: str):
+        """Build lazily-initialized resources on first access"""
+        if name in _LAZY_MODEL:
+            self._init_model()
+        elif name in _LAZY_STORE:
+            self._init_store()
+        elif name in _LAZY_KEYS:
+            self._init_key_manager()
+        elif name in _LAZY_INDEX:
+            self._init_index()
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return self.__dict__[name]
+    
+    def _init_model(self):
+        """Load the embedding model and its cache (once)"""
+        with self._init_lock:
+            if "embedding_model" in self.__dict__:
+                return
+            started = time.perf_counter()
+            # Initialize HuggingFace embedding model (EMBEDDING_BACKEND: torch, onnx or onnx-int8)
+            embedding_model = create_embedding_backend(model_name=self.model_name)
+            
+            # Content-addressed cache so unchanged text is never re-encoded
+            self.embedding_cache = EmbeddingCache(embedding_model.cache_namespace)
+            self.embedding_model = embedding_model
+            logger.info(f"✅ Initialized HuggingFace embedding model: {self.model_name} "
+                        f"({embedding_model.name}) in {time.perf_counter() - started:.2f}s")
+    
+    def _init_store(self):
+        """Open the ChromaDB client and collections (once)"""
+        with self._init_lock:
+            if "chroma_client" in self.__dict__:
+                return
+            import chromadb
+            from chromadb.config import Settings
+            
+            started = time.perf_counter()
+            os.makedirs(self.db_path, exist_ok=True)
+            chroma_client = chromadb.PersistentClient(
+                path=self.db_path,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            
+            # Create or get collections
+            self.resume_collection = chroma_client.get_or_create_collection(
+                name="resumes",
+                metadata={"description": "Student resume embeddings"}
+            )
+            
+            self.internship_collection = chroma_client.get_or_create_collection(
+                name="internships",
+                metadata={"description": "Internship posting embeddings"}
+            )
+            
+            # Per-chunk vectors of long documents (see EMBEDDING_CHUNKING_ENABLED)
+            self.resume_chunk_collection = chroma_client.get_or_create_collection(
+                name="resume_chunks",
+                metadata={"description": "Student resume section-chunk embeddings"}
+            )
+            
+            self.internship_chunk_collection = chroma_client.get_or_create_collection(
+                name="internship_chunks",
+                metadata={"description": "Internship posting section-chunk embeddings"}
+            )
+            self.chroma_client = chroma_client
+            logger.info(f"✅ Opened ChromaDB at {self.db_path} in {time.perf_counter() - started:.2f}s")
+    
+    def _init_key_manager(self):
+        """Build the Gemini key manager (once)"""
+        with self._init_lock:
+            if "key_manager" in self.__dict__:
+                return
+            from app.utils.gemini_key_manager import get_gemini_key_manager
+            self.key_manager = get_gemini_key_manager()
+            logger.info("✅ RAGEngine initialized with GeminiKeyManager")
+    
+    def _init_index(self):
+        """Load (or build) the in-memory vector indexes (once)"""
+        with self._init_lock:
+            if "resume_index" in self.__dict__:
+                return
+            started = time.perf_counter()
+            resume_index = VectorIndex.open(self.resume_collection, self.vector_index_path, self.fetch_batch_size)
+            internship_index = VectorIndex.open(self.internship_collection, self.vector_index_path, self.fetch_batch_size)
+            self.resume_index, self.internship_index = resume_index, internship_index
+            logger.info(f"✅ Vector index ready ({len(resume_index)} resumes, {len(internship_index)} internships) "
+                        f"in {time.perf_counter() - started:.2f}s")
+    
+    def save_vector_index(self):
+        """Write snapshots of the loaded vector indexes (no-op when none are loaded)"""
+        with self._init_lock:
+            for name in _LAZY_INDEX:
+                index = self.__dict__.get(name)
+                if index is not None:
+                    index.save(self.vector_index_path)
+    
+    def warm_up(self) -> float:
+        """
+        Initialize every lazy resource and run one encode so the first request is fast
         
-        # Initialize Gemini key manager
-        self.key_manager = get_gemini_key_manager()
-        logger.info("✅ RAGEngine initialized with GeminiKeyManager")
+        Returns:
+            Seconds spent
+        """
+        started = time.perf_counter()
+        self._init_model()
+        self._init_store()
+        self._init_key_manager()
+        if self.vector_index_enabled:
+            self._init_index()
+        self.embedding_model.encode("warm up", convert_to_numpy=True)
+        self.ready_seconds = time.perf_counter() - started
+        logger.info(f"🔥 RAGEngine warmed up in {self.ready_seconds:.2f}s")
+        return self.ready_seconds
+    
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up() on a background daemon thread (idempotent)"""
+        with self._init_lock:
+            if self._warm_up_thread is None:
+                def run():
+                    try:
+                        self.warm_up()
+                    except Exception as e:
+                        logger.error(f"  RAGEngine warm-up failed: {str(e)}")
+                
+                self._warm_up_thread = threading.Thread(target=run, name="rag-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+    
+    @property
+    def is_ready(self) -> bool:
+        """True once the model and vector store have been initialized"""
+        return "embedding_model" in self.__dict__ and "chroma_client" in self.__dict__
     
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -62,15 +222,203 @@ class RAGEngine:
         Returns:
             Embedding vector as list of floats
         """
-        embedding = self.embedding_model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
+        
+        embedding = self.embedding_model.encode(text, convert_to_numpy=True).tolist()
+        self.embedding_cache.put(text, embedding)
+        return embedding
+    
+    def generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts in batched encode calls
+        
+        Cached texts are served from the embedding cache; the rest are
+        sorted by length before batching so each batch pads to a similar
+        length, then results are returned in the input order.
+        
+        Args:
+            texts: Input texts to embed
+            batch_size: Texts per encode call (default EMBEDDING_BATCH_SIZE)
+            
+        Returns:
+            Embedding vectors as lists of floats, aligned with texts
+        """
+        if not texts:
+            return []
+        batch_size = batch_size or self.embedding_batch_size
+        embeddings: List[Optional[List[float]]] = self.embedding_cache.get_many(texts)
+        
+        # Encode each distinct uncached text once, longest first
+        pending: Dict[str, List[int]] = {}
+        for row, embedding in enumerate(embeddings):
+            if embedding is None:
+                pending.setdefault(texts[row], []).append(row)
+        order = sorted(pending, key=len, reverse=True)
+        
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            vectors = [vector.tolist() for vector in self.embedding_model.encode(
+                chunk,
+                batch_size=batch_size,
+                convert_to_numpy=True
+            )]
+            self.embedding_cache.put_many(chunk, vectors)
+            for text, vector in zip(chunk, vectors):
+                for row in pending[text]:
+                    embeddings[row] = vector
+        
+        return embeddings
+    
+    def document_embedding(self, text: str) -> List[float]:
+        """
+        Generate the stored document vector for text
+        
+        Same as generate_embedding unless chunked mode is enabled, in which
+        case it is the pooled vector of the document's section chunks.
+        
+        Args:
+            text: Document text (resume_embedding_text / internship_embedding_text)
+            
+        Returns:
+            Embedding vector as list of floats
+        """
+        return self.document_embeddings([text])[0]
+    
+    def document_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Batched document_embedding, aligned with texts"""
+        if not self.chunking_enabled:
+            return self.generate_embeddings(texts)
+        pooled, _ = self._encode_chunked(texts)
+        return pooled
+    
+    def _encode_chunked(self, texts: List[str]) -> Tuple[List[List[float]], List[List[Tuple[str, List[float]]]]]:
+        """
+        Split documents into section chunks and encode all chunks in one batched pass
+        
+        Returns:
+            Tuple of (pooled document vectors, per-document (chunk text, vector) lists)
+        """
+        per_document = [chunk_document(text, self.chunk_max_words) or [text] for text in texts]
+        vectors = self.generate_embeddings([chunk for chunks in per_document for chunk in chunks])
+        
+        pooled, chunk_lists = [], []
+        position = 0
+        for chunks in per_document:
+            chunk_vectors = vectors[position:position + len(chunks)]
+            position += len(chunks)
+            pooled.append(self.pool_chunk_embeddings(chunks, chunk_vectors))
+            chunk_lists.append(list(zip(chunks, chunk_vectors)))
+        return pooled, chunk_lists
+    
+    @staticmethod
+    def pool_chunk_embeddings(chunks: List[str], vectors: List[List[float]]) -> List[float]:
+        """
+        Pool chunk vectors into one document vector
+        
+        Word-count weighted mean, re-normalized to unit length so cosine
+        scores stay comparable with single-pass embeddings. A one-chunk
+        document keeps its vector unchanged.
+        """
+        if len(vectors) == 1:
+            return list(vectors[0])
+        weights = np.array([max(len(chunk.split()), 1) for chunk in chunks], dtype=np.float64)
+        matrix = np.asarray(vectors, dtype=np.float64)
+        mean = (weights[:, None] * matrix).sum(axis=0) / weights.sum()
+        norm = np.linalg.norm(mean)
+        if norm > 0:
+            mean = mean / norm
+        return mean.astype(np.float32).tolist()
+    
+    @staticmethod
+    def resume_embedding_text(content: str, skills: List[str]) -> str:
+        """Exact text embedded for a resume (content plus skills for better matching)"""
+        return f"{content}\n\nSkills: {', '.join(skills)}"
+    
+    @staticmethod
+    def internship_embedding_text(title: str, description: str, required_skills: List[str]) -> str:
+        """Exact text embedded for an internship (title, description and skills)"""
+        return f"Title: {title}\n\nDescription: {description}\n\nRequired Skills: {', '.join(required_skills)}"
+    
+    @staticmethod
+    def resume_metadata(resume, **extra) -> Dict:
+        """
+        Filterable vector-store metadata for a Resume row
+        
+        Flags are stored as 0/1 ints and location lower-cased, matching the
+        filters built by resume_filter(); None values are dropped (ChromaDB
+        rejects them).
+        
+        Args:
+            resume: Resume model instance
+            **extra: Additional metadata fields
+            
+        Returns:
+            Metadata dict for store_resume_embedding(s)
+        """
+        parsed = resume.parsed_data or {}
+        location = (parsed.get('personal_info') or {}).get('location')
+        meta = {
+            "student_id": int(resume.student_id),
+            "file_name": resume.file_name,
+            "is_tailored": 1 if resume.is_tailored else 0,
+            "is_active": 0 if resume.is_active == 0 else 1,
+            "internship_id": resume.tailored_for_internship_id,
+            "location": location.strip().lower() if isinstance(location, str) and location.strip() else None,
+            # Typed column parsed by the Resume model (free-text values such as "2-3 years" become 0)
+            "experience_years": float(resume.experience_years or 0)
+        }
+        meta.update(extra)
+        return {key: value for key, value in meta.items() if value is not None}
+    
+    @staticmethod
+    def resume_filter(
+        is_active: Optional[bool] = None,
+        is_tailored: Optional[bool] = None,
+        student_id: Optional[int] = None,
+        internship_id: Optional[int] = None,
+        location: Optional[str] = None,
+        min_experience: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Build a `where` filter over the resume metadata written by resume_metadata()
+        
+        Args:
+            is_active: Only active (True) or inactive (False) resumes
+            is_tailored: Only tailored (True) or base (False) resumes
+            student_id: Only this student's resumes
+            internship_id: Only resumes tailored for this internship
+            location: Exact location (case-insensitive)
+            min_experience: Minimum total experience in years
+            
+        Returns:
+            ChromaDB where dict, or None when no condition is given
+        """
+        clauses = []
+        if is_active is not None:
+            clauses.append({"is_active": 1 if is_active else 0})
+        if is_tailored is not None:
+            clauses.append({"is_tailored": 1 if is_tailored else 0})
+        if student_id is not None:
+            clauses.append({"student_id": int(student_id)})
+        if internship_id is not None:
+            clauses.append({"internship_id": int(internship_id)})
+        if location:
+            clauses.append({"location": location.strip().lower()})
+        if min_experience is not None:
+            clauses.append({"experience_years": {"$gte": float(min_experience)}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
     
     def store_resume_embedding(
         self, 
         resume_id: str, 
         content: str, 
         skills: List[str],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embedding: Optional[List[float]] = None
     ) -> str:
         """
         Store resume embedding in vector database
@@ -80,33 +428,54 @@ class RAGEngine:
             content: Resume text content
             skills: List of extracted skills
             metadata: Additional metadata
+            embedding: Precomputed vector for resume_embedding_text(content, skills)
+                (from document_embedding); encoded here when omitted
             
         Returns:
             Embedding ID
         """
-        # Combine content and skills for better matching
-        combined_text = f"{content}\n\nSkills: {', '.join(skills)}"
-        
-        # Generate embedding
-        embedding = self.generate_embedding(combined_text)
-        
-        # Prepare metadata (ChromaDB requires scalar values, convert list to string)
-        meta = metadata or {}
-        meta.update({
+        return self.store_resume_embeddings([{
             "resume_id": resume_id,
-            "skills": ", ".join(skills),  # Convert list to comma-separated string
-            "num_skills": len(skills)
-        })
-        
-        # Store in ChromaDB
-        self.resume_collection.add(
-            embeddings=[embedding],
-            documents=[combined_text],
-            metadatas=[meta],
-            ids=[f"resume_{resume_id}"]
-        )
+            "content": content,
+            "skills": skills,
+            "metadata": metadata,
+            "embedding": embedding
+        }])[0]
+    
+    def store_resume_embeddings(self, batch: List[Dict]) -> List[str]:
+        """
+        Store many resume embeddings with batched encoding and bulk upserts
+        
+        Args:
+            batch: Dicts with the store_resume_embedding arguments
+                (resume_id, content, skills, optional metadata) and an
+                optional precomputed "embedding"
+            
+        Returns:
+            Embedding IDs aligned with batch
+        """
+        ids, documents, metadatas = [], [], []
+        for item in batch:
+            resume_id = item["resume_id"]
+            skills = item.get("skills") or []
+            
+            documents.append(self.resume_embedding_text(item["content"], skills))
+            
+            # Prepare metadata (ChromaDB requires scalar values, convert list to string)
+            meta = dict(item.get("metadata") or {})
+            meta.update({
+                "resume_id": resume_id,
+                "skills": ", ".join(skills),  # Convert list to comma-separated string
+                "num_skills": len(skills)
+            })
+            metadatas.append({key: value for key, value in meta.items() if value is not None})
+            ids.append(f"resume_{resume_id}")
         
-        return f"resume_{resume_id}"
+        embeddings, chunks = self._embeddings_for_batch(batch, documents)
+        self._upsert_bulk(self.resume_collection, ids, embeddings, documents, metadatas)
+        if chunks is not None:
+            self._replace_chunks(self.resume_chunk_collection, ids, chunks, metadatas)
+        return ids
     
     def store_internship_embedding(
         self, 
@@ -114,7 +483,8 @@ class RAGEngine:
         title: str,
         description: str, 
         required_skills: List[str],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embedding: Optional[List[float]] = None
     ) -> str:
         """
         Store internship embedding in vector database
@@ -125,39 +495,225 @@ class RAGEngine:
             description: Internship description
             required_skills: List of required skills
             metadata: Additional metadata
+            embedding: Precomputed vector for internship_embedding_text(...)
+                (from document_embedding); encoded here when omitted
             
         Returns:
             Embedding ID
         """
-        # Combine title, description and skills
-        combined_text = f"Title: {title}\n\nDescription: {description}\n\nRequired Skills: {', '.join(required_skills)}"
-        
-        # Generate embedding
-        embedding = self.generate_embedding(combined_text)
-        
-        # Prepare metadata (ChromaDB requires scalar values, convert list to string)
-        meta = metadata or {}
-        meta.update({
+        return self.store_internship_embeddings([{
             "internship_id": internship_id,
             "title": title,
-            "required_skills": ", ".join(required_skills),  # Convert list to comma-separated string
-            "num_skills": len(required_skills)
-        })
-        
-        # Store in ChromaDB
-        self.internship_collection.add(
-            embeddings=[embedding],
-            documents=[combined_text],
-            metadatas=[meta],
-            ids=[f"internship_{internship_id}"]
-        )
+            "description": description,
+            "required_skills": required_skills,
+            "metadata": metadata,
+            "embedding": embedding
+        }])[0]
+    
+    def store_internship_embeddings(self, batch: List[Dict]) -> List[str]:
+        """
+        Store many internship embeddings with batched encoding and bulk upserts
+        
+        Args:
+            batch: Dicts with the store_internship_embedding arguments
+                (internship_id, title, description, required_skills, optional
+                metadata) and an optional precomputed "embedding"
+            
+        Returns:
+            Embedding IDs aligned with batch
+        """
+        ids, documents, metadatas = [], [], []
+        for item in batch:
+            internship_id = item["internship_id"]
+            title = item["title"]
+            required_skills = item.get("required_skills") or []
+            
+            documents.append(self.internship_embedding_text(title, item["description"], required_skills))
+            
+            # Prepare metadata (ChromaDB requires scalar values, convert list to string)
+            meta = dict(item.get("metadata") or {})
+            meta.update({
+                "internship_id": internship_id,
+                "title": title,
+                "required_skills": ", ".join(required_skills),  # Convert list to comma-separated string
+                "num_skills": len(required_skills)
+            })
+            metadatas.append({key: value for key, value in meta.items() if value is not None})
+            ids.append(f"internship_{internship_id}")
+        
+        embeddings, chunks = self._embeddings_for_batch(batch, documents)
+        self._upsert_bulk(self.internship_collection, ids, embeddings, documents, metadatas)
+        if chunks is not None:
+            self._replace_chunks(self.internship_chunk_collection, ids, chunks, metadatas)
+        return ids
+    
+    def _embeddings_for_batch(
+        self,
+        batch: List[Dict],
+        documents: List[str]
+    ) -> Tuple[List[List[float]], Optional[List[List[Tuple[str, List[float]]]]]]:
+        """
+        Use precomputed embeddings where given and encode the rest in one batched pass
         
-        return f"internship_{internship_id}"
+        Returns:
+            Tuple of (document vectors, per-document chunk lists or None when
+            chunked mode is off)
+        """
+        embeddings = [item.get("embedding") for item in batch]
+        if self.chunking_enabled:
+            # Chunk vectors are always needed; precomputed ones are cache hits
+            pooled, chunks = self._encode_chunked(documents)
+            return [
+                list(embedding) if embedding is not None else vector
+                for embedding, vector in zip(embeddings, pooled)
+            ], chunks
+        
+        pending = [row for row, embedding in enumerate(embeddings) if embedding is None]
+        if pending:
+            generated = self.generate_embeddings([documents[row] for row in pending])
+            for row, embedding in zip(pending, generated):
+                embeddings[row] = embedding
+        return [list(embedding) for embedding in embeddings], None
+    
+    def _replace_chunks(
+        self,
+        collection,
+        parent_ids: List[str],
+        chunk_lists: List[List[Tuple[str, List[float]]]],
+        parent_metadatas: Optional[List[Dict]] = None
+    ):
+        """
+        Replace the stored chunks of each parent document (a re-chunked document may have fewer chunks)
+        
+        Chunks carry the parent's FILTER_FIELDS so `where` filters apply to chunk queries.
+        """
+        self._delete_chunks(collection, parent_ids)
+        
+        ids, embeddings, documents, metadatas = [], [], [], []
+        for position, (parent_id, chunks) in enumerate(zip(parent_ids, chunk_lists)):
+            parent_meta = parent_metadatas[position] if parent_metadatas else {}
+            filter_meta = {field: parent_meta[field] for field in FILTER_FIELDS if field in parent_meta}
+            for index, (text, vector) in enumerate(chunks):
+                ids.append(f"{parent_id}#{index}")
+                embeddings.append(vector)
+                documents.append(text)
+                metadatas.append({**filter_meta, "parent_id": parent_id, "chunk_index": index})
+        self._upsert_bulk(collection, ids, embeddings, documents, metadatas)
+    
+    def _delete_chunks(self, collection, parent_ids: List[str]):
+        """Delete all chunks belonging to the given parent document IDs"""
+        for start in range(0, len(parent_ids), self.fetch_batch_size):
+            chunk = parent_ids[start:start + self.fetch_batch_size]
+            collection.delete(where={"parent_id": {"$in": chunk}})
+    
+    def _upsert_bulk(
+        self,
+        collection,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict]
+    ):
+        """
+        Write records with as few collection.upsert() calls as possible
+        
+        Upsert (rather than add) so re-indexing an existing ID replaces the
+        stored vector instead of being ignored. Writes are chunked to
+        EMBEDDING_WRITE_BATCH_SIZE, capped by the client's max batch size.
+        """
+        write_batch_size = self.write_batch_size
+        try:
+            write_batch_size = min(write_batch_size, self.chroma_client.get_max_batch_size())
+        except Exception:
+            pass
+        
+        self._invalidate_collection_stats()
+        for start in range(0, len(ids), write_batch_size):
+            end = start + write_batch_size
+            collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+        self._mirror_to_index(collection, lambda index: index.upsert(ids, embeddings, metadatas))
+    
+    def _index_for(self, collection) -> Optional[VectorIndex]:
+        """Loaded vector index mirroring a main collection (None for chunk collections or when not loaded)"""
+        if collection is self.__dict__.get("resume_collection"):
+            return self.__dict__.get("resume_index")
+        if collection is self.__dict__.get("internship_collection"):
+            return self.__dict__.get("internship_index")
+        return None
+    
+    def _mirror_to_index(self, collection, apply):
+        """
+        Apply a ChromaDB write to the loaded vector index
+        
+        Runs under the init lock so a write cannot fall between an index
+        build reading the collection and the index being published.
+        
+        Args:
+            collection: Collection that was written
+            apply: Function applying the same write to a VectorIndex
+        """
+        if not self.vector_index_enabled:
+            return
+        with self._init_lock:
+            index = self._index_for(collection)
+            if index is not None:
+                apply(index)
+    
+    def _similar_documents(
+        self,
+        source_collection,
+        source_chunk_collection,
+        source_id: str,
+        target_chunk_collection,
+        target_collection,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """
+        Nearest target documents to a stored source document
+        
+        Served from the in-memory vector index when VECTOR_INDEX_ENABLED
+        (pooled vectors only), otherwise from ChromaDB: max-sim over section
+        chunks in chunked mode, else a query with the source's vector. The
+        `where` filter is applied inside the index / ChromaDB query, so up to
+        top_k matching documents come back from a single search.
+        
+        Returns:
+            collection.query()-shaped dict, or None when the source has no embedding
+        """
+        if self.vector_index_enabled and not self.chunking_enabled:
+            self._init_index()
+            source_vector = self._index_for(source_collection).get_embedding(source_id)
+            # Unknown IDs fall through to ChromaDB (e.g. written by another worker)
+            if source_vector is not None:
+                return self._index_for(target_collection).query(source_vector, top_k, where=where)
+        
+        source = source_collection.get(ids=[source_id], include=["embeddings"])
+        if 'embeddings' not in source or source['embeddings'] is None or len(source['embeddings']) == 0:
+            return None
+        
+        results = self._max_sim_results(
+            source_chunk_collection, source_id, target_chunk_collection, target_collection, top_k, where
+        )
+        if results is None:
+            results = target_collection.query(
+                query_embeddings=[source['embeddings'][0]],
+                n_results=top_k,
+                where=where,
+                include=["metadatas", "distances"]
+            )
+        return results
     
     def find_matching_internships(
         self, 
         resume_id: str, 
-        top_k: int = 10
+        top_k: int = 10,
+        where: Optional[Dict] = None
     ) -> List[Dict]:
         """
         Find matching internships for a resume using cosine similarity
@@ -165,6 +721,7 @@ class RAGEngine:
         Args:
             resume_id: Resume identifier
             top_k: Number of top matches to return
+            where: Optional metadata filter on internships (e.g. {"location": "Remote"})
             
         Returns:
             List of matching internships with scores
@@ -173,46 +730,22 @@ class RAGEngine:
         logger = logging.getLogger(__name__)
         
         try:
-            logger.info(f"[RAG] Finding matching internships for resume_id: {resume_id}")
-            
-            # Check what's in the resume collection
-            all_resumes = self.resume_collection.get()
-            logger.info(f"[RAG] Total resumes in collection: {len(all_resumes['ids']) if all_resumes['ids'] else 0}")
-            logger.info(f"[RAG] Resume IDs in collection: {all_resumes['ids']}")
+            # Only the query vector and the top-k results are read; collection
+            # sizes come from the cached stats instead of full collection scans
+            stats = self.collection_stats()
+            logger.info(f"[RAG] Finding matching internships for resume_id: {resume_id} "
+                        f"({stats['resumes']} resumes, {stats['internships']} internships indexed)")
             
-            # Get resume embedding
-            lookup_id = f"resume_{resume_id}"
-            logger.info(f"[RAG] Looking for resume with ID: {lookup_id}")
-            
-            resume_result = self.resume_collection.get(
-                ids=[lookup_id],
-                include=["embeddings", "metadatas"]
+            # Query internship collection with the resume's stored embedding
+            logger.info(f"[RAG] Querying for top {top_k} matches")
+            results = self._similar_documents(
+                self.resume_collection, self.resume_chunk_collection, f"resume_{resume_id}",
+                self.internship_chunk_collection, self.internship_collection, top_k, where
             )
-            
-            logger.info(f"[RAG] Resume lookup result IDs: {resume_result.get('ids', [])}")
-            logger.info(f"[RAG] Has embeddings: {resume_result.get('embeddings') is not None}")
-            
-            # Check if embeddings exist
-            if 'embeddings' not in resume_result or resume_result['embeddings'] is None or len(resume_result['embeddings']) == 0:
+            if results is None:
                 logger.warning(f"[RAG] No embeddings found for resume {resume_id}")
                 return []
             
-            resume_embedding = resume_result['embeddings'][0]
-            logger.info(f"[RAG] Found resume embedding with dimension: {len(resume_embedding)}")
-            
-            # Check what's in the internship collection
-            all_internships = self.internship_collection.get()
-            logger.info(f"[RAG] Total internships in collection: {len(all_internships['ids']) if all_internships['ids'] else 0}")
-            logger.info(f"[RAG] Internship IDs in collection: {all_internships['ids']}")
-            
-            # Query internship collection
-            logger.info(f"[RAG] Querying for top {top_k} matches")
-            results = self.internship_collection.query(
-                query_embeddings=[resume_embedding],
-                n_results=top_k,
-                include=["metadatas", "distances"]
-            )
-            
             logger.info(f"[RAG] Query returned {len(results['metadatas'][0]) if results['metadatas'] else 0} results")
             
             # Format results with match scores using min-max normalization
@@ -263,7 +796,8 @@ class RAGEngine:
     def find_matching_candidates(
         self, 
         internship_id: str, 
-        top_k: int = 20
+        top_k: int = 20,
+        where: Optional[Dict] = None
     ) -> List[Dict]:
         """
         Find matching candidates for an internship using cosine similarity
@@ -271,30 +805,20 @@ class RAGEngine:
         Args:
             internship_id: Internship identifier
             top_k: Number of top matches to return
+            where: Optional metadata filter on resumes, usually from resume_filter()
             
         Returns:
             List of matching resumes with scores
         """
         try:
-            # Get internship embedding
-            internship_result = self.internship_collection.get(
-                ids=[f"internship_{internship_id}"],
-                include=["embeddings", "metadatas"]
+            # Query resume collection with the internship's stored embedding
+            results = self._similar_documents(
+                self.internship_collection, self.internship_chunk_collection, f"internship_{internship_id}",
+                self.resume_chunk_collection, self.resume_collection, top_k, where
             )
-            
-            # Check if embeddings exist
-            if 'embeddings' not in internship_result or internship_result['embeddings'] is None or len(internship_result['embeddings']) == 0:
+            if results is None:
                 return []
             
-            internship_embedding = internship_result['embeddings'][0]
-            
-            # Query resume collection
-            results = self.resume_collection.query(
-                query_embeddings=[internship_embedding],
-                n_results=top_k,
-                include=["metadatas", "distances"]
-            )
-            
             # Format results with match scores using min-max normalization
             matches = []
             if results['metadatas'] and len(results['metadatas']) > 0 and len(results['metadatas'][0]) > 0:
@@ -337,6 +861,82 @@ class RAGEngine:
             print(f"Error finding matches: {str(e)}")
             return []
     
+    def _max_sim_results(
+        self,
+        source_chunk_collection,
+        source_id: str,
+        target_chunk_collection,
+        target_collection,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """
+        Rank target documents by max-sim over section chunks
+        
+        Each source chunk queries the target chunk collection; a target
+        document's distance is the smallest distance between any pair of
+        their chunks. Returns a collection.query()-shaped dict (metadatas and
+        distances of the target documents), or None when chunked mode is off
+        or either side has no chunks, so callers fall back to the pooled query.
+        """
+        if not self.chunking_enabled:
+            return None
+        
+        source = source_chunk_collection.get(where={"parent_id": source_id}, include=["embeddings"])
+        source_embeddings = source.get('embeddings') if source else None
+        if source_embeddings is None or len(source_embeddings) == 0:
+            return None
+        
+        # Several chunks per document, so over-fetch chunk hits per source chunk
+        hits = target_chunk_collection.query(
+            query_embeddings=[list(embedding) for embedding in source_embeddings],
+            n_results=top_k * 4,
+            where=where,
+            include=["metadatas", "distances"]
+        )
+        best: Dict[str, float] = {}
+        for metadatas, distances in zip(hits.get('metadatas') or [], hits.get('distances') or []):
+            for metadata, distance in zip(metadatas, distances):
+                parent_id = metadata.get('parent_id')
+                if parent_id and distance < best.get(parent_id, float('inf')):
+                    best[parent_id] = distance
+        if not best:
+            return None
+        
+        ranked = sorted(best.items(), key=lambda item: item[1])[:top_k]
+        documents = target_collection.get(ids=[parent_id for parent_id, _ in ranked], include=["metadatas"])
+        metadata_for_id = dict(zip(documents['ids'], documents['metadatas']))
+        ranked = [(parent_id, distance) for parent_id, distance in ranked if parent_id in metadata_for_id]
+        return {
+            'metadatas': [[metadata_for_id[parent_id] for parent_id, _ in ranked]],
+            'distances': [[distance for _, distance in ranked]]
+        }
+    
+    def collection_stats(self) -> Dict[str, int]:
+        """
+        Document counts of the resume and internship collections
+        
+        Cached for RAG_STATS_CACHE_SECONDS and invalidated by this process's
+        own writes, so request paths can log sizes without scanning.
+        
+        Returns:
+            Dictionary with 'resumes' and 'internships' counts
+        """
+        cached = self.__dict__.get("_collection_stats")
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.stats_cache_seconds:
+            return cached[1]
+        
+        stats = {
+            "resumes": self.resume_collection.count(),
+            "internships": self.internship_collection.count()
+        }
+        self._collection_stats = (now, stats)
+        return stats
+    
+    def _invalidate_collection_stats(self):
+        self.__dict__.pop("_collection_stats", None)
+    
     def get_resume_embedding(self, resume_id: str) -> Optional[List[float]]:
         """
         Retrieve resume embedding from vector database
@@ -389,10 +989,129 @@ class RAGEngine:
             print(f"Error retrieving internship embedding: {str(e)}")
             return None
     
+    def get_resume_embeddings(self, resume_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve many resume embeddings with bulk collection reads
+
+        Args:
+            resume_ids: Resume identifiers (without "resume_" prefix)
+
+        Returns:
+            Tuple of (float32 matrix (n, d) aligned with resume_ids,
+            boolean missing mask (n,)). Missing rows are all zeros.
+        """
+        return self._get_embeddings_bulk(self.resume_collection, "resume_", resume_ids)
+
+    def get_internship_embeddings(self, internship_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve many internship embeddings with bulk collection reads
+
+        Args:
+            internship_ids: Internship identifiers (without "internship_" prefix)
+
+        Returns:
+            Tuple of (float32 matrix (n, d) aligned with internship_ids,
+            boolean missing mask (n,)). Missing rows are all zeros.
+        """
+        return self._get_embeddings_bulk(self.internship_collection, "internship_", internship_ids)
+
+    def _get_embeddings_bulk(
+        self,
+        collection,
+        prefix: str,
+        ids: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fetch embeddings for a list of IDs in as few collection.get() calls as possible
+
+        IDs are requested in chunks of EMBEDDING_FETCH_BATCH_SIZE to stay under
+        the backend's query parameter limits. Results are re-aligned to the
+        input order since ChromaDB does not guarantee it.
+        """
+        chroma_ids = [f"{prefix}{item_id}" for item_id in ids]
+        row_for_id = {}
+        for row, chroma_id in enumerate(chroma_ids):
+            row_for_id.setdefault(chroma_id, []).append(row)
+
+        found = {}
+        unique_ids = list(row_for_id.keys())
+        for start in range(0, len(unique_ids), self.fetch_batch_size):
+            chunk = unique_ids[start:start + self.fetch_batch_size]
+            try:
+                result = collection.get(ids=chunk, include=["embeddings"])
+            except Exception as e:
+                print(f"Error retrieving embeddings: {str(e)}")
+                continue
+
+            embeddings = result.get('embeddings') if result else None
+            if embeddings is None:
+                continue
+            for chroma_id, embedding in zip(result['ids'], embeddings):
+                if embedding is not None and len(embedding) > 0:
+                    found[chroma_id] = embedding
+
+        dim = len(next(iter(found.values()))) if found else 0
+        matrix = np.zeros((len(ids), dim), dtype=np.float32)
+        missing = np.ones(len(ids), dtype=bool)
+        for chroma_id, embedding in found.items():
+            if len(embedding) != dim:
+                continue
+            rows = row_for_id[chroma_id]
+            matrix[rows] = np.asarray(embedding, dtype=np.float32)
+            missing[rows] = False
+
+        return matrix, missing
+
+    def update_resume_metadata(self, updates: Dict[str, Dict]) -> bool:
+        """
+        Merge metadata changes (e.g. is_active) into stored resume vectors
+        
+        Also updates the resume's section chunks and the in-memory vector
+        index, so `where` filters see the change immediately.
+        
+        Args:
+            updates: Resume ID -> metadata fields to set
+            
+        Returns:
+            True if the vector store was updated
+        """
+        if not updates:
+            return True
+        try:
+            ids = [f"resume_{resume_id}" for resume_id in updates]
+            changes = [dict(fields) for fields in updates.values()]
+            for start in range(0, len(ids), self.write_batch_size):
+                end = start + self.write_batch_size
+                self.resume_collection.update(ids=ids[start:end], metadatas=changes[start:end])
+            
+            # Chunks only carry the filterable fields
+            changes_for_parent = dict(zip(ids, changes))
+            filter_changed = any(field in FILTER_FIELDS for fields in changes for field in fields)
+            for start in range(0, len(ids) if filter_changed else 0, self.fetch_batch_size):
+                chunks = self.resume_chunk_collection.get(
+                    where={"parent_id": {"$in": ids[start:start + self.fetch_batch_size]}},
+                    include=["metadatas"]
+                )
+                chunk_changes = [
+                    {field: value for field, value in changes_for_parent[meta['parent_id']].items() if field in FILTER_FIELDS}
+                    for meta in chunks['metadatas']
+                ]
+                if chunks['ids']:
+                    self.resume_chunk_collection.update(ids=chunks['ids'], metadatas=chunk_changes)
+            
+            self._mirror_to_index(self.resume_collection, lambda index: index.update_metadata(changes_for_parent))
+            return True
+        except Exception as e:
+            logger.error(f"  Error updating resume metadata: {str(e)}")
+            return False
+    
     def delete_resume_embedding(self, resume_id: str) -> bool:
         """Delete resume embedding from vector database"""
         try:
             self.resume_collection.delete(ids=[f"resume_{resume_id}"])
+            self._invalidate_collection_stats()
+            self._mirror_to_index(self.resume_collection, lambda index: index.delete([f"resume_{resume_id}"]))
+            self._delete_chunks(self.resume_chunk_collection, [f"resume_{resume_id}"])
             return True
         except Exception as e:
             print(f"Error deleting resume embedding: {str(e)}")
@@ -402,6 +1121,9 @@ class RAGEngine:
         """Delete internship embedding from vector database"""
         try:
             self.internship_collection.delete(ids=[f"internship_{internship_id}"])
+            self._invalidate_collection_stats()
+            self._mirror_to_index(self.internship_collection, lambda index: index.delete([f"internship_{internship_id}"]))
+            self._delete_chunks(self.internship_chunk_collection, [f"internship_{internship_id}"])
             return True
         except Exception as e:
             print(f"Error deleting internship embedding: {str(e)}")
@@ -425,10 +1147,16 @@ class RAGEngine:
             # Delete all at once if any exist
             if count > 0:
                 self.resume_collection.delete(ids=all_ids)
+                self._invalidate_collection_stats()
+                self._mirror_to_index(self.resume_collection, lambda index: index.delete(all_ids))
                 logger.info(f"✅ Successfully cleared {count} resume embeddings from ChromaDB")
             else:
                 logger.info("No resume embeddings to clear")
             
+            chunk_ids = self.resume_chunk_collection.get(include=[])['ids']
+            if chunk_ids:
+                self.resume_chunk_collection.delete(ids=chunk_ids)
+            
             return count
         except Exception as e:
             logger.error(f"  Error clearing all resume embeddings: {str(e)}")
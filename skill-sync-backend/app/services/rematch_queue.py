@@ -0,0 +1,293 @@
+"""
+Rematch Queue - Debounced background rematching after resume and internship writes
+
+- Upload/post/update endpoints enqueue the changed student or internship and
+  return immediately; nothing is scored on the request thread
+- Repeated updates to the same entity within the debounce window coalesce into
+  one rematch (bounded by a maximum delay so a busy entity is not starved)
+- A single daemon worker thread drains due entries and runs incremental
+  BatchMatchingService passes, which only rescore stale pairs
+- When a batch pass fails, each entity is rescored on its own so one bad row
+  cannot sink the batch; entities that still fail are requeued with
+  exponential backoff up to a retry cap
+- Queue depth, lag and throughput are exposed via stats()
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+STUDENT = "student"
+INTERNSHIP = "internship"
+
+
+class RematchQueue:
+    """
+    In-process, coalescing work queue for incremental rematching.
+
+    Usage:
+        rematch_queue.enqueue_student(student_id)
+        rematch_queue.enqueue_internship(internship_id)
+        rematch_queue.stats()
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        debounce_seconds: Optional[float] = None,
+        max_delay_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_seconds: Optional[float] = None
+    ):
+        """
+        Initialize rematch queue
+
+        Args:
+            session_factory: Creates the database session used by each pass
+            debounce_seconds: Quiet period after the last update before rematching
+            max_delay_seconds: Longest an entity waits, even if updates keep arriving
+            enabled: When False, enqueue calls are ignored
+            max_retries: Retries for an entity whose rematch fails before it is dropped
+            retry_backoff_seconds: Delay before the first retry (doubled for each further retry)
+        """
+        self.session_factory = session_factory
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else float(
+            os.getenv("REMATCH_DEBOUNCE_SECONDS", "2")
+        )
+        self.max_delay_seconds = max_delay_seconds if max_delay_seconds is not None else float(
+            os.getenv("REMATCH_MAX_DELAY_SECONDS", "10")
+        )
+        self.enabled = enabled if enabled is not None else (
+            os.getenv("REMATCH_QUEUE_ENABLED", "true").lower() == "true"
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.getenv("REMATCH_MAX_RETRIES", "3")
+        )
+        self.retry_backoff_seconds = retry_backoff_seconds if retry_backoff_seconds is not None else float(
+            os.getenv("REMATCH_RETRY_BACKOFF_SECONDS", "5")
+        )
+
+        # (kind, entity_id) -> (first enqueued, due at), monotonic seconds
+        self._pending: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        # (kind, entity_id) -> failed attempts so far, for entities awaiting a retry
+        self._attempts: Dict[Tuple[str, int], int] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._in_flight = 0
+
+        self._enqueued = 0
+        self._coalesced = 0
+        self._processed = 0
+        self._failed = 0
+        self._retried = 0
+        self._last_run_at: Optional[datetime] = None
+        self._last_duration = 0.0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def enqueue_student(self, student_id: int):
+        """Schedule a rematch for a student whose resume changed"""
+        self._enqueue(STUDENT, student_id)
+
+    def enqueue_internship(self, internship_id: int):
+        """Schedule a rematch for a posted or updated internship"""
+        self._enqueue(INTERNSHIP, internship_id)
+
+    def _enqueue(self, kind: str, entity_id: int):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        key = (kind, int(entity_id))
+        with self._condition:
+            if key in self._pending:
+                first, _ = self._pending[key]
+                self._coalesced += 1
+            else:
+                first = now
+            due = min(now + self.debounce_seconds, first + self.max_delay_seconds)
+            self._pending[key] = (first, due)
+            # A new update starts the entity over with a full retry budget
+            self._attempts.pop(key, None)
+            self._enqueued += 1
+            self._ensure_worker()
+            self._condition.notify()
+        logger.info(f"📥 Queued rematch for {kind} {entity_id} (depth {len(self._pending)})")
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use (caller holds the lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="rematch-queue", daemon=True)
+            self._thread.start()
+
+    def _take_due(self) -> Optional[List[Tuple[Tuple[str, int], float]]]:
+        """Wait for due entries and remove them from the queue (None when stopping)"""
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                now = time.monotonic()
+                due = [(key, first) for key, (first, due_at) in self._pending.items() if due_at <= now]
+                if due:
+                    for key, _ in due:
+                        del self._pending[key]
+                    self._in_flight = len(due)
+                    return due
+                timeout = min((due_at for _, due_at in self._pending.values()), default=None)
+                self._condition.wait(None if timeout is None else max(timeout - now, 0))
+
+    def _run(self):
+        while True:
+            batch = self._take_due()
+            if batch is None:
+                return
+            self._process(batch)
+
+    def _rematch(self, student_ids: List[int], internship_ids: List[int]):
+        """Run incremental rematching for the given entities in a fresh session"""
+        from app.services.batch_matching_service import BatchMatchingService
+
+        db = self.session_factory()
+        try:
+            service = BatchMatchingService(db)
+            if student_ids:
+                service.compute_all_matches(student_ids=student_ids, workers=1)
+            if internship_ids:
+                service.compute_all_matches(internship_ids=internship_ids, workers=1)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _process(self, batch: List[Tuple[Tuple[str, int], float]]):
+        """Run incremental rematching for one drained batch of entities"""
+        student_ids = sorted(entity_id for (kind, entity_id), _ in batch if kind == STUDENT)
+        internship_ids = sorted(entity_id for (kind, entity_id), _ in batch if kind == INTERNSHIP)
+        started = time.monotonic()
+
+        # key -> error for entities whose rematch failed
+        errors: Dict[Tuple[str, int], str] = {}
+        try:
+            self._rematch(student_ids, internship_ids)
+        except Exception as e:
+            if len(batch) == 1:
+                (key, _), = batch
+                errors[key] = str(e)
+                logger.error(f"  Rematch failed for {key[0]} {key[1]}: {e}")
+            else:
+                # Rescore entities one at a time so only the bad ones fail
+                logger.warning(f"⚠️  Batch rematch failed ({e}); retrying {len(batch)} entities one at a time")
+                for (kind, entity_id), _ in batch:
+                    try:
+                        if kind == STUDENT:
+                            self._rematch([entity_id], [])
+                        else:
+                            self._rematch([], [entity_id])
+                    except Exception as entity_error:
+                        errors[(kind, entity_id)] = str(entity_error)
+                        logger.error(f"  Rematch failed for {kind} {entity_id}: {entity_error}")
+
+        finished = time.monotonic()
+        lag = max(finished - first for _, first in batch)
+        with self._condition:
+            self._in_flight = 0
+            self._last_run_at = datetime.now(timezone.utc)
+            self._last_duration = finished - started
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            for key, first in batch:
+                error = errors.get(key)
+                if error is None:
+                    self._attempts.pop(key, None)
+                    self._processed += 1
+                    continue
+                self._last_error = error
+                attempts = self._attempts.get(key, 0) + 1
+                if key in self._pending:
+                    # Updated again while in flight: the pending rematch covers it
+                    continue
+                if attempts > self.max_retries:
+                    self._attempts.pop(key, None)
+                    self._failed += 1
+                    logger.error(f"  Giving up on rematch for {key[0]} {key[1]} after {attempts} attempts")
+                    continue
+                self._attempts[key] = attempts
+                self._retried += 1
+                self._pending[key] = (first, finished + self.retry_backoff_seconds * 2 ** (attempts - 1))
+            self._condition.notify_all()
+
+        if not errors:
+            logger.info(f"🔁 Rematched {len(student_ids)} students, {len(internship_ids)} internships "
+                        f"in {finished - started:.2f}s (lag {lag:.2f}s)")
+
+    # ------------------------------------------------------------------
+    # Introspection / lifecycle
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """Queue depth, lag and throughput counters"""
+        now = time.monotonic()
+        with self._condition:
+            oldest = min((first for first, _ in self._pending.values()), default=None)
+            return {
+                "enabled": self.enabled,
+                "worker_alive": bool(self._thread and self._thread.is_alive()),
+                "depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "oldest_pending_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                "debounce_seconds": self.debounce_seconds,
+                "max_delay_seconds": self.max_delay_seconds,
+                "enqueued": self._enqueued,
+                "coalesced": self._coalesced,
+                "processed": self._processed,
+                "retried": self._retried,
+                "awaiting_retry": sum(1 for key in self._pending if key in self._attempts),
+                "failed": self._failed,
+                "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+                "last_duration_seconds": round(self._last_duration, 3),
+                "last_lag_seconds": round(self._last_lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+                "last_error": self._last_error
+            }
+
+    def wait_until_idle(self, timeout: float) -> bool:
+        """Block until nothing is pending or in flight; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, 0.1))
+            return True
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker after its current pass (pending entries are dropped)"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# Process-wide queue used by the upload and internship routes
+rematch_queue = RematchQueue()
@@ -13,6 +13,7 @@ from app.services.parser_service import ResumeParser
 from app.services.rag_engine import rag_engine
 from app.services.resume_intelligence_service import ResumeIntelligenceService
 from app.services.s3_service import s3_service
+from app.services.rematch_queue import rematch_queue
 
 
 class ResumeService:
@@ -109,21 +110,23 @@ class ResumeService:
             }
             
             # Deactivate old active resumes if this is a base resume
+            deactivated_ids = []
             if deactivate_others and not is_tailored:
-                db.query(Resume).filter(
+                previous = db.query(Resume).filter(
                     Resume.student_id == student_id,
                     Resume.is_active == 1,
                     Resume.is_tailored == 0
-                ).update({"is_active": 0})
+                )
+                deactivated_ids = [row.id for row in previous.with_entities(Resume.id)]
+                previous.update({"is_active": 0})
             
-            # Generate embedding directly (for faster matching)
+            # Generate the embedding once; the same vector is stored in ChromaDB below
             logger.info(f"🔢 Generating embedding vector...")
-            embedding = None
             extracted_skills = structured_data.get('all_skills', basic_data.get('extracted_skills', []))
-            if resume_text and extracted_skills:
-                embedding_text = f"{resume_text}\n\nSkills: {', '.join(extracted_skills)}"
-                embedding = rag_engine.generate_embedding(embedding_text)
-                logger.info(f"✅ Generated embedding: dimension {len(embedding) if embedding else 0}")
+            embedding = rag_engine.document_embedding(
+                rag_engine.resume_embedding_text(resume_text, extracted_skills)
+            )
+            logger.info(f"✅ Generated embedding: dimension {len(embedding)}")
             
             # Create new resume record
             logger.info(f"💾 Creating resume record in database...")
@@ -149,21 +152,13 @@ class ResumeService:
             # Store in vector DB (ChromaDB) for semantic search
             logger.info(f"📚 Storing in vector database (ChromaDB)...")
             
-            # Build metadata (ChromaDB doesn't accept None values)
-            metadata = {
-                "student_id": student_id,
-                "file_name": file.filename,
-                "is_tailored": is_tailored
-            }
-            # Only add internship_id if this is a tailored resume
-            if is_tailored and internship_id is not None:
-                metadata["internship_id"] = internship_id
-            
+            # Filterable metadata (student, tailored/active flags, location, experience)
             embedding_id = rag_engine.store_resume_embedding(
                 resume_id=str(new_resume.id),
                 content=resume_text,
                 skills=extracted_skills,
-                metadata=metadata
+                metadata=rag_engine.resume_metadata(new_resume),
+                embedding=embedding
             )
             logger.info(f"✅ Stored in ChromaDB with ID: {embedding_id}")
             
@@ -175,6 +170,13 @@ class ResumeService:
             db.refresh(new_resume)
             logger.info(f"✅ All changes committed to database")
             
+            # Keep the vector store's is_active filter in sync with the deactivated resumes
+            rag_engine.update_resume_metadata({str(resume_id): {"is_active": 0} for resume_id in deactivated_ids})
+            
+            # Refresh pre-computed matches in the background (base resumes are the ones matched)
+            if not is_tailored:
+                rematch_queue.enqueue_student(student_id)
+            
             logger.info(f"🎉 {resume_type.capitalize()} resume processing complete!")
             return new_resume
             
@@ -0,0 +1,193 @@
+"""
+Sharded Matching Engine - Multi-process execution of vectorized batch scoring
+Part of the Hybrid Matching Strategy for performance optimization
+
+- Feature arrays, embedding matrices and the pair mask are placed in shared
+  memory once; workers attach to them in their initializer, so tasks carry only
+  a (start, end) student range and nothing large is pickled per task
+- Each worker scores its student chunk with VectorizedMatchingEngine and returns
+  only the compacted pairs to store
+- Results arrive as chunks finish and are merged by the caller's DB writer
+"""
+
+import os
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from app.services.vectorized_matching_engine import (
+    VectorizedMatchingEngine,
+    CandidateFeatures,
+    InternshipFeatures
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-process state set by _init_worker
+_worker_state: Dict = {}
+
+
+def clamp_workers(workers: int) -> int:
+    """Worker process count limited to 1..os.cpu_count()"""
+    return max(1, min(int(workers), os.cpu_count() or 1))
+
+
+class SharedArrays:
+    """Owns a set of NumPy arrays copied into named shared memory blocks"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.descriptors: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                view[...] = array
+                self.descriptors[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Release and unlink all blocks"""
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+
+def _attach(descriptors: Dict) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    """Map shared memory blocks as NumPy arrays (no copy)"""
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def _init_worker(descriptors: Dict, weights: Dict[str, float], retention: Optional[Dict], ann_candidates: int):
+    arrays, blocks = _attach(descriptors)
+    _worker_state['blocks'] = blocks
+    _worker_state['arrays'] = arrays
+    _worker_state['retention'] = retention
+    _worker_state['ann_candidates'] = ann_candidates
+    _worker_state['engine'] = VectorizedMatchingEngine(weights=weights)
+    _worker_state['candidates'] = CandidateFeatures(**{
+        key[len('candidate.'):]: value for key, value in arrays.items() if key.startswith('candidate.')
+    })
+    _worker_state['internships'] = InternshipFeatures(**{
+        key[len('internship.'):]: value for key, value in arrays.items() if key.startswith('internship.')
+    })
+
+
+def _score_chunk(bounds: Tuple[int, int]) -> Tuple[int, int, Dict[str, np.ndarray]]:
+    start, end = bounds
+    arrays = _worker_state['arrays']
+    engine: VectorizedMatchingEngine = _worker_state['engine']
+    pinned = arrays.get('pinned_mask')
+    return start, end, engine.score_selected(
+        candidates=_worker_state['candidates'].slice(start, end),
+        candidate_matrix=arrays['candidate_matrix'][start:end],
+        candidate_valid=arrays['candidate_valid'][start:end],
+        internships=_worker_state['internships'],
+        internship_matrix=arrays['internship_matrix'],
+        internship_valid=arrays['internship_valid'],
+        pairs=arrays['pair_mask'][start:end],
+        retention=_worker_state['retention'],
+        pinned=pinned[start:end] if pinned is not None else None,
+        ann_candidates=_worker_state['ann_candidates']
+    )
+
+
+class ShardedMatchingEngine:
+    """
+    Scores student chunks in a process pool over shared-memory inputs.
+
+    Usage:
+        sharded = ShardedMatchingEngine(workers=8, chunk_size=1024)
+        for start, end, pairs in sharded.score(weights, candidates, candidate_matrix, ...):
+            ...
+    """
+
+    def __init__(self, workers: int, chunk_size: int):
+        self.workers = clamp_workers(workers)
+        self.chunk_size = max(1, chunk_size)
+
+    @staticmethod
+    def _context():
+        """
+        forkserver (or spawn) by default: the API process runs other threads
+        (warm-up, rematch queue, ChromaDB, request threadpool), and a forked worker
+        can inherit a lock one of them held. fork is used only when set explicitly
+        in BATCH_MATCH_START_METHOD.
+        """
+        start_method = os.getenv("BATCH_MATCH_START_METHOD")
+        if start_method:
+            return mp.get_context(start_method)
+        if "forkserver" in mp.get_all_start_methods():
+            return mp.get_context("forkserver")
+        return mp.get_context("spawn")
+
+    def score(
+        self,
+        weights: Dict[str, float],
+        candidates: CandidateFeatures,
+        candidate_matrix: np.ndarray,
+        candidate_valid: np.ndarray,
+        internships: InternshipFeatures,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray,
+        pair_mask: np.ndarray,
+        retention: Optional[Dict] = None,
+        pinned_mask: Optional[np.ndarray] = None,
+        ann_candidates: int = 0
+    ) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+        """
+        Score all candidates against all internships across worker processes
+
+        Yields:
+            (start, end, compacted pairs) per student chunk, in completion order.
+            Row indices in the compacted pairs are relative to start.
+            With retention settings, workers drop non-retained pairs before
+            returning them; with ann_candidates > 0 they fully score only each
+            candidate's nearest internships.
+        """
+        arrays = {
+            'candidate_matrix': candidate_matrix,
+            'candidate_valid': candidate_valid,
+            'internship_matrix': internship_matrix,
+            'internship_valid': internship_valid,
+            'pair_mask': pair_mask
+        }
+        if pinned_mask is not None:
+            arrays['pinned_mask'] = pinned_mask
+        arrays.update({f'candidate.{key}': value for key, value in vars(candidates).items()})
+        arrays.update({f'internship.{key}': value for key, value in vars(internships).items()})
+
+        n_candidates = len(candidates)
+        chunks = [
+            (start, min(start + self.chunk_size, n_candidates))
+            for start in range(0, n_candidates, self.chunk_size)
+        ]
+
+        shared = SharedArrays(arrays)
+        try:
+            logger.info(f"🧩 Scoring {len(chunks)} chunks on {self.workers} worker processes")
+            with self._context().Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.descriptors, weights, retention, ann_candidates)
+            ) as pool:
+                for result in pool.imap_unordered(_score_chunk, chunks):
+                    yield result
+        finally:
+            shared.close()
@@ -0,0 +1,152 @@
+"""
+Skill Index - Batch-local skill vocabulary with a bipartite match relation
+Part of the Hybrid Matching Strategy for performance optimization
+
+- Every skill string is normalized (lowercase, trim, aliases) and mapped to an
+  integer ID once per batch (VectorizedMatchingEngine; per-pair scoring in
+  MatchingEngine uses a plain set/substring check)
+- The matching rule "required in candidate or candidate in required" is
+  evaluated only between the two sides that are compared: for each requirement
+  skill, candidate skills contained in it are dictionary lookups of its
+  substrings, and candidate skills containing it come from one str.find scan
+  over the joined candidate vocabulary
+- An index lives as long as the batch that built it, so memory is bounded by
+  the batch vocabulary and nothing grows across requests
+
+Scores are identical to the original substring comparison in MatchingEngine.
+"""
+
+import logging
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Separator for the joined candidate vocabulary (normalized skills never start/end with it)
+JOIN_SEPARATOR = '\n'
+
+
+class SkillIndex:
+    """
+    Skill vocabulary for one batch (not shared between requests).
+
+    Usage:
+        index = SkillIndex()
+        required_ids = index.encode(["Python", "SQL"])
+        matched = index.satisfied(index.encode(candidate_skills), required_ids)
+        relation = index.relation_matrix(candidate_vocab, requirement_vocab)
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        """
+        Initialize skill index
+
+        Args:
+            aliases: Optional map of alternative spellings to a canonical skill
+                (e.g. {"js": "javascript"}); both sides are normalized
+        """
+        self.aliases = {
+            self.normalize(alias): self.normalize(canonical)
+            for alias, canonical in (aliases or {}).items()
+        }
+        self._ids: Dict[str, int] = {}
+        self._skills: List[str] = []
+
+    @staticmethod
+    def normalize(skill: str) -> str:
+        """Normalize a skill string the way MatchingEngine compares skills"""
+        return skill.lower().strip()
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def skill_id(self, skill: str) -> int:
+        """Get (or assign) the integer ID of a skill"""
+        normalized = self.normalize(skill)
+        normalized = self.aliases.get(normalized, normalized)
+        skill_id = self._ids.get(normalized)
+        if skill_id is None:
+            skill_id = len(self._skills)
+            self._skills.append(normalized)
+            self._ids[normalized] = skill_id
+        return skill_id
+
+    def encode(self, skills: Optional[Iterable[str]]) -> List[int]:
+        """Map a skill list to IDs (order and duplicates preserved)"""
+        return [self.skill_id(skill) for skill in skills or []]
+
+    def satisfied(self, candidate_ids: Iterable[int], skill_ids: List[int]) -> np.ndarray:
+        """
+        Whether a candidate with these skills satisfies each entry of skill_ids
+
+        Returns:
+            bool array aligned with skill_ids (duplicates kept)
+        """
+        return self.relation_matrix(sorted(set(candidate_ids)), list(skill_ids)).any(axis=0)
+
+    @staticmethod
+    def _substrings(skill: str) -> set:
+        """Every substring of a skill, including the empty string"""
+        return {skill[start:end] for start in range(len(skill) + 1) for end in range(start, len(skill) + 1)}
+
+    def relation_matrix(self, row_ids: List[int], column_ids: List[int]) -> np.ndarray:
+        """
+        Dense relation block between two sets of skill IDs
+
+        Args:
+            row_ids: Skill IDs for rows (e.g. candidate skills in a batch)
+            column_ids: Skill IDs for columns (e.g. requirement skills in a batch)
+
+        Returns:
+            uint8 matrix (len(row_ids), len(column_ids)), 1 where the skills match
+        """
+        matrix = np.zeros((len(row_ids), len(column_ids)), dtype=np.uint8)
+        if not row_ids or not column_ids:
+            return matrix
+
+        row_skills = [self._skills[skill_id] for skill_id in row_ids]
+        rows_by_skill: Dict[str, List[int]] = {}
+        for row, skill in enumerate(row_skills):
+            rows_by_skill.setdefault(skill, []).append(row)
+
+        # Row skills joined once; starts[k] is the offset of row k in the joined string
+        joined = JOIN_SEPARATOR.join(row_skills)
+        starts = []
+        offset = 0
+        for skill in row_skills:
+            starts.append(offset)
+            offset += len(skill) + len(JOIN_SEPARATOR)
+
+        columns: Dict[int, np.ndarray] = {}
+        for col, skill_id in enumerate(column_ids):
+            if skill_id in columns:
+                matrix[:, col] = columns[skill_id]
+                continue
+            skill = self._skills[skill_id]
+            hits = np.zeros(len(row_ids), dtype=np.uint8)
+
+            # Row skill in the column skill: its substrings that are row skills
+            for substring in self._substrings(skill):
+                for row in rows_by_skill.get(substring, ()):
+                    hits[row] = 1
+
+            # Column skill in the row skill: occurrences in the joined rows
+            if not skill:
+                hits[:] = 1
+            elif JOIN_SEPARATOR in skill:
+                for row, row_skill in enumerate(row_skills):
+                    if skill in row_skill:
+                        hits[row] = 1
+            else:
+                position = joined.find(skill)
+                while position != -1:
+                    row = bisect_right(starts, position) - 1
+                    hits[row] = 1
+                    if row + 1 >= len(starts):
+                        break
+                    position = joined.find(skill, starts[row + 1])
+
+            columns[skill_id] = hits
+            matrix[:, col] = hits
+        return matrix
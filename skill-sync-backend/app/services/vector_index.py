@@ -0,0 +1,377 @@
+"""
+Vector Index - In-process float32 snapshot of a ChromaDB collection
+
+Holds every vector of a collection in one contiguous float32 matrix next to
+its ID and metadata arrays, and answers top-k queries with a single matrix
+product plus argpartition. Distances are squared L2, the metric of the
+ChromaDB collections it mirrors, so results rank and score the same way.
+
+ChromaDB stays the source of truth: the index is built from a collection,
+persisted as a snapshot (<name>.npy matrix, memory-mapped on load, plus a
+<name>.json sidecar of IDs and metadata) and kept current by mirroring each
+upsert/delete RAGEngine makes. See VECTOR_INDEX_ENABLED in RAGEngine.
+
+Queries accept ChromaDB `where` filters, evaluated with ChromaDB's semantics
+against the stored metadata; the row mask of each filter is cached until the
+next write.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cached filter masks per index (cleared on every write)
+MAX_CACHED_FILTERS = 32
+
+_MISSING = object()
+
+
+def _comparable(value, target) -> bool:
+    """ChromaDB compares like types only (a bool never equals 1, a string never a number)"""
+    if isinstance(value, bool) or isinstance(target, bool):
+        return isinstance(value, bool) and isinstance(target, bool)
+    if isinstance(value, (int, float)) and isinstance(target, (int, float)):
+        return True
+    return type(value) is type(target)
+
+
+def _field_predicate(field: str, condition) -> Callable[[Dict], bool]:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    if len(condition) != 1:
+        raise ValueError(f"Expected one operator for '{field}', got {list(condition)}")
+    (operator, target), = condition.items()
+
+    if operator == "$eq":
+        return lambda meta: _comparable(meta.get(field, _MISSING), target) and meta[field] == target
+    if operator == "$ne":
+        return lambda meta: not (_comparable(meta.get(field, _MISSING), target) and meta[field] == target)
+    if operator in ("$in", "$nin"):
+        targets = list(target)
+        def contains(meta):
+            value = meta.get(field, _MISSING)
+            return any(_comparable(value, item) and value == item for item in targets)
+        return contains if operator == "$in" else (lambda meta: not contains(meta))
+
+    compare = {
+        "$gt": lambda value: value > target,
+        "$gte": lambda value: value >= target,
+        "$lt": lambda value: value < target,
+        "$lte": lambda value: value <= target
+    }.get(operator)
+    if compare is None:
+        raise ValueError(f"Unsupported where operator '{operator}'")
+    return lambda meta: _comparable(meta.get(field, _MISSING), target) and compare(meta[field])
+
+
+def compile_where(where: Dict) -> Callable[[Dict], bool]:
+    """
+    Compile a ChromaDB `where` filter into a metadata predicate
+
+    Supports $and / $or and the field operators $eq, $ne, $gt, $gte, $lt,
+    $lte, $in and $nin. As in ChromaDB, a document missing the field only
+    matches $ne and $nin.
+
+    Args:
+        where: Filter, e.g. {"$and": [{"is_active": 1}, {"experience_years": {"$gte": 1}}]}
+
+    Returns:
+        Function of a metadata dict returning True when it matches
+    """
+    predicates = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            parts = [compile_where(part) for part in condition]
+            combine = all if key == "$and" else any
+            predicates.append(lambda meta, parts=parts, combine=combine: combine(part(meta) for part in parts))
+        else:
+            predicates.append(_field_predicate(key, condition))
+    return predicates[0] if len(predicates) == 1 else (lambda meta: all(part(meta) for part in predicates))
+
+
+class VectorIndex:
+    """
+    Exact in-memory nearest-neighbour index over one collection
+
+    Rows are stored densely: a delete moves the last row into the freed slot,
+    and appends grow the matrix geometrically so incremental updates are
+    amortized O(dimension).
+    """
+
+    def __init__(self, name: str, dimension: Optional[int] = None):
+        """
+        Initialize an empty index
+
+        Args:
+            name: Name of the mirrored collection (snapshot file stem)
+            dimension: Vector dimension (taken from the first upsert when omitted)
+        """
+        self.name = name
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._ids: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._filter_masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def dimension(self) -> int:
+        return self._matrix.shape[1]
+
+    def _reserve(self, rows: int, dimension: int):
+        """Grow the backing matrix (and norms) to hold at least `rows` rows"""
+        capacity = self._matrix.shape[0]
+        if self._matrix.shape[1] != dimension:
+            if self._ids:
+                raise ValueError(f"Vector dimension {dimension} does not match index dimension {self.dimension}")
+            self._matrix = np.zeros((0, dimension), dtype=np.float32)
+            capacity = 0
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 64)
+        matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        norms = np.zeros(capacity, dtype=np.float32)
+        count = len(self._ids)
+        matrix[:count] = self._matrix[:count]
+        norms[:count] = self._norms[:count]
+        self._matrix, self._norms = matrix, norms
+
+    def upsert(self, ids: List[str], embeddings, metadatas: Optional[List[Dict]] = None):
+        """
+        Insert or replace vectors
+
+        Args:
+            ids: Document IDs
+            embeddings: Vectors (list of lists or 2-D array), one per ID
+            metadatas: Optional metadata dicts, one per ID
+        """
+        if not len(ids):
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            self._filter_masks.clear()
+            new_ids = {item_id for item_id in ids if item_id not in self._rows}
+            self._reserve(len(self._ids) + len(new_ids), vectors.shape[1])
+            for item_id, vector, metadata in zip(ids, vectors, metadatas):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[item_id] = row
+                    self._ids.append(item_id)
+                    self._metadatas.append(metadata or {})
+                else:
+                    self._metadatas[row] = metadata or {}
+                self._matrix[row] = vector
+                self._norms[row] = float(vector @ vector)
+
+    def delete(self, ids: List[str]):
+        """
+        Remove vectors (unknown IDs are ignored)
+
+        Args:
+            ids: Document IDs
+        """
+        with self._lock:
+            self._filter_masks.clear()
+            for item_id in ids:
+                row = self._rows.pop(item_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._norms[row] = self._norms[last]
+                    self._ids[row] = moved_id
+                    self._metadatas[row] = self._metadatas[last]
+                    self._rows[moved_id] = row
+                self._ids.pop()
+                self._metadatas.pop()
+
+    def update_metadata(self, updates: Dict[str, Dict]):
+        """
+        Merge metadata changes into stored records (like collection.update)
+
+        Args:
+            updates: Document ID -> metadata fields to set (unknown IDs are ignored)
+        """
+        with self._lock:
+            self._filter_masks.clear()
+            for item_id, changes in updates.items():
+                row = self._rows.get(item_id)
+                if row is not None:
+                    self._metadatas[row] = {**self._metadatas[row], **changes}
+
+    def _where_mask(self, where: Dict) -> np.ndarray:
+        """Row mask of a filter (cached until the next write)"""
+        key = json.dumps(where, sort_keys=True)
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            predicate = compile_where(where)
+            mask = np.fromiter((predicate(meta) for meta in self._metadatas), dtype=bool, count=len(self._metadatas))
+            self._filter_masks[key] = mask
+            while len(self._filter_masks) > MAX_CACHED_FILTERS:
+                self._filter_masks.popitem(last=False)
+        else:
+            self._filter_masks.move_to_end(key)
+        return mask
+
+    def get_embedding(self, item_id: str) -> Optional[np.ndarray]:
+        """Copy of one stored vector, or None when the ID is not indexed"""
+        with self._lock:
+            row = self._rows.get(item_id)
+            return None if row is None else np.array(self._matrix[row])
+
+    def query(self, embedding, top_k: int, where: Optional[Dict] = None) -> Dict:
+        """
+        Exact top-k nearest neighbours by squared L2 distance
+
+        Args:
+            embedding: Query vector
+            top_k: Number of results
+            where: Optional ChromaDB-style metadata filter; only matching
+                documents are ranked, so up to top_k of them are returned
+
+        Returns:
+            collection.query()-shaped dict with ids, metadatas and distances
+        """
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        with self._lock:
+            count = len(self._ids)
+            mask = self._where_mask(where) if where else None
+            top_k = min(top_k, count if mask is None else int(mask.sum()))
+            if top_k <= 0:
+                return {'ids': [[]], 'metadatas': [[]], 'distances': [[]]}
+
+            # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2, one matmul over all rows
+            distances = self._norms[:count] - 2.0 * (self._matrix[:count] @ query) + float(query @ query)
+            if mask is not None:
+                distances[~mask] = np.inf
+            if top_k < count:
+                rows = np.argpartition(distances, top_k - 1)[:top_k]
+            else:
+                rows = np.arange(count)
+            rows = rows[np.argsort(distances[rows], kind="stable")]
+
+            return {
+                'ids': [[self._ids[row] for row in rows]],
+                'metadatas': [[self._metadatas[row] for row in rows]],
+                'distances': [[max(0.0, float(distances[row])) for row in rows]]
+            }
+
+    @classmethod
+    def from_collection(cls, collection, batch_size: int = 500) -> "VectorIndex":
+        """
+        Build an index from every record of a ChromaDB collection
+
+        Args:
+            collection: ChromaDB collection
+            batch_size: Records per paginated collection.get() call
+
+        Returns:
+            VectorIndex holding the collection's vectors and metadata
+        """
+        index = cls(collection.name)
+        offset = 0
+        while True:
+            page = collection.get(limit=batch_size, offset=offset, include=["embeddings", "metadatas"])
+            ids = page.get('ids') or []
+            if not ids:
+                break
+            index.upsert(ids, page['embeddings'], page['metadatas'])
+            offset += len(ids)
+            if len(ids) < batch_size:
+                break
+        return index
+
+    def save(self, directory: str):
+        """
+        Write the snapshot files (atomically replaced)
+
+        Args:
+            directory: Snapshot directory
+        """
+        os.makedirs(directory, exist_ok=True)
+        matrix_path = os.path.join(directory, f"{self.name}.npy")
+        sidecar_path = os.path.join(directory, f"{self.name}.json")
+        with self._lock:
+            count = len(self._ids)
+            with open(matrix_path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(self._matrix[:count]))
+            with open(sidecar_path + ".tmp", "w") as f:
+                json.dump({"ids": self._ids, "metadatas": self._metadatas}, f)
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(sidecar_path + ".tmp", sidecar_path)
+
+    @classmethod
+    def load(cls, name: str, directory: str) -> Optional["VectorIndex"]:
+        """
+        Open a snapshot with the matrix memory-mapped (copy-on-write)
+
+        Args:
+            name: Collection name
+            directory: Snapshot directory
+
+        Returns:
+            VectorIndex, or None when no readable snapshot exists
+        """
+        matrix_path = os.path.join(directory, f"{name}.npy")
+        sidecar_path = os.path.join(directory, f"{name}.json")
+        try:
+            matrix = np.load(matrix_path, mmap_mode="c")
+            with open(sidecar_path) as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if matrix.ndim != 2 or matrix.shape[0] != len(sidecar["ids"]):
+            return None
+
+        index = cls(name)
+        index._matrix = matrix
+        index._norms = np.einsum("ij,ij->i", matrix, matrix).astype(np.float32)
+        index._ids = list(sidecar["ids"])
+        index._metadatas = list(sidecar["metadatas"])
+        index._rows = {item_id: row for row, item_id in enumerate(index._ids)}
+        return index
+
+    @classmethod
+    def open(cls, collection, directory: str, batch_size: int = 500) -> "VectorIndex":
+        """
+        Load the collection's snapshot, rebuilding it from ChromaDB when stale
+
+        A snapshot whose record count differs from the collection's is
+        treated as stale (written before another process changed the
+        collection) and rebuilt.
+
+        Args:
+            collection: ChromaDB collection (source of truth)
+            directory: Snapshot directory
+            batch_size: Records per collection.get() call when rebuilding
+
+        Returns:
+            VectorIndex in sync with the collection
+        """
+        index = cls.load(collection.name, directory)
+        if index is not None and len(index) == collection.count():
+            logger.info(f"✅ Loaded vector index snapshot '{collection.name}' ({len(index)} vectors)")
+            return index
+
+        index = cls.from_collection(collection, batch_size)
+        index.save(directory)
+        logger.info(f"✅ Built vector index '{collection.name}' from ChromaDB ({len(index)} vectors)")
+        return index
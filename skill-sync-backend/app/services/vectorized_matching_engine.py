@@ -0,0 +1,601 @@
+"""
+Vectorized Matching Engine - Matrix scoring for batch similarity computation
+Part of the Hybrid Matching Strategy for performance optimization
+
+Scores whole blocks of students x internships with NumPy array operations instead
+of calling MatchingEngine.calculate_match_score once per pair:
+- Embeddings are loaded once into contiguous float32 matrices
+- Semantic similarity for a block is a single normalized matrix product
+- Skills, experience, education and credentials are scored as array operations
+- Optional two-stage mode: a cosine top-N shortlist per candidate, then full
+  rule-based scoring of the shortlisted pairs only
+
+Produces the same component and overall scores as MatchingEngine.calculate_match_score.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from app.models.resume import parse_experience_years
+from app.services.matching_engine import MatchingEngine
+from app.services.skill_index import SkillIndex
+
+logger = logging.getLogger(__name__)
+
+# Pairs per chunk when scoring an explicit pair list (bounds the gathered skill arrays)
+PAIR_CHUNK_SIZE = 4096
+
+
+class CandidateFeatures:
+    """Per-candidate scoring inputs, computed once per batch"""
+
+    def __init__(
+        self,
+        skill_matrix: np.ndarray,
+        skill_relation: np.ndarray,
+        experience: np.ndarray,
+        has_education: np.ndarray,
+        education_level: np.ndarray,
+        credentials_score: np.ndarray
+    ):
+        self.skill_matrix = skill_matrix          # (n_candidates, n_candidate_skills) uint8
+        self.skill_relation = skill_relation      # (n_candidate_skills, n_requirement_skills) uint8
+        self.experience = experience              # (n_candidates,) float64
+        self.has_education = has_education        # (n_candidates,) bool
+        self.education_level = education_level    # (n_candidates,) int
+        self.credentials_score = credentials_score  # (n_candidates,) float64
+
+    def __len__(self) -> int:
+        return len(self.experience)
+
+    def slice(self, start: int, end: int) -> "CandidateFeatures":
+        """Return the features for candidates [start, end)"""
+        return CandidateFeatures(
+            skill_matrix=self.skill_matrix[start:end],
+            skill_relation=self.skill_relation,
+            experience=self.experience[start:end],
+            has_education=self.has_education[start:end],
+            education_level=self.education_level[start:end],
+            credentials_score=self.credentials_score[start:end]
+        )
+
+
+class InternshipFeatures:
+    """Per-internship scoring inputs, computed once per batch"""
+
+    def __init__(
+        self,
+        required_counts: np.ndarray,
+        preferred_counts: np.ndarray,
+        min_experience: np.ndarray,
+        max_experience: np.ndarray,
+        has_required_education: np.ndarray,
+        required_education_level: np.ndarray
+    ):
+        self.required_counts = required_counts    # (n_internships, n_requirement_skills) float64
+        self.preferred_counts = preferred_counts  # (n_internships, n_requirement_skills) float64
+        self.min_experience = min_experience      # (n_internships,) float64
+        self.max_experience = max_experience      # (n_internships,) float64
+        self.has_required_education = has_required_education      # (n_internships,) bool
+        self.required_education_level = required_education_level  # (n_internships,) int
+
+    def __len__(self) -> int:
+        return len(self.min_experience)
+
+
+class VectorizedMatchingEngine:
+    """
+    Batch scorer that mirrors MatchingEngine.calculate_match_score over matrices.
+
+    Usage:
+        engine = VectorizedMatchingEngine(MatchingEngine(rag_engine))
+        candidates, internships = engine.build_features(candidate_data_list, internship_data_list)
+        scores = engine.score_block(candidates, candidate_matrix, internships, internship_matrix)
+    """
+
+    def __init__(
+        self,
+        matching_engine: Optional[MatchingEngine] = None,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize vectorized engine
+
+        Args:
+            matching_engine: MatchingEngine whose weights and rules are mirrored
+            weights: Component weights to use instead (e.g. in worker processes
+                that do not construct a MatchingEngine)
+        """
+        self.matching_engine = matching_engine
+        self.weights = dict(weights) if weights is not None else matching_engine.weights
+
+    # ------------------------------------------------------------------
+    # Feature extraction (once per entity, not once per pair)
+    # ------------------------------------------------------------------
+
+    def build_features(
+        self,
+        candidates: List[Dict],
+        internships: List[Dict]
+    ) -> Tuple[CandidateFeatures, InternshipFeatures]:
+        """
+        Build candidate and internship feature arrays for a batch
+
+        Args:
+            candidates: Candidate profiles in MatchingEngine candidate_data format
+            internships: Internships in MatchingEngine internship_data format
+
+        Returns:
+            Tuple of (CandidateFeatures, InternshipFeatures)
+        """
+        # Skill IDs from an index owned by this batch (memory bounded by the batch
+        # vocabulary); columns/rows below are the sorted candidate/requirement IDs
+        skill_index = SkillIndex()
+        candidate_skill_ids = [set(skill_index.encode(c.get('all_skills'))) for c in candidates]
+        required_ids = [skill_index.encode(i.get('required_skills')) for i in internships]
+        preferred_ids = [skill_index.encode(i.get('preferred_skills')) for i in internships]
+
+        candidate_vocab = sorted(set().union(*candidate_skill_ids)) if candidate_skill_ids else []
+        requirement_vocab = sorted(set(
+            skill_id for ids in required_ids + preferred_ids for skill_id in ids
+        ))
+        candidate_column = {skill_id: col for col, skill_id in enumerate(candidate_vocab)}
+        requirement_column = {skill_id: col for col, skill_id in enumerate(requirement_vocab)}
+
+        # Candidate skill indicator matrix
+        skill_matrix = np.zeros((len(candidates), len(candidate_vocab)), dtype=np.uint8)
+        for row, ids in enumerate(candidate_skill_ids):
+            if ids:
+                skill_matrix[row, [candidate_column[i] for i in ids]] = 1
+
+        # Requirement skill count matrices (duplicates count, as in MatchingEngine)
+        required_counts = np.zeros((len(internships), len(requirement_vocab)), dtype=np.float64)
+        preferred_counts = np.zeros((len(internships), len(requirement_vocab)), dtype=np.float64)
+        for row, ids in enumerate(required_ids):
+            np.add.at(required_counts[row], [requirement_column[i] for i in ids], 1)
+        for row, ids in enumerate(preferred_ids):
+            np.add.at(preferred_counts[row], [requirement_column[i] for i in ids], 1)
+
+        # Precomputed substring relation between candidate and requirement skills
+        relation = skill_index.relation_matrix(candidate_vocab, requirement_vocab)
+
+        candidate_features = CandidateFeatures(
+            skill_matrix=skill_matrix,
+            skill_relation=relation,
+            experience=np.array(
+                [parse_experience_years(c.get('total_experience_years')) for c in candidates],
+                dtype=np.float64
+            ),
+            has_education=np.array([bool(c.get('education')) for c in candidates], dtype=bool),
+            education_level=np.array(
+                [MatchingEngine.get_candidate_education_level(c.get('education', [])) for c in candidates],
+                dtype=np.int64
+            ),
+            credentials_score=np.array(
+                [
+                    float(MatchingEngine._calculate_additional_credentials(
+                        c.get('projects', []), c.get('certifications', [])
+                    ))
+                    for c in candidates
+                ],
+                dtype=np.float64
+            )
+        )
+
+        internship_features = InternshipFeatures(
+            required_counts=required_counts,
+            preferred_counts=preferred_counts,
+            min_experience=np.array(
+                [float(i.get('min_experience', 0)) for i in internships], dtype=np.float64
+            ),
+            max_experience=np.array(
+                [float(i.get('max_experience', 10)) for i in internships], dtype=np.float64
+            ),
+            has_required_education=np.array(
+                [bool(i.get('required_education', '')) for i in internships], dtype=bool
+            ),
+            required_education_level=np.array(
+                [MatchingEngine.get_required_education_level(i.get('required_education', '')) for i in internships],
+                dtype=np.int64
+            )
+        )
+
+        return candidate_features, internship_features
+
+    @staticmethod
+    def build_embedding_matrix(
+        embeddings: List[Optional[List[float]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stack embeddings into a contiguous, L2-normalized float32 matrix
+
+        Args:
+            embeddings: One embedding (or None / empty when missing) per entity
+
+        Returns:
+            Tuple of (normalized matrix (n, d), valid mask (n,)).
+            Rows for missing or zero vectors are all zeros and marked invalid.
+        """
+        dim = next((len(e) for e in embeddings if e is not None and len(e) > 0), 0)
+        matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+        for row, embedding in enumerate(embeddings):
+            if embedding is not None and len(embedding) == dim and dim > 0:
+                matrix[row] = embedding
+
+        return VectorizedMatchingEngine.normalize_embedding_matrix(matrix)
+
+    @staticmethod
+    def normalize_embedding_matrix(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        L2-normalize an (n, d) embedding matrix, e.g. from RAGEngine bulk fetch
+
+        Args:
+            matrix: Embedding rows; missing entities are expected as zero rows
+
+        Returns:
+            Tuple of (normalized float32 matrix (n, d), valid mask (n,))
+        """
+        matrix = np.array(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1)
+        valid = norms > 0
+        matrix[valid] /= norms[valid, None]
+        return np.ascontiguousarray(matrix), valid
+
+    # ------------------------------------------------------------------
+    # Block scoring
+    # ------------------------------------------------------------------
+
+    def score_block(
+        self,
+        candidates: CandidateFeatures,
+        candidate_matrix: np.ndarray,
+        candidate_valid: np.ndarray,
+        internships: InternshipFeatures,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score every candidate x internship pair of a block
+
+        Args:
+            candidates: Candidate features for the block
+            candidate_matrix: Normalized candidate embeddings (n_c, d)
+            candidate_valid: Mask of candidates with a usable embedding
+            internships: Internship features
+            internship_matrix: Normalized internship embeddings (n_i, d)
+            internship_valid: Mask of internships with a usable embedding
+            rows, cols: Optional pair indices; when given only these pairs are
+                scored and every returned array is 1-D (one entry per pair)
+
+        Returns:
+            Dictionary of (n_c, n_i) arrays: one per component score, plus
+            'overall_score' and a boolean 'valid' mask. Pairs where either
+            embedding is missing are invalid (MatchingEngine raises for these).
+        """
+        if rows is None:
+            shape = (len(candidates), len(internships))
+            credentials = np.broadcast_to(candidates.credentials_score[:, None], shape)
+            valid = candidate_valid[:, None] & internship_valid[None, :]
+        else:
+            shape = (len(rows),)
+            credentials = candidates.credentials_score[rows]
+            valid = candidate_valid[rows] & internship_valid[cols]
+
+        scores = {
+            'semantic_similarity': self._semantic_block(candidate_matrix, internship_matrix, rows, cols),
+            'skills_match': self._skills_block(candidates, internships, rows, cols),
+            'experience_match': self._experience_block(candidates, internships, rows, cols),
+            'education_match': self._education_block(candidates, internships, rows, cols),
+            'projects_certifications': credentials
+        }
+
+        # Weighted sum in the same order as MatchingEngine for identical rounding
+        overall = np.zeros(shape, dtype=np.float64)
+        for key, weight in self.weights.items():
+            overall = overall + scores[key] * weight
+
+        scores['overall_score'] = overall
+        scores['valid'] = valid
+        return scores
+
+    @staticmethod
+    def nearest_internships(
+        candidate_matrix: np.ndarray,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray,
+        n_nearest: int
+    ) -> np.ndarray:
+        """
+        Stage one of two-stage scoring: each candidate's n nearest internships by cosine
+
+        Args:
+            candidate_matrix: Normalized candidate embeddings (n_c, d)
+            internship_matrix: Normalized internship embeddings (n_i, d)
+            internship_valid: Mask of internships with a usable embedding
+            n_nearest: Neighbours kept per candidate
+
+        Returns:
+            Boolean mask (n_c, n_i)
+        """
+        n_candidates, n_internships = candidate_matrix.shape[0], internship_matrix.shape[0]
+        if n_nearest >= n_internships:
+            return np.ones((n_candidates, n_internships), dtype=bool)
+
+        similarity = VectorizedMatchingEngine._semantic_block(candidate_matrix, internship_matrix)
+        similarity[:, ~internship_valid] = -np.inf
+        nearest = np.zeros((n_candidates, n_internships), dtype=bool)
+        if n_nearest > 0:
+            top = np.argpartition(-similarity, n_nearest - 1, axis=1)[:, :n_nearest]
+            np.put_along_axis(nearest, top, True, axis=1)
+        return nearest
+
+    def score_selected(
+        self,
+        candidates: CandidateFeatures,
+        candidate_matrix: np.ndarray,
+        candidate_valid: np.ndarray,
+        internships: InternshipFeatures,
+        internship_matrix: np.ndarray,
+        internship_valid: np.ndarray,
+        pairs: np.ndarray,
+        retention: Optional[Dict] = None,
+        pinned: Optional[np.ndarray] = None,
+        ann_candidates: int = 0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score a block and compact it to the pairs to store (see select_pairs)
+
+        With ann_candidates > 0 only each candidate's nearest internships (plus
+        pinned pairs) get the full rule-based scoring; other pairs are skipped.
+        """
+        if ann_candidates <= 0 or ann_candidates >= len(internships):
+            scores = self.score_block(
+                candidates, candidate_matrix, candidate_valid,
+                internships, internship_matrix, internship_valid
+            )
+            return self.select_pairs(scores, pairs, retention=retention, pinned=pinned)
+
+        shortlist = self.nearest_internships(candidate_matrix, internship_matrix, internship_valid, ann_candidates)
+        if pinned is not None:
+            shortlist |= pinned
+        rows, cols = np.nonzero(pairs & shortlist)
+        scores = self.score_block(
+            candidates, candidate_matrix, candidate_valid,
+            internships, internship_matrix, internship_valid,
+            rows=rows, cols=cols
+        )
+
+        if retention is None:
+            keep = scores['valid']
+            compact = {
+                'rows': rows[keep].astype(np.int32),
+                'cols': cols[keep].astype(np.int32),
+                'failed': int((~keep).sum())
+            }
+            for key in ['overall_score', 'semantic_similarity', 'skills_match', 'experience_match']:
+                compact[key] = np.asarray(scores[key], dtype=np.float64)[keep]
+            return compact
+
+        # Scatter back into a block so retention works unchanged
+        shape = (len(candidates), len(internships))
+        block = {'valid': np.zeros(shape, dtype=bool)}
+        block['valid'][rows, cols] = scores['valid']
+        for key in ['overall_score', 'semantic_similarity', 'skills_match', 'experience_match']:
+            block[key] = np.zeros(shape, dtype=np.float64)
+            block[key][rows, cols] = scores[key]
+
+        selected = np.zeros(shape, dtype=bool)
+        selected[rows, cols] = True
+        return self.select_pairs(block, selected, retention=retention, pinned=pinned)
+
+    @staticmethod
+    def select_pairs(
+        scores: Dict[str, np.ndarray],
+        pairs: Optional[np.ndarray] = None,
+        retention: Optional[Dict] = None,
+        pinned: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compact a scored block to the valid (and optionally selected) pairs
+
+        Args:
+            scores: Output of score_block
+            pairs: Optional boolean mask of pairs to keep
+            retention: Optional top-K settings (top_k_per_student, top_k_per_internship,
+                score_floor); when given only retained pairs are returned
+            pinned: Optional boolean mask of pairs always retained (e.g. applied pairs)
+
+        Returns:
+            Dictionary with 'rows' / 'cols' indices into the block and 1-D arrays
+            for the stored scores, plus 'failed' (selected pairs without embeddings)
+        """
+        selected = np.ones_like(scores['valid']) if pairs is None else pairs
+        keep = selected & scores['valid']
+        failed = int((selected & ~scores['valid']).sum())
+        if retention is not None:
+            retained = VectorizedMatchingEngine.retention_mask(scores['overall_score'], keep, **retention)
+            if pinned is not None:
+                retained |= pinned & keep
+            keep = retained
+        rows, cols = np.nonzero(keep)
+        compact = {
+            'rows': rows.astype(np.int32),
+            'cols': cols.astype(np.int32),
+            'failed': failed
+        }
+        for key in ['overall_score', 'semantic_similarity', 'skills_match', 'experience_match']:
+            compact[key] = np.asarray(scores[key], dtype=np.float64)[rows, cols]
+        return compact
+
+    @staticmethod
+    def retention_mask(
+        overall: np.ndarray,
+        selectable: np.ndarray,
+        top_k_per_student: int,
+        top_k_per_internship: int,
+        score_floor: float
+    ) -> np.ndarray:
+        """
+        Pairs to store in top-K retention mode, chosen by partial sort (argpartition)
+
+        Keeps each student's top-K internships, each internship's top-K students within
+        the block, and every pair at or above the score floor. Column top-K is local to
+        the block, so it is a superset of the global top-K; the persistence layer prunes
+        the rest after all blocks are written.
+
+        Args:
+            overall: Overall scores (n_candidates, n_internships)
+            selectable: Boolean mask of pairs that may be kept
+            top_k_per_student: Internships kept per student
+            top_k_per_internship: Students kept per internship
+            score_floor: Pairs scoring at or above this are always kept
+
+        Returns:
+            Boolean mask (n_candidates, n_internships)
+        """
+        ranked = np.where(selectable, overall, -np.inf)
+        keep = ranked >= score_floor
+        n_candidates, n_internships = ranked.shape
+
+        if 0 < top_k_per_student < n_internships:
+            top = np.argpartition(-ranked, top_k_per_student - 1, axis=1)[:, :top_k_per_student]
+            np.put_along_axis(keep, top, True, axis=1)
+        elif top_k_per_student >= n_internships:
+            keep[:] = True
+
+        if 0 < top_k_per_internship < n_candidates:
+            top = np.argpartition(-ranked, top_k_per_internship - 1, axis=0)[:top_k_per_internship, :]
+            np.put_along_axis(keep, top, True, axis=0)
+        elif top_k_per_internship >= n_candidates:
+            keep[:] = True
+
+        return keep & selectable
+
+    @staticmethod
+    def _pair_view(
+        candidate_values: np.ndarray,
+        internship_values: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Align per-candidate and per-internship values as a block (broadcast) or per pair"""
+        if rows is None:
+            return candidate_values[:, None], internship_values[None, :]
+        return candidate_values[rows], internship_values[cols]
+
+    @staticmethod
+    def _semantic_block(
+        candidate_matrix: np.ndarray,
+        internship_matrix: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Cosine similarity (as percentage) via one normalized matrix product"""
+        if candidate_matrix.shape[1] == 0 or internship_matrix.shape[1] == 0:
+            shape = (candidate_matrix.shape[0], internship_matrix.shape[0]) if rows is None else (len(rows),)
+            return np.zeros(shape, dtype=np.float64)
+        if rows is None:
+            return (candidate_matrix @ internship_matrix.T).astype(np.float64) * 100
+        return np.einsum(
+            'ij,ij->i', candidate_matrix[rows], internship_matrix[cols]
+        ).astype(np.float64) * 100
+
+    @staticmethod
+    def _skills_block(
+        candidates: CandidateFeatures,
+        internships: InternshipFeatures,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Skills match score (0-100) for every pair"""
+        # (n_c, n_req_skills): does the candidate satisfy each requirement skill?
+        satisfied = (
+            candidates.skill_matrix.astype(np.float32) @ candidates.skill_relation.astype(np.float32)
+        ) > 0
+        satisfied = satisfied.astype(np.float64)
+
+        required_total = internships.required_counts.sum(axis=1)
+        preferred_total = internships.preferred_counts.sum(axis=1)
+
+        if rows is None:
+            matched_required = satisfied @ internships.required_counts.T
+            matched_preferred = satisfied @ internships.preferred_counts.T
+            required_total = required_total[None, :]
+            preferred_total = preferred_total[None, :]
+        else:
+            matched_required = np.zeros(len(rows), dtype=np.float64)
+            matched_preferred = np.zeros(len(rows), dtype=np.float64)
+            for start in range(0, len(rows), PAIR_CHUNK_SIZE):
+                chunk = slice(start, start + PAIR_CHUNK_SIZE)
+                pair_satisfied = satisfied[rows[chunk]]
+                matched_required[chunk] = np.einsum(
+                    'ij,ij->i', pair_satisfied, internships.required_counts[cols[chunk]]
+                )
+                matched_preferred[chunk] = np.einsum(
+                    'ij,ij->i', pair_satisfied, internships.preferred_counts[cols[chunk]]
+                )
+            required_total = required_total[cols]
+            preferred_total = preferred_total[cols]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required_score = np.where(
+                required_total > 0, (matched_required / required_total) * 70, 0.0
+            )
+            preferred_score = np.where(
+                preferred_total > 0, (matched_preferred / preferred_total) * 30, 30.0
+            )
+
+        return np.where(required_total > 0, required_score + preferred_score, 100.0)
+
+    @staticmethod
+    def _experience_block(
+        candidates: CandidateFeatures,
+        internships: InternshipFeatures,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Experience match score (0-100) for every pair"""
+        exp, min_exp = VectorizedMatchingEngine._pair_view(
+            candidates.experience, internships.min_experience, rows, cols
+        )
+        _, max_exp = VectorizedMatchingEngine._pair_view(
+            candidates.experience, internships.max_experience, rows, cols
+        )
+        gap = min_exp - exp
+
+        below = np.select(
+            [gap <= 0.5, gap <= 1, gap <= 2],
+            [90.0, 70.0, 50.0],
+            default=30.0
+        )
+        return np.where(
+            (exp >= min_exp) & (exp <= max_exp),
+            100.0,
+            np.where(exp < min_exp, below, 85.0)
+        )
+
+    @staticmethod
+    def _education_block(
+        candidates: CandidateFeatures,
+        internships: InternshipFeatures,
+        rows: Optional[np.ndarray] = None,
+        cols: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Education match score (0-100) for every pair"""
+        candidate_level, required_level = VectorizedMatchingEngine._pair_view(
+            candidates.education_level, internships.required_education_level, rows, cols
+        )
+
+        graded = np.where(
+            candidate_level >= required_level,
+            100.0,
+            np.where(candidate_level == required_level - 1, 80.0, 50.0)
+        )
+        has_education, has_requirement = VectorizedMatchingEngine._pair_view(
+            candidates.has_education, internships.has_required_education, rows, cols
+        )
+        neutral = ~has_education | ~has_requirement
+        return np.where(neutral, 70.0, graded)
@@ -0,0 +1,94 @@
+"""
+Text chunking utilities for embedding long documents
+
+all-MiniLM-L6-v2 truncates input at 256 word pieces, so resumes and job
+descriptions are split on section boundaries (blank lines and heading lines)
+and packed into chunks that fit the model window.
+"""
+
+import re
+from typing import List
+
+# Common resume / JD section headings that start a new section even without a blank line
+SECTION_HEADINGS = {
+    'summary', 'profile', 'objective', 'about', 'about me', 'experience', 'work experience',
+    'professional experience', 'employment', 'internships', 'education', 'skills',
+    'technical skills', 'projects', 'certifications', 'achievements', 'awards',
+    'publications', 'languages', 'interests', 'activities', 'responsibilities',
+    'requirements', 'qualifications', 'description', 'required skills', 'preferred skills'
+}
+
+_HEADING_PUNCTUATION = re.compile(r'[:\-–—|•*#=_]+$')
+
+
+def _is_heading(line: str) -> bool:
+    """Short line that names a section (known heading, ALL CAPS, or ending with a colon)"""
+    stripped = line.strip()
+    if not stripped or len(stripped.split()) > 5:
+        return False
+    name = _HEADING_PUNCTUATION.sub('', stripped).strip().lower()
+    if name in SECTION_HEADINGS:
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    return (len(letters) >= 3 and stripped.isupper()) or stripped.endswith(':')
+
+
+def split_sections(text: str) -> List[str]:
+    """
+    Split a document into sections on blank lines and heading lines
+
+    Args:
+        text: Document text
+
+    Returns:
+        Non-empty sections in document order (headings stay with their body)
+    """
+    sections = []
+    current: List[str] = []
+    for line in (text or '').splitlines():
+        if not line.strip():
+            if current:
+                sections.append('\n'.join(current))
+                current = []
+            continue
+        if _is_heading(line) and current:
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line.rstrip())
+    if current:
+        sections.append('\n'.join(current))
+    return sections
+
+
+def chunk_document(text: str, max_words: int = 160) -> List[str]:
+    """
+    Split a document into chunks of at most max_words words on section boundaries
+
+    Consecutive short sections are packed into one chunk; a section longer
+    than max_words is split into word windows that are never packed with
+    neighbouring sections.
+
+    Args:
+        text: Document text
+        max_words: Word budget per chunk (keep well under the model's token window)
+
+    Returns:
+        Chunks in document order (empty list for blank text)
+    """
+    chunks = []
+    current: List[str] = []
+    current_words = 0
+    for section in split_sections(text):
+        words = section.split()
+        if current and (len(words) > max_words or current_words + len(words) > max_words):
+            chunks.append('\n\n'.join(current))
+            current, current_words = [], 0
+        if len(words) > max_words:
+            for start in range(0, len(words), max_words):
+                chunks.append(' '.join(words[start:start + max_words]))
+            continue
+        current.append(section)
+        current_words += len(words)
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
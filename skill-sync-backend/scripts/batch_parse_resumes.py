@@ -54,13 +54,6 @@ def parse_single_resume(resume, db, api_key_name, api_key):
             'parsed_content': resume_text
         }
         
-        # Generate embedding (like AI Resume Intelligence does)
-        embedding = None
-        if resume.parsed_content and resume.extracted_skills:
-            embedding_text = f"{resume_text}\n\nSkills: {', '.join(resume.extracted_skills)}"
-            embedding = rag_engine.generate_embedding(embedding_text)
-            print(f"   🔢 Generated embedding: dimension {len(embedding)}")
-        
         # Update resume in database (store only in ChromaDB, not PostgreSQL!)
         resume.parsed_content = resume_text
         resume.parsed_data = parsed_data
@@ -69,15 +62,18 @@ def parse_single_resume(resume, db, api_key_name, api_key):
         
         # Store in RAG engine (ChromaDB) - single source of truth
         if resume.parsed_content and resume.extracted_skills:
+            # Generate embedding once and hand the vector to the store
+            embedding = rag_engine.document_embedding(
+                rag_engine.resume_embedding_text(resume.parsed_content, resume.extracted_skills)
+            )
+            print(f"   🔢 Generated embedding: dimension {len(embedding)}")
             try:
                 embedding_id = rag_engine.store_resume_embedding(
                     resume_id=str(resume.resume_id),
                     content=resume.parsed_content,
                     skills=resume.extracted_skills,
-                    metadata={
-                        "student_id": resume.student_id,
-                        "file_name": resume.file_name
-                    }
+                    metadata=rag_engine.resume_metadata(resume),
+                    embedding=embedding
                 )
                 resume.embedding_id = embedding_id
                 print(f"   ✅ Indexed in ChromaDB: {embedding_id}")
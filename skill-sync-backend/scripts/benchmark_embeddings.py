@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Embedding Backend Benchmark
+===========================
+
+Compares the EMBEDDING_BACKEND implementations (torch, onnx, onnx-int8) on CPU:
+
+- model load time
+- encode throughput (texts/second) on synthetic resume-length texts
+- peak resident memory (RSS) of a process that loads and uses the backend
+- cosine agreement with the torch backend on the same texts
+
+Each backend runs in its own subprocess so its imports (torch, transformers,
+onnxruntime) and memory are measured in isolation.
+
+Usage:
+    python scripts/benchmark_embeddings.py
+    python scripts/benchmark_embeddings.py --backends torch onnx-int8 --texts 2000 --threads 1
+    python scripts/benchmark_embeddings.py --output embedding_benchmark.json
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import resource
+import tempfile
+import argparse
+import platform
+import subprocess
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "python java react sql docker kubernetes aws machine learning data pipeline api backend frontend "
+    "designed implemented optimized deployed tested led team project internship university course "
+    "developed scalable service analytics dashboard model training inference database schema"
+).split()
+
+
+def vectors_path(backend):
+    return os.path.join(tempfile.gettempdir(), f"embedding_benchmark_{backend}.npy")
+
+
+def print_header(text):
+    """Print formatted header"""
+    print("\n" + "=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=1000, help="Texts encoded per backend")
+    parser.add_argument("--words", type=int, default=200, help="Average words per text")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Threads per backend (0 = library default); 1 gives per-core throughput")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results to a JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def synthetic_texts(count, words, seed):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(max(1, int(rng.gauss(words, words / 3)))))
+        for _ in range(count)
+    ]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def run_worker(args):
+    """Load one backend, encode the texts and print a JSON result line"""
+    if args.threads:
+        os.environ["EMBEDDING_ONNX_THREADS"] = str(args.threads)
+        os.environ["OMP_NUM_THREADS"] = str(args.threads)
+    from app.services.embedding_backends import create_embedding_backend
+
+    texts = synthetic_texts(args.texts, args.words, args.seed)
+    rss_before = peak_rss_mb()
+
+    started = time.perf_counter()
+    backend = create_embedding_backend(args.worker)
+    if args.threads and args.worker == "torch":
+        import torch
+        torch.set_num_threads(args.threads)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = peak_rss_mb()
+
+    backend.encode(texts[:args.batch_size], batch_size=args.batch_size)  # warm-up
+    started = time.perf_counter()
+    vectors = backend.encode(texts, batch_size=args.batch_size)
+    encode_seconds = time.perf_counter() - started
+
+    np.save(vectors_path(args.worker), vectors)
+    print(json.dumps({
+        "backend": args.worker,
+        "load_seconds": round(load_seconds, 3),
+        "encode_seconds": round(encode_seconds, 3),
+        "texts_per_second": round(len(texts) / encode_seconds, 1),
+        "rss_baseline_mb": round(rss_before, 1),
+        "rss_after_load_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(peak_rss_mb(), 1),
+        "torch_imported": "torch" in sys.modules
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    print_header(f"EMBEDDING BACKENDS: {args.texts} texts x ~{args.words} words, batch {args.batch_size}")
+    results = []
+    for backend in args.backends:
+        command = [sys.executable, os.path.abspath(__file__), "--worker", backend,
+                   "--texts", str(args.texts), "--words", str(args.words),
+                   "--batch-size", str(args.batch_size), "--threads", str(args.threads),
+                   "--seed", str(args.seed)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+        if completed.returncode != 0 or not lines:
+            print(f"  {backend}: failed\n{completed.stderr.strip()[-2000:]}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    reference = np.load(vectors_path("torch")) if any(r["backend"] == "torch" for r in results) else None
+    for result in results:
+        if reference is not None and result["backend"] != "torch":
+            vectors = np.load(vectors_path(result["backend"]))
+            cosine = np.sum(vectors * reference, axis=1) / (
+                np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1))
+            result["cosine_vs_torch_mean"] = round(float(cosine.mean()), 5)
+            result["cosine_vs_torch_min"] = round(float(cosine.min()), 5)
+
+    base = next((r for r in results if r["backend"] == "torch"), None)
+    print(f"\n{'backend':<11}{'load s':>8}{'texts/s':>10}{'speedup':>9}{'RSS MB':>9}{'torch':>7}{'cos min':>9}")
+    for result in results:
+        speedup = result["texts_per_second"] / base["texts_per_second"] if base else 1.0
+        print(f"{result['backend']:<11}{result['load_seconds']:>8.2f}{result['texts_per_second']:>10.1f}"
+              f"{speedup:>8.2f}x{result['rss_peak_mb']:>9.0f}{str(result['torch_imported']):>7}"
+              f"{result.get('cosine_vs_torch_min', 1.0):>9.4f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "texts": args.texts,
+                    "words": args.words,
+                    "batch_size": args.batch_size,
+                    "threads": args.threads,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count()
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
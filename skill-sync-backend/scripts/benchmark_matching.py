@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Matching Benchmark Suite
+========================
+
+Reproducible timings for the matching and ranking hot paths on synthetic data:
+
+- MatchingEngine.calculate_match_score          (per pair)
+- BatchMatchingService.compute_all_matches      (full and no-op incremental runs)
+- rank_candidates_for_internship                (POST /api/filter/rank-candidates/{id})
+- get_recommendations_for_student               (GET /api/recommendations/for-me)
+
+Synthetic students, resumes, internships, applications and clustered embeddings
+are generated at a chosen scale into a dedicated database and ChromaDB path
+(never the configured application database). Results (throughput and
+p50/p95/p99 latency) are written as JSON and compared with a stored baseline;
+the script exits with status 1 when a hot path regresses beyond the tolerance.
+
+Usage:
+    python scripts/benchmark_matching.py --scale 1k
+    python scripts/benchmark_matching.py --scale 10k --database-url postgresql://.../skillsync_bench
+    python scripts/benchmark_matching.py --scale 1k --update-baseline
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# students, internships per scale
+SCALES = {
+    "1k": (1000, 200),
+    "10k": (10000, 500),
+    "100k": (100000, 1000),
+}
+
+SKILL_TOPICS = [
+    ["Python", "Django", "FastAPI", "SQL", "PostgreSQL", "REST APIs", "Docker", "Redis"],
+    ["JavaScript", "TypeScript", "React", "Node.js", "CSS", "HTML", "Next.js", "GraphQL"],
+    ["Machine Learning", "PyTorch", "TensorFlow", "NumPy", "Pandas", "Scikit-learn", "NLP", "Statistics"],
+    ["Java", "Spring Boot", "Kotlin", "Microservices", "Kafka", "MySQL", "JUnit", "Maven"],
+    ["AWS", "Kubernetes", "Terraform", "Linux", "CI/CD", "Ansible", "Prometheus", "Bash"],
+    ["C++", "C", "Embedded Systems", "RTOS", "Verilog", "Computer Vision", "OpenCV", "CUDA"],
+]
+DEGREES = ["Bachelor of Technology", "Master of Science", "PhD", "Diploma", "Bachelor of Science"]
+REQUIRED_EDUCATION = ["", "Bachelor's in CS", "Masters", "Bachelor's degree"]
+LOCATIONS = ["Remote", "Bangalore", "Chennai", "Hyderabad", "Pune", "Mumbai"]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def print_header(text):
+    """Print formatted header"""
+    print("\n" + "=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark matching and ranking hot paths")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="Dataset scale (students)")
+    parser.add_argument("--students", type=int, help="Override number of students")
+    parser.add_argument("--internships", type=int, help="Override number of internships")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db",
+                        help="Benchmark database (tables are created and, with --reset, dropped)")
+    parser.add_argument("--chroma-path", default="./benchmark_chroma", help="Benchmark ChromaDB directory")
+    parser.add_argument("--reset", action="store_true", help="Drop and regenerate existing benchmark data")
+    parser.add_argument("--embedding-dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pair-samples", type=int, default=2000, help="calculate_match_score calls")
+    parser.add_argument("--route-samples", type=int, default=100, help="Calls per API hot path")
+    parser.add_argument("--batch-runs", type=int, default=1, help="Full compute_all_matches runs")
+    parser.add_argument("--output", help="Write this run's results to a JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="Allowed slowdown before flagging a regression (0.20 = 20%%)")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Point the app at the benchmark database and ChromaDB before any app import"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["CHROMA_DB_PATH"] = args.chroma_path
+    os.environ["REMATCH_QUEUE_ENABLED"] = "false"
+
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+def _clustered_embeddings(rng, topics, centers, noise=0.6):
+    vectors = centers[topics] + rng.normal(scale=noise, size=(len(topics), centers.shape[1]))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def generate_dataset(db, rag_engine, n_students, n_internships, dim, seed):
+    """Insert synthetic users, resumes, internships, applications and embeddings"""
+    from app.models.user import User, UserRole
+    from app.models.resume import Resume
+    from app.models.internship import Internship
+    from app.models.application import Application
+
+    print_header(f"Generating {n_students} students / {n_internships} internships")
+    rng = np.random.default_rng(seed)
+    pyrng = random.Random(seed)
+    centers = rng.normal(size=(len(SKILL_TOPICS), dim))
+    chunk = 5000
+    start = time.perf_counter()
+
+    n_companies = max(1, n_internships // 20)
+    db.bulk_insert_mappings(User, [
+        {"email": f"bench-company-{i}@bench.test", "hashed_password": "x",
+         "full_name": f"Bench Company {i}", "role": UserRole.company}
+        for i in range(n_companies)
+    ])
+    for offset in range(0, n_students, chunk):
+        db.bulk_insert_mappings(User, [
+            {"email": f"bench-student-{i}@bench.test", "hashed_password": "x",
+             "full_name": f"Bench Student {i}", "role": UserRole.student,
+             "phone": f"+91{9000000000 + i}"}
+            for i in range(offset, min(offset + chunk, n_students))
+        ])
+    db.commit()
+
+    company_ids = [row[0] for row in db.query(User.id).filter(User.role == UserRole.company).order_by(User.id)]
+    student_ids = [row[0] for row in db.query(User.id).filter(User.role == UserRole.student).order_by(User.id)]
+
+    # Internships
+    internship_topics = rng.integers(0, len(SKILL_TOPICS), size=n_internships)
+    internship_rows = []
+    for i, topic in enumerate(internship_topics):
+        pool = SKILL_TOPICS[topic]
+        internship_rows.append({
+            "company_id": company_ids[i % len(company_ids)],
+            "title": f"{pool[0]} Intern {i}",
+            "description": f"Work on {', '.join(pool[:4])} projects.",
+            "required_skills": pyrng.sample(pool, 4),
+            "preferred_skills": pyrng.sample(SKILL_TOPICS[pyrng.randrange(len(SKILL_TOPICS))], 2),
+            "min_experience": float(pyrng.choice([0, 0, 1, 2])),
+            "max_experience": float(pyrng.choice([2, 3, 5])),
+            "required_education": pyrng.choice(REQUIRED_EDUCATION),
+            "location": pyrng.choice(LOCATIONS),
+            "duration": "6 months",
+            "stipend": "20000",
+            "is_active": 1,
+            "content_hash": f"bench-internship-{i}",
+        })
+    db.bulk_insert_mappings(Internship, internship_rows)
+    db.commit()
+    internship_ids = [row[0] for row in db.query(Internship.id).order_by(Internship.id)]
+
+    # Resumes
+    student_topics = rng.integers(0, len(SKILL_TOPICS), size=n_students)
+    for offset in range(0, n_students, chunk):
+        rows = []
+        for i in range(offset, min(offset + chunk, n_students)):
+            pool = SKILL_TOPICS[student_topics[i]]
+            skills = pyrng.sample(pool, pyrng.randint(3, 7)) + pyrng.sample(
+                SKILL_TOPICS[pyrng.randrange(len(SKILL_TOPICS))], pyrng.randint(0, 3)
+            )
+            rows.append({
+                "student_id": student_ids[i],
+                "file_path": f"/bench/resume_{i}.pdf",
+                "file_name": f"resume_{i}.pdf",
+                "parsed_content": f"Student {i} with experience in {', '.join(skills)}",
+                "parsed_data": {
+                    "all_skills": skills,
+                    "total_experience_years": round(pyrng.choice([0, 0.5, 1, 1.5, 2, 3, 4]), 1),
+                    "education": [{"degree": pyrng.choice(DEGREES)}],
+                    "projects": [{}] * pyrng.randint(0, 5),
+                    "certifications": [{}] * pyrng.randint(0, 3),
+                },
+                "extracted_skills": skills,
+                "is_active": 1,
+                "is_tailored": 0,
+                "content_hash": f"bench-resume-{i}",
+            })
+        db.bulk_insert_mappings(Resume, rows)
+        db.commit()
+    resume_rows = db.query(Resume.id, Resume.student_id).order_by(Resume.id).all()
+    db.bulk_update_mappings(Resume, [{"id": row.id, "embedding_id": f"resume_{row.id}"} for row in resume_rows])
+    db.commit()
+
+    # Applications: ~5% of students apply to 3 internships
+    applicants = pyrng.sample(range(n_students), max(1, n_students // 20))
+    db.bulk_insert_mappings(Application, [
+        {"student_id": resume_rows[i].student_id, "internship_id": internship_id,
+         "resume_id": resume_rows[i].id, "status": "pending",
+         "application_similarity_score": pyrng.randint(40, 95)}
+        for i in applicants
+        for internship_id in pyrng.sample(internship_ids, min(3, len(internship_ids)))
+    ])
+    db.commit()
+
+    # Embeddings (clustered by topic so semantic and skill signals agree)
+    resume_vectors = _clustered_embeddings(rng, student_topics, centers)
+    internship_vectors = _clustered_embeddings(rng, internship_topics, centers)
+    for offset in range(0, n_students, chunk):
+        batch = resume_rows[offset:offset + chunk]
+        rag_engine.resume_collection.upsert(
+            ids=[f"resume_{row.id}" for row in batch],
+            embeddings=resume_vectors[offset:offset + len(batch)].tolist(),
+            metadatas=[{"student_id": row.student_id, "is_tailored": False} for row in batch],
+        )
+    for offset in range(0, n_internships, chunk):
+        batch = internship_ids[offset:offset + chunk]
+        rag_engine.internship_collection.upsert(
+            ids=[f"internship_{internship_id}" for internship_id in batch],
+            embeddings=internship_vectors[offset:offset + len(batch)].tolist(),
+            metadatas=[{"internship_id": str(internship_id)} for internship_id in batch],
+        )
+
+    print(f"✅ Generated dataset in {time.perf_counter() - start:.1f}s")
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+def summarize(durations, items=None):
+    """Latency percentiles (ms) and throughput for a list of call durations (seconds)"""
+    values = np.asarray(durations, dtype=np.float64)
+    total = float(values.sum())
+    items = items if items is not None else len(values)
+    return {
+        "calls": len(values),
+        "items": int(items),
+        "total_seconds": round(total, 4),
+        "throughput_per_second": round(items / total, 2) if total > 0 else 0.0,
+        "mean_ms": round(float(values.mean()) * 1000, 3),
+        "p50_ms": round(float(np.percentile(values, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(values, 95)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(values, 99)) * 1000, 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_match_score(db, rag_engine, samples, rng):
+    from app.models.resume import Resume
+    from app.models.internship import Internship
+    from app.services.matching_engine import MatchingEngine
+    from app.services.batch_matching_service import BatchMatchingService
+
+    resumes = db.query(Resume).filter(Resume.is_active == 1).limit(500).all()
+    internships = db.query(Internship).filter(Internship.is_active == 1).limit(500).all()
+    resume_vectors, _ = rag_engine.get_resume_embeddings([str(r.id) for r in resumes])
+    internship_vectors, _ = rag_engine.get_internship_embeddings([str(i.id) for i in internships])
+    candidates = [BatchMatchingService._prepare_candidate_data(r) for r in resumes]
+    postings = [BatchMatchingService._prepare_internship_data(i) for i in internships]
+
+    engine = MatchingEngine(rag_engine)
+    durations = []
+    for _ in range(samples):
+        i, j = rng.randrange(len(candidates)), rng.randrange(len(postings))
+        duration, _ = timed(
+            engine.calculate_match_score, candidates[i], postings[j], resume_vectors[i], internship_vectors[j]
+        )
+        durations.append(duration)
+    return summarize(durations)
+
+
+def bench_batch(session_factory, runs):
+    from app.services.batch_matching_service import BatchMatchingService
+
+    results = {}
+    durations, pairs = [], 0
+    for _ in range(runs):
+        db = session_factory()
+        try:
+            duration, stats = timed(BatchMatchingService(db).compute_all_matches, force_recompute=True)
+        finally:
+            db.close()
+        durations.append(duration)
+        pairs += stats.get("matches_computed", 0)
+    results["compute_all_matches_full"] = summarize(durations, items=pairs)
+
+    db = session_factory()
+    try:
+        duration, _ = timed(BatchMatchingService(db).compute_all_matches)
+    finally:
+        db.close()
+    results["compute_all_matches_incremental_noop"] = summarize([duration])
+    return results
+
+
+def bench_rank_candidates(db, samples, rng):
+    from app.models.internship import Internship
+    from app.models.user import User
+    from app.routes.intelligent_filtering import rank_candidates_for_internship
+
+    internships = db.query(Internship).filter(Internship.is_active == 1).all()
+    companies = {u.id: u for u in db.query(User).filter(User.id.in_({i.company_id for i in internships}))}
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for only_applicants in (False, True):
+            durations = []
+            for _ in range(samples):
+                internship = rng.choice(internships)
+                duration, _ = timed(loop.run_until_complete, rank_candidates_for_internship(
+                    internship_id=str(internship.id), include_explanations=False, limit=50, offset=0,
+                    only_applicants=only_applicants, min_match_score=None, max_match_score=None,
+                    min_experience=None, max_experience=None, filter_skills=None,
+                    education_level=None, exclude_flagged=False,
+                    db=db, current_user=companies[internship.company_id]
+                ))
+                durations.append(duration)
+            key = "rank_candidates_applicants" if only_applicants else "rank_candidates_all"
+            results[key] = summarize(durations)
+    finally:
+        loop.close()
+    return results
+
+
+def bench_recommendations(db, samples, rng):
+    from app.models.user import User, UserRole
+    from app.routes.recommendations import get_recommendations_for_student
+
+    students = db.query(User).filter(User.role == UserRole.student).limit(5000).all()
+    durations = []
+    for _ in range(samples):
+        duration, _ = timed(
+            get_recommendations_for_student,
+            page=1, page_size=10, min_score=None, max_score=None, skills=None, location=None,
+            experience_level=None, days_posted=None, sort_by="score", sort_order="desc",
+            db=db, current_user=rng.choice(students)
+        )
+        durations.append(duration)
+    return {"recommendations_for_student": summarize(durations)}
+
+
+# ----------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------
+
+def baseline_key(meta):
+    return f"{meta['scale']}:{meta['dialect']}"
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Flag hot paths slower than the baseline
+
+    A path regresses when its p95 latency grows, or its throughput drops, by
+    more than the tolerance.
+
+    Returns:
+        List of (name, metric, baseline value, current value) regressions
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] > 0 and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append((name, "p95_ms", previous["p95_ms"], current["p95_ms"]))
+        if current["throughput_per_second"] < previous["throughput_per_second"] * (1 - tolerance):
+            regressions.append((name, "throughput_per_second",
+                                previous["throughput_per_second"], current["throughput_per_second"]))
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).strip()
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from app.database.connection import Base, engine, SessionLocal
+    from app.models.user import User
+    from app.services.rag_engine import rag_engine
+
+    n_students, n_internships = SCALES[args.scale]
+    n_students = args.students or n_students
+    n_internships = args.internships or n_internships
+
+    if args.reset:
+        print_header("Resetting benchmark data")
+        Base.metadata.drop_all(bind=engine)
+        for collection in (rag_engine.resume_collection, rag_engine.internship_collection):
+            ids = collection.get(include=[])["ids"]
+            for offset in range(0, len(ids), 5000):
+                collection.delete(ids=ids[offset:offset + 5000])
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    rng = random.Random(args.seed)
+    try:
+        existing = db.query(User).count()
+        if existing == 0:
+            generate_dataset(db, rag_engine, n_students, n_internships, args.embedding_dim, args.seed)
+        else:
+            print(f"ℹ️  Reusing existing benchmark data ({existing} users); pass --reset to regenerate")
+
+        results = {}
+        print_header("MatchingEngine.calculate_match_score")
+        results["calculate_match_score"] = bench_match_score(db, rag_engine, args.pair_samples, rng)
+
+        print_header("BatchMatchingService.compute_all_matches")
+        results.update(bench_batch(SessionLocal, args.batch_runs))
+
+        print_header("rank_candidates_for_internship")
+        results.update(bench_rank_candidates(db, args.route_samples, rng))
+
+        print_header("get_recommendations_for_student")
+        results.update(bench_recommendations(db, args.route_samples, rng))
+    finally:
+        db.close()
+
+    meta = {
+        "scale": args.scale,
+        "students": n_students,
+        "internships": n_internships,
+        "dialect": engine.dialect.name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+    print_header("Results")
+    print(f"{'hot path':42} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'items/s':>12}")
+    for name, stats in results.items():
+        print(f"{name:42} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} "
+              f"{stats['p99_ms']:>10.2f} {stats['throughput_per_second']:>12.1f}")
+
+    run = {"meta": meta, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"\n💾 Wrote results to {args.output}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    key = baseline_key(meta)
+    exit_code = 0
+    if key in baselines:
+        regressions = compare_to_baseline(results, baselines[key]["results"], args.tolerance)
+        if regressions:
+            exit_code = 1
+            print(f"\n  Regressions against baseline {key} (tolerance {args.tolerance:.0%}):")
+            for name, metric, previous, current in regressions:
+                print(f"   - {name}: {metric} {previous} → {current}")
+        else:
+            print(f"\n✅ No regressions against baseline {key}")
+    else:
+        print(f"\nℹ️  No baseline for {key}")
+
+    if args.update_baseline:
+        baselines[key] = run
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"💾 Stored baseline {key} in {args.baseline}")
+        exit_code = 0
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
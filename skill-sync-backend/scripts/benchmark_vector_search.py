@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Vector Search Latency Benchmark
+===============================
+
+Measures RAGEngine.find_matching_internships latency as the internship
+collection grows (default 1k -> 10k -> 100k documents), next to the cost of
+the full collection.get() scan the search path used to run on every call.
+
+Each corpus size gets its own throwaway ChromaDB directory filled with
+random unit vectors (384 dimensions, like all-MiniLM-L6-v2), so no embedding
+model is loaded and the real database is never touched. With --vector-index
+the searches are served by the in-process VectorIndex (VECTOR_INDEX_ENABLED)
+instead of ChromaDB queries.
+
+Usage:
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --sizes 1000 10000 100000 --queries 200
+    python scripts/benchmark_vector_search.py --vector-index
+    python scripts/benchmark_vector_search.py --output vector_search_benchmark.json
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIMENSION = 384
+
+
+def print_header(text):
+    """Print formatted header"""
+    print("\n" + "=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark find_matching_internships latency vs corpus size")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000],
+                        help="Internship corpus sizes")
+    parser.add_argument("--resumes", type=int, default=100, help="Resumes indexed (query sources)")
+    parser.add_argument("--queries", type=int, default=100, help="Timed searches per corpus size")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--scan-repeats", type=int, default=3, help="Timed full collection.get() scans")
+    parser.add_argument("--vector-index", action="store_true", help="Serve searches from the in-memory VectorIndex")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results to a JSON file")
+    return parser.parse_args()
+
+
+def random_unit_vectors(rng, count):
+    vectors = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_engine(path, size, args, rng):
+    """RAGEngine on a fresh ChromaDB directory holding `size` internships"""
+    os.environ["CHROMA_DB_PATH"] = path
+    os.environ["VECTOR_INDEX_PATH"] = os.path.join(path, "vector_index")
+    os.environ["VECTOR_INDEX_ENABLED"] = "true" if args.vector_index else "false"
+    from app.services.rag_engine import RAGEngine
+
+    engine = RAGEngine()
+    internship_ids = [f"internship_{i}" for i in range(size)]
+    engine._upsert_bulk(
+        engine.internship_collection,
+        internship_ids,
+        random_unit_vectors(rng, size).tolist(),
+        [f"Internship {i}" for i in range(size)],
+        [{"internship_id": str(i), "title": f"Internship {i}", "required_skills": "Python", "num_skills": 1}
+         for i in range(size)]
+    )
+    engine._upsert_bulk(
+        engine.resume_collection,
+        [f"resume_{i}" for i in range(args.resumes)],
+        random_unit_vectors(rng, args.resumes).tolist(),
+        [f"Resume {i}" for i in range(args.resumes)],
+        [{"resume_id": str(i), "skills": "Python", "num_skills": 1} for i in range(args.resumes)]
+    )
+    return engine
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def benchmark_size(size, args, rng):
+    path = tempfile.mkdtemp(prefix=f"vector_search_{size}_")
+    try:
+        started = time.perf_counter()
+        engine = build_engine(path, size, args, rng)
+        load_seconds = time.perf_counter() - started
+
+        # Warm-up (with --vector-index this also builds the index from ChromaDB)
+        started = time.perf_counter()
+        engine.find_matching_internships("0", top_k=args.top_k)
+        first_query_seconds = time.perf_counter() - started
+        latencies = []
+        for query in range(args.queries):
+            started = time.perf_counter()
+            matches = engine.find_matching_internships(str(query % args.resumes), top_k=args.top_k)
+            latencies.append(time.perf_counter() - started)
+            assert len(matches) == min(args.top_k, size)
+
+        # The full scan removed from the search path, for reference (large
+        # collections can exceed SQLite's variable limit and fail outright)
+        scans = []
+        scan_error = None
+        for _ in range(args.scan_repeats):
+            started = time.perf_counter()
+            try:
+                engine.internship_collection.get()
+            except Exception as e:
+                scan_error = str(e)
+                break
+            scans.append(time.perf_counter() - started)
+
+        return {
+            "size": size,
+            "load_seconds": round(load_seconds, 2),
+            "first_query_seconds": round(first_query_seconds, 3),
+            "search_p50_ms": percentile_ms(latencies, 50),
+            "search_p95_ms": percentile_ms(latencies, 95),
+            "search_p99_ms": percentile_ms(latencies, 99),
+            "full_scan_ms": percentile_ms(scans, 50) if scans else None,
+            "full_scan_error": scan_error
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    backend = "in-memory VectorIndex" if args.vector_index else "ChromaDB"
+    print_header(f"VECTOR SEARCH ({backend}): sizes {args.sizes}, {args.queries} queries, top_k={args.top_k}")
+    results = []
+    for size in args.sizes:
+        result = benchmark_size(size, args, rng)
+        results.append(result)
+        print(f"  {size:>7} docs indexed in {result['load_seconds']:.1f}s, "
+              f"first query {result['first_query_seconds']:.2f}s")
+
+    print(f"\n{'docs':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'full scan ms':>14}")
+    for result in results:
+        print(f"{result['size']:>8}{result['search_p50_ms']:>9.2f}{result['search_p95_ms']:>9.2f}"
+              f"{result['search_p99_ms']:>9.2f}"
+              f"{result['full_scan_ms'] if result['full_scan_ms'] is not None else 'failed':>14}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "sizes": args.sizes,
+                    "resumes": args.resumes,
+                    "queries": args.queries,
+                    "top_k": args.top_k,
+                    "vector_index": args.vector_index,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count()
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
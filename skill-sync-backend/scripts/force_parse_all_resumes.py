@@ -106,12 +106,9 @@ def main():
                         resume_id=str(resume.id),
                         content=content,
                         skills=skills,
-                        metadata={
-                            'student_name': student.full_name,
-                            'email': student.email,
-                            'file_name': resume.file_name,
-                            'resume_id': resume.id
-                        }
+                        metadata=rag_engine.resume_metadata(
+                            resume, student_name=student.full_name, email=student.email
+                        )
                     )
                     print(f"  ✅ Indexed in ChromaDB")
                 except Exception as e:
@@ -34,39 +34,42 @@ def index_all_resumes():
         skipped_count = 0
         error_count = 0
         
-        for resume, student in resumes:
+        # Check which resumes are already indexed in one bulk lookup
+        _, missing = rag_engine.get_resume_embeddings([str(resume.id) for resume, _ in resumes])
+        
+        batch = []
+        names = []
+        for (resume, student), is_missing in zip(resumes, missing):
+            if not is_missing:
+                print(f"⏭️  Skipped: {student.full_name} (Resume #{resume.id}) - Already indexed")
+                skipped_count += 1
+                continue
+            
+            if resume.parsed_content and resume.extracted_skills:
+                batch.append({
+                    "resume_id": str(resume.id),
+                    "content": resume.parsed_content,
+                    "skills": resume.extracted_skills,
+                    "metadata": rag_engine.resume_metadata(resume, student_name=student.full_name)
+                })
+                names.append((student.full_name, resume.id))
+            else:
+                print(f"⚠️  Skipped: {student.full_name} (Resume #{resume.id}) - No content or skills")
+                skipped_count += 1
+        
+        # Index in batches: one encode pass and one bulk upsert per chunk
+        chunk_size = rag_engine.write_batch_size
+        for start in range(0, len(batch), chunk_size):
+            chunk = batch[start:start + chunk_size]
+            chunk_names = names[start:start + chunk_size]
             try:
-                # Check if already indexed
-                existing = rag_engine.resume_collection.get(
-                    ids=[f"resume_{resume.id}"],
-                    include=["metadatas"]
-                )
-                
-                if existing['ids'] and len(existing['ids']) > 0:
-                    print(f"⏭️  Skipped: {student.full_name} (Resume #{resume.id}) - Already indexed")
-                    skipped_count += 1
-                    continue
-                
-                # Index the resume
-                if resume.parsed_content and resume.extracted_skills:
-                    rag_engine.store_resume_embedding(
-                        resume_id=str(resume.id),
-                        content=resume.parsed_content,
-                        skills=resume.extracted_skills,
-                        metadata={
-                            "student_id": str(student.id),
-                            "student_name": student.full_name
-                        }
-                    )
-                    print(f"✅ Indexed: {student.full_name} (Resume #{resume.id})")
-                    indexed_count += 1
-                else:
-                    print(f"⚠️  Skipped: {student.full_name} (Resume #{resume.id}) - No content or skills")
-                    skipped_count += 1
-                    
+                rag_engine.store_resume_embeddings(chunk)
+                for full_name, resume_id in chunk_names:
+                    print(f"✅ Indexed: {full_name} (Resume #{resume_id})")
+                indexed_count += len(chunk)
             except Exception as e:
-                print(f"  Error indexing {student.full_name}: {str(e)}")
-                error_count += 1
+                print(f"  Error indexing batch of {len(chunk)} resumes: {str(e)}")
+                error_count += len(chunk)
         
         print()
         print("=" * 80)
@@ -0,0 +1,53 @@
+"""
+Migration Script: Add the candidate_contact_keys flagging index
+Creates the table of normalized student contact keys (phone digits, LinkedIn and
+GitHub URLs) and fills it from the users table. Duplicate-contact flag lookups
+then read this index instead of normalizing every student on each request.
+Safe to re-run: the index is rebuilt from scratch.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import engine, SessionLocal
+from app.models.candidate_contact_key import CandidateContactKey
+from app.services.candidate_flagging_service import CandidateFlaggingService
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def add_contact_keys():
+    """Create candidate_contact_keys (with its indexes) and backfill it"""
+
+    logger.info("=" * 80)
+    logger.info("MIGRATION: Add candidate_contact_keys flagging index")
+    logger.info("=" * 80)
+
+    CandidateContactKey.__table__.create(bind=engine, checkfirst=True)
+    logger.info("✅ Table candidate_contact_keys ready")
+
+    db = SessionLocal()
+
+    try:
+        written = CandidateFlaggingService.rebuild_contact_keys(db)
+        flagged = CandidateFlaggingService.detect_flagged_candidates(db)
+
+        logger.info("=" * 80)
+        logger.info(f"✅ Migration completed: {written} contact keys, {len(flagged)} flagged candidates")
+        logger.info("=" * 80)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"  Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    add_contact_keys()
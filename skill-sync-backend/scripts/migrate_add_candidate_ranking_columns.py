@@ -0,0 +1,95 @@
+"""
+Database Migration Script: Add Candidate Ranking Columns
+Adds the typed resume columns (experience_years, education_level, skills_text)
+and the materialized applicant score columns that let rank-candidates filter,
+sort and paginate in SQL, then backfills the resume columns from parsed_data
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import engine, SessionLocal
+from app.models.resume import Resume
+
+BATCH_SIZE = 500
+
+
+def migrate_add_candidate_ranking_columns():
+    """Add ranking columns/indexes and backfill typed resume columns"""
+
+    print("🔄 Starting migration: Add candidate ranking columns...")
+
+    migrations = [
+        "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS experience_years FLOAT;",
+        "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS education_level INTEGER;",
+        "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS skills_text TEXT;",
+        "ALTER TABLE applications ADD COLUMN IF NOT EXISTS ranking_score FLOAT;",
+        "ALTER TABLE applications ADD COLUMN IF NOT EXISTS ranking_base_score FLOAT;",
+        "ALTER TABLE applications ADD COLUMN IF NOT EXISTS ranking_components JSON;",
+        "ALTER TABLE applications ADD COLUMN IF NOT EXISTS ranking_computed_at TIMESTAMP WITH TIME ZONE;",
+        "CREATE INDEX IF NOT EXISTS idx_resume_student_active ON resumes (student_id, is_active, is_tailored);",
+        "CREATE INDEX IF NOT EXISTS idx_application_internship_ranking ON applications (internship_id, ranking_score);",
+    ]
+
+    try:
+        with engine.begin() as conn:
+            for i, migration in enumerate(migrations, 1):
+                try:
+                    print(f"  ✅ Executing migration {i}/{len(migrations)}...")
+                    conn.execute(text(migration))
+                except Exception as e:
+                    # Check if error is because column already exists
+                    if "already exists" in str(e).lower() or "duplicate column" in str(e).lower():
+                        print(f"  ℹ️ Migration {i}: Column already exists, skipping...")
+                    else:
+                        print(f"  ⚠️ Migration {i} note: {str(e)}")
+                    continue
+
+        backfilled = backfill_resume_columns()
+
+        print("✅ Migration completed successfully!")
+        print("\nAdded columns:")
+        print("  - resumes.experience_years (FLOAT): parsed_data.total_experience_years")
+        print("  - resumes.education_level (INTEGER): Highest degree (0 unknown, 1 bachelor, 2 master, 3 PhD)")
+        print("  - resumes.skills_text (TEXT): Lowercased skills, one per line")
+        print("  - applications.ranking_score / ranking_base_score (FLOAT): Materialized applicant score")
+        print("  - applications.ranking_components (JSON): Component scores for display")
+        print("  - applications.ranking_computed_at (TIMESTAMP): When the score was computed (staleness check)")
+        print(f"\n📝 Backfilled typed columns for {backfilled} resumes")
+        print("ℹ️ Applicant scores are computed on the next rank-candidates call per internship.")
+
+    except Exception as e:
+        print(f"  Migration failed: {str(e)}")
+        raise
+
+
+def backfill_resume_columns() -> int:
+    """Re-assign parsed_data so the Resume model derives its typed columns"""
+    db = SessionLocal()
+    try:
+        updated = 0
+        last_id = 0
+        while True:
+            batch = db.query(Resume).filter(
+                Resume.id > last_id,
+                Resume.parsed_data.isnot(None)
+            ).order_by(Resume.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            for resume in batch:
+                resume.parsed_data = dict(resume.parsed_data)
+            db.commit()
+            updated += len(batch)
+            last_id = batch[-1].id
+            print(f"  Progress: {updated} resumes")
+        return updated
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_add_candidate_ranking_columns()
@@ -0,0 +1,54 @@
+"""
+Database Migration Script: Add Content Hashes to Student-Internship Matches
+Records which resume/internship content each pre-computed match was scored against,
+so batch matching can recompute only stale pairs
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import engine
+
+
+def migrate_add_match_content_hashes():
+    """Add resume/internship content hash columns to student_internship_matches"""
+    
+    print("🔄 Starting migration: Add content hashes to student_internship_matches...")
+    
+    migrations = [
+        "ALTER TABLE student_internship_matches ADD COLUMN IF NOT EXISTS resume_content_hash VARCHAR(64);",
+        "ALTER TABLE student_internship_matches ADD COLUMN IF NOT EXISTS internship_content_hash VARCHAR(64);",
+    ]
+    
+    try:
+        with engine.begin() as conn:
+            for i, migration in enumerate(migrations, 1):
+                try:
+                    print(f"  ✅ Executing migration {i}/{len(migrations)}...")
+                    conn.execute(text(migration))
+                except Exception as e:
+                    # Check if error is because column already exists
+                    if "already exists" in str(e).lower() or "duplicate column" in str(e).lower():
+                        print(f"  ℹ️ Migration {i}: Column already exists, skipping...")
+                    else:
+                        print(f"  ⚠️ Migration {i} note: {str(e)}")
+                    continue
+        
+        print("✅ Migration completed successfully!")
+        print("\nAdded columns:")
+        print("  - student_internship_matches.resume_content_hash (VARCHAR(64)): Resume hash used for the score")
+        print("  - student_internship_matches.internship_content_hash (VARCHAR(64)): Internship hash used for the score")
+        print("\nℹ️ Existing matches have no hashes yet; the next batch run refreshes pairs whose")
+        print("   resume/internship has a content_hash set.")
+        
+    except Exception as e:
+        print(f"  Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_add_match_content_hashes()
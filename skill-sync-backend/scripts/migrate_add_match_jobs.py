@@ -0,0 +1,34 @@
+"""
+Database Migration Script: Add Match Jobs Table
+Creates the match_jobs table used to report progress of batch matching runs
+(POST /api/filter/compute-matches, GET /api/filter/compute-matches/jobs/{job_id})
+"""
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import engine
+from app.models.match_job import MatchJob
+
+
+def migrate_add_match_jobs():
+    """Create the match_jobs table if it does not exist"""
+    
+    print("🔄 Starting migration: Add match_jobs table...")
+    
+    try:
+        MatchJob.__table__.create(bind=engine, checkfirst=True)
+        print("✅ Migration completed successfully!")
+        print("\nCreated table:")
+        print("  - match_jobs: status, progress counters and results of batch matching runs")
+        
+    except Exception as e:
+        print(f"  Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_add_match_jobs()
@@ -0,0 +1,99 @@
+"""
+Database Migration Script: Normalized Resume Skills
+Creates the skills / resume_skills tables and the indexes behind the candidate
+skill, experience and education filters, then backfills them (and the typed
+resume columns) from parsed_data. Replaces the resumes.skills_text column.
+
+Indexes:
+- resume_skills (resume_id, skill_id) primary key + (skill_id, resume_id) B-tree
+- skills.name unique B-tree, plus a pg_trgm GIN index on PostgreSQL so
+  substring skill filters (LIKE '%python%') use an index
+- resumes.experience_years / resumes.education_level B-tree
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import engine, SessionLocal
+from app.models.resume import Resume
+from app.models.skill import Skill, ResumeSkill
+
+BATCH_SIZE = 500
+
+
+def migrate_add_resume_skills():
+    """Create skill tables/indexes and backfill them from parsed_data"""
+
+    print("🔄 Starting migration: Normalized resume skills...")
+
+    Skill.__table__.create(bind=engine, checkfirst=True)
+    ResumeSkill.__table__.create(bind=engine, checkfirst=True)
+    print("  ✅ Tables skills / resume_skills ready")
+
+    migrations = [
+        "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS experience_years FLOAT;",
+        "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS education_level INTEGER;",
+        "CREATE INDEX IF NOT EXISTS ix_resumes_experience_years ON resumes (experience_years);",
+        "CREATE INDEX IF NOT EXISTS ix_resumes_education_level ON resumes (education_level);",
+        "ALTER TABLE resumes DROP COLUMN IF EXISTS skills_text;",
+    ]
+    if engine.dialect.name == "postgresql":
+        migrations += [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            "CREATE INDEX IF NOT EXISTS idx_skills_name_trgm ON skills USING gin (name gin_trgm_ops);",
+        ]
+
+    try:
+        with engine.begin() as conn:
+            for i, migration in enumerate(migrations, 1):
+                try:
+                    print(f"  ✅ Executing migration {i}/{len(migrations)}...")
+                    conn.execute(text(migration))
+                except Exception as e:
+                    # Check if error is because column already exists
+                    if "already exists" in str(e).lower() or "duplicate column" in str(e).lower():
+                        print(f"  ℹ️ Migration {i}: Already applied, skipping...")
+                    else:
+                        print(f"  ⚠️ Migration {i} note: {str(e)}")
+                    continue
+
+        backfilled = backfill_resume_skills()
+
+        print("✅ Migration completed successfully!")
+        print(f"\n📝 Backfilled skills, experience_years and education_level for {backfilled} resumes")
+
+    except Exception as e:
+        print(f"  Migration failed: {str(e)}")
+        raise
+
+
+def backfill_resume_skills() -> int:
+    """Re-assign parsed_data so the Resume model rewrites its typed columns and skill links"""
+    db = SessionLocal()
+    try:
+        updated = 0
+        last_id = 0
+        while True:
+            batch = db.query(Resume).filter(
+                Resume.id > last_id,
+                Resume.parsed_data.isnot(None)
+            ).order_by(Resume.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            for resume in batch:
+                resume.parsed_data = dict(resume.parsed_data)
+            db.commit()
+            updated += len(batch)
+            last_id = batch[-1].id
+            print(f"  Progress: {updated} resumes")
+        return updated
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_add_resume_skills()
@@ -0,0 +1,71 @@
+"""
+Migration Script: Backfill filterable resume metadata in ChromaDB
+Rewrites the metadata of every indexed resume from PostgreSQL (student_id,
+is_tailored, is_active, internship_id, location, experience_years) so
+filtered candidate searches (`where`) see resumes indexed before the
+filter fields existed. Only metadata is updated; nothing is re-embedded.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.connection import SessionLocal
+from app.models.resume import Resume
+from app.services.rag_engine import rag_engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_resume_metadata():
+    """Update ChromaDB metadata of all indexed resumes from the database"""
+
+    logger.info("=" * 80)
+    logger.info("MIGRATION: Backfill filterable resume metadata in ChromaDB")
+    logger.info("=" * 80)
+
+    db = SessionLocal()
+
+    try:
+        query = db.query(Resume).filter(Resume.embedding_id.isnot(None)).order_by(Resume.id)
+        total = query.count()
+        logger.info(f"Indexed resumes: {total}")
+
+        updated = failed = 0
+        batch_size = rag_engine.write_batch_size
+        for resume_batch in _batches(query.yield_per(batch_size), batch_size):
+            updates = {str(resume.id): rag_engine.resume_metadata(resume) for resume in resume_batch}
+            if rag_engine.update_resume_metadata(updates):
+                updated += len(updates)
+            else:
+                failed += len(updates)
+            logger.info(f"Progress: {updated + failed}/{total}")
+
+        logger.info("=" * 80)
+        logger.info(f"✅ Migration completed: {updated} updated, {failed} failed")
+        logger.info("=" * 80)
+
+    except Exception as e:
+        logger.error(f"  Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+if __name__ == "__main__":
+    backfill_resume_metadata()
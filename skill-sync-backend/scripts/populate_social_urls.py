@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from sqlalchemy.orm import Session
 from app.database.connection import SessionLocal
 from app.models.user import User, UserRole
+from app.services.candidate_flagging_service import CandidateFlaggingService
 
 
 def name_to_url_slug(name: str) -> str:
@@ -64,6 +65,7 @@ def populate_social_urls():
             # Update student record
             student.linkedin_url = linkedin_url
             student.github_url = github_url
+            CandidateFlaggingService.sync_contact_keys(db, student)
             
             print(f"Student: {student.full_name}")
             print(f"  LinkedIn: {linkedin_url}")
@@ -54,10 +54,7 @@ def reindex_resume(resume_id: int):
                     resume_id=str(resume.id),
                     content=resume.parsed_content,
                     skills=resume.extracted_skills,
-                    metadata={
-                        "student_id": resume.student_id,
-                        "file_name": resume.file_name
-                    }
+                    metadata=rag_engine.resume_metadata(resume)
                 )
                 resume.embedding_id = embedding_id
                 print(f"   ✅ Embedding created: {embedding_id}")
@@ -0,0 +1,307 @@
+"""
+Batch matching service tests - Incremental recompute of stale pairs
+"""
+
+import numpy as np
+import pytest
+
+from app.models.user import User, UserRole
+from app.models.resume import Resume
+from app.models.internship import Internship
+from app.models.student_internship_match import StudentInternshipMatch
+from app.services import batch_matching_service
+from app.services.batch_matching_service import BatchMatchingService
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """Serve deterministic embeddings instead of reading ChromaDB"""
+    def fake_bulk(ids):
+        matrix = np.array([[1.0, float(len(str(i))), 0.5] for i in ids], dtype=np.float32).reshape(len(ids), 3)
+        return matrix, np.zeros(len(ids), dtype=bool)
+
+    monkeypatch.setattr(batch_matching_service.rag_engine, "get_resume_embeddings", fake_bulk)
+    monkeypatch.setattr(batch_matching_service.rag_engine, "get_internship_embeddings", fake_bulk)
+
+
+def _seed(db):
+    company = User(email="hr@acme.test", hashed_password="x", full_name="Acme", role=UserRole.company)
+    students = [
+        User(email=f"s{i}@uni.test", hashed_password="x", full_name=f"Student {i}", role=UserRole.student)
+        for i in range(3)
+    ]
+    db.add_all([company] + students)
+    db.flush()
+
+    for i, student in enumerate(students):
+        db.add(Resume(
+            student_id=student.id, file_path=f"/tmp/r{i}.pdf", file_name=f"r{i}.pdf",
+            parsed_data={'all_skills': ['Python', 'SQL'][:i + 1], 'total_experience_years': i},
+            is_active=1, is_tailored=0, content_hash=f"hash-{i}"
+        ))
+    internships = [
+        Internship(company_id=company.id, title=f"Role {j}", description="Build things",
+                   required_skills=['Python'], is_active=1, content_hash=f"ihash-{j}")
+        for j in range(2)
+    ]
+    db.add_all(internships)
+    db.commit()
+    return students, internships
+
+
+def test_incremental_run_recomputes_only_stale_pairs(db_session, fake_embeddings):
+    """A second run with no changes does no work; a content change recomputes only its pairs"""
+    students, internships = _seed(db_session)
+    service = BatchMatchingService(db_session)
+
+    first = service.compute_all_matches()
+    assert first["matches_computed"] == 6
+    assert db_session.query(StudentInternshipMatch).count() == 6
+
+    second = service.compute_all_matches()
+    assert second["matches_computed"] == 0
+    assert second["pairs_skipped"] == 6
+
+    internships[0].content_hash = "ihash-changed"
+    db_session.commit()
+
+    third = service.compute_all_matches()
+    assert third["matches_computed"] == 3
+    assert db_session.query(StudentInternshipMatch).count() == 6
+    assert db_session.query(StudentInternshipMatch).filter(
+        StudentInternshipMatch.internship_content_hash == "ihash-changed"
+    ).count() == 3
+
+
+def test_incremental_run_loads_only_new_entities(db_session, fake_embeddings):
+    """A new student or internship is found by SQL counts and only its pairs are scored"""
+    students, internships = _seed(db_session)
+    service = BatchMatchingService(db_session)
+    service.compute_all_matches()
+
+    student = User(email="s9@uni.test", hashed_password="x", full_name="Student 9", role=UserRole.student)
+    db_session.add(student)
+    db_session.flush()
+    db_session.add(Resume(student_id=student.id, file_path="/tmp/r9.pdf", file_name="r9.pdf",
+                          parsed_data={'all_skills': ['Python']}, is_active=1, is_tailored=0, content_hash="hash-9"))
+    db_session.commit()
+
+    result = service.compute_all_matches()
+    assert result["students_processed"] == 1
+    assert result["matches_computed"] == 2
+    assert result["pairs_skipped"] == 6
+
+    db_session.add(Internship(company_id=internships[0].company_id, title="Role 9", description="New",
+                              required_skills=['SQL'], is_active=1, content_hash="ihash-9"))
+    db_session.commit()
+
+    result = service.compute_all_matches()
+    assert result["internships_processed"] == 1
+    assert result["matches_computed"] == 4
+    assert db_session.query(StudentInternshipMatch).count() == 12
+
+
+def test_force_recompute_upserts_in_place(db_session, fake_embeddings):
+    """A full recompute rewrites rows via upsert and drops pairs it no longer scores"""
+    students, internships = _seed(db_session)
+    service = BatchMatchingService(db_session)
+    service.compute_all_matches()
+    ids_before = {m.id for m in db_session.query(StudentInternshipMatch).all()}
+
+    internships[1].is_active = 0
+    db_session.commit()
+    result = service.compute_all_matches(force_recompute=True)
+
+    assert result["matches_computed"] == 3
+    ids_after = {m.id for m in db_session.query(StudentInternshipMatch).all()}
+    assert len(ids_after) == 3
+    assert ids_after <= ids_before
+
+
+def test_sharded_run_matches_single_process(db_session, fake_embeddings, monkeypatch):
+    """Scoring across worker processes stores the same rows and reports job progress"""
+    from app.models.match_job import MatchJob
+    from app.services import sharded_matching_engine
+    from app.services.match_job_service import MatchJobService, MatchJobTracker
+    from tests.conftest import TestingSessionLocal
+
+    # Two workers even on a single-CPU host (workers are clamped to the CPU count)
+    monkeypatch.setattr(sharded_matching_engine.os, "cpu_count", lambda: 2)
+
+    _seed(db_session)
+    service = BatchMatchingService(db_session)
+    service.compute_all_matches(workers=1)
+    expected = {
+        (m.student_id, m.internship_id): m.base_similarity_score
+        for m in db_session.query(StudentInternshipMatch).all()
+    }
+
+    job = MatchJobService.create_job(db_session, parameters={"force_recompute": True}, workers=2)
+    service.block_size = 1
+    result = service.compute_all_matches(
+        force_recompute=True, workers=2,
+        tracker=MatchJobTracker(job.job_id, session_factory=TestingSessionLocal)
+    )
+
+    assert result["workers"] == 2
+    db_session.expire_all()
+    actual = {
+        (m.student_id, m.internship_id): m.base_similarity_score
+        for m in db_session.query(StudentInternshipMatch).all()
+    }
+    assert actual == expected
+
+    job = db_session.query(MatchJob).filter(MatchJob.job_id == job.job_id).first()
+    assert job.status == "completed"
+    assert job.pairs_done == job.pairs_total == 6
+
+
+def test_top_k_retention_keeps_best_and_applied_pairs(db_session, fake_embeddings):
+    """Top-K mode stores each student's best internship plus applied pairs, and stays incremental"""
+    from app.models.application import Application
+
+    students, internships = _seed(db_session)
+    service = BatchMatchingService(db_session)
+    service.compute_all_matches()
+    best_score = {}
+    for m in db_session.query(StudentInternshipMatch).all():
+        best_score[m.student_id] = max(best_score.get(m.student_id, 0), m.base_similarity_score)
+
+    resume = db_session.query(Resume).filter(Resume.student_id == students[0].id).first()
+    db_session.add(Application(student_id=students[0].id, internship_id=internships[1].id, resume_id=resume.id))
+    db_session.commit()
+
+    service.retention_mode = "top_k"
+    service.retention = {'top_k_per_student': 1, 'top_k_per_internship': 0, 'score_floor': 101}
+    service.compute_all_matches(force_recompute=True)
+
+    kept = db_session.query(StudentInternshipMatch).all()
+    assert len(kept) == 4
+    assert (students[0].id, internships[1].id) in {(m.student_id, m.internship_id) for m in kept}
+    for student in students:
+        assert max(m.base_similarity_score for m in kept if m.student_id == student.id) == best_score[student.id]
+
+    again = service.compute_all_matches()
+    assert again["matches_computed"] == 0
+
+
+def test_two_stage_run_reports_recall(db_session, fake_embeddings):
+    """Shortlisting stores only each student's nearest internships and reports measured recall"""
+    _seed(db_session)
+    service = BatchMatchingService(db_session)
+    service.ann_candidates = 1
+    service.ann_recall_target = 0.0
+
+    result = service.compute_all_matches()
+
+    assert result["ann_candidates"] == 1
+    assert 0.0 <= result["ann_recall"] <= 1.0
+    assert db_session.query(StudentInternshipMatch).count() == 3
+    assert service.compute_all_matches()["matches_computed"] == 0
+
+
+def test_rematch_queue_coalesces_and_refreshes_in_background(db_session, fake_embeddings):
+    """Repeated enqueues of one entity become one background rematch"""
+    from app.services.rematch_queue import RematchQueue
+    from tests.conftest import TestingSessionLocal
+
+    students, internships = _seed(db_session)
+    queue = RematchQueue(session_factory=TestingSessionLocal, debounce_seconds=0.05, max_delay_seconds=1, enabled=True)
+    try:
+        for _ in range(3):
+            queue.enqueue_student(students[0].id)
+        queue.enqueue_internship(internships[1].id)
+        assert queue.stats()["depth"] == 2
+
+        assert queue.wait_until_idle(timeout=10)
+        stats = queue.stats()
+        assert stats["coalesced"] == 2
+        assert stats["processed"] == 2
+        assert stats["failed"] == 0
+        assert stats["depth"] == 0
+
+        db_session.expire_all()
+        pairs = {(m.student_id, m.internship_id) for m in db_session.query(StudentInternshipMatch).all()}
+        assert pairs == {(students[0].id, i.id) for i in internships} | {(s.id, internships[1].id) for s in students}
+    finally:
+        queue.stop()
+
+
+
+def test_rematch_queue_isolates_and_retries_failed_entities(db_session, fake_embeddings, monkeypatch):
+    """A failing student does not sink its batch and is retried with backoff up to the cap"""
+    from app.services.rematch_queue import RematchQueue
+    from tests.conftest import TestingSessionLocal
+
+    students, internships = _seed(db_session)
+    bad_id = students[1].id
+    attempts = []
+    compute = BatchMatchingService.compute_all_matches
+
+    def flaky_compute(self, *args, student_ids=None, **kwargs):
+        if student_ids and bad_id in student_ids:
+            attempts.append(list(student_ids))
+            raise RuntimeError("corrupt resume")
+        return compute(self, *args, student_ids=student_ids, **kwargs)
+
+    monkeypatch.setattr(BatchMatchingService, "compute_all_matches", flaky_compute)
+    queue = RematchQueue(
+        session_factory=TestingSessionLocal, debounce_seconds=0.2, max_delay_seconds=1, enabled=True,
+        max_retries=2, retry_backoff_seconds=0.01
+    )
+    try:
+        for student in students:
+            queue.enqueue_student(student.id)
+
+        assert queue.wait_until_idle(timeout=10)
+        stats = queue.stats()
+        assert stats["processed"] == 2
+        assert stats["retried"] == 2
+        assert stats["failed"] == 1
+        assert stats["last_error"] == "corrupt resume"
+        # A batch pass with other students, then the bad student alone: first attempt plus two retries
+        assert len(attempts[0]) > 1
+        assert attempts[1:] == [[bad_id]] * 3
+
+        db_session.expire_all()
+        matched = {m.student_id for m in db_session.query(StudentInternshipMatch).all()}
+        assert matched == {students[0].id, students[2].id}
+    finally:
+        queue.stop()
+
+def test_non_numeric_experience_does_not_abort_the_run(db_session, fake_embeddings):
+    """A free-text experience value ("2-3 years") scores as 0 instead of failing every student"""
+    students, internships = _seed(db_session)
+    resume = db_session.query(Resume).filter(Resume.student_id == students[0].id).first()
+    resume.parsed_data = {**resume.parsed_data, 'total_experience_years': '2-3 years'}
+    db_session.commit()
+
+    result = BatchMatchingService(db_session).compute_all_matches()
+
+    assert result["matches_computed"] == 6
+    features, _ = BatchMatchingService(db_session).vectorized_engine.build_features(
+        [{'total_experience_years': '2-3 years'}, {'total_experience_years': '4'}], []
+    )
+    assert features.experience.tolist() == [0.0, 4.0]
+
+
+def test_compute_matches_workers_are_admin_only_and_clamped(db_session, monkeypatch):
+    """Students cannot choose worker processes; admin requests are clamped to the CPU count"""
+    import asyncio
+    import os
+    from fastapi import BackgroundTasks, HTTPException
+    from app.routes import intelligent_filtering
+    from app.services.sharded_matching_engine import ShardedMatchingEngine, clamp_workers
+
+    student = User(email="s@uni.test", hashed_password="x", full_name="Student", role=UserRole.student)
+    with pytest.raises(HTTPException) as denied:
+        asyncio.run(intelligent_filtering.compute_batch_similarity_matches(
+            BackgroundTasks(), force_recompute=False, student_id=None, internship_id=None,
+            workers=64, background=False, db=db_session, current_user=student
+        ))
+    assert denied.value.status_code == 403
+
+    assert clamp_workers(10_000) == (os.cpu_count() or 1) and clamp_workers(0) == 1
+    assert ShardedMatchingEngine(10_000, 1).workers == (os.cpu_count() or 1)
+    monkeypatch.delenv("BATCH_MATCH_START_METHOD", raising=False)
+    assert ShardedMatchingEngine._context().get_start_method() in ("forkserver", "spawn")
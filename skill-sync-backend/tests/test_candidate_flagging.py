@@ -0,0 +1,70 @@
+"""
+Candidate flagging tests - Duplicate contacts come from the indexed contact-key table
+"""
+
+from sqlalchemy import event
+
+from app.models.user import User, UserRole
+from app.models.resume import Resume
+from app.models.candidate_contact_key import CandidateContactKey
+from app.services.candidate_flagging_service import CandidateFlaggingService
+
+
+def _student(db, n, phone=None, linkedin=None, github=None, resume=True):
+    student = User(email=f"s{n}@uni.test", hashed_password="x", full_name=f"Student {n}",
+                   role=UserRole.student, phone=phone, linkedin_url=linkedin, github_url=github)
+    db.add(student)
+    db.flush()
+    if resume:
+        db.add(Resume(student_id=student.id, file_path=f"/tmp/{n}.pdf", file_name=f"{n}.pdf", is_active=1))
+    CandidateFlaggingService.sync_contact_keys(db, student)
+    return student
+
+
+def test_flag_lookup_reads_contact_keys_in_one_query(db_session):
+    a = _student(db_session, 1, phone="+1 (555) 010-0001", github="https://github.com/ada")
+    b = _student(db_session, 2, phone="15550100001", linkedin="linkedin.com/in/bee")
+    c = _student(db_session, 3, github="www.GitHub.com/ada/")
+    d = _student(db_session, 4, phone="1-555-010-0001", resume=False)  # no resume: never flagged
+    e = _student(db_session, 5, linkedin="https://linkedin.com/in/bee")
+    db_session.commit()
+    ids = [a.id, b.id, d.id]
+
+    statements = []
+    engine = db_session.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        flags = CandidateFlaggingService.get_flag_info_for_candidates(ids, db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+    assert flags == {
+        a.id: {'reasons': ['same_mobile', 'same_github'],
+               'flagged_with': {'same_mobile': [b.id], 'same_github': [c.id]}},
+        b.id: {'reasons': ['same_mobile', 'same_linkedin'],
+               'flagged_with': {'same_mobile': [a.id], 'same_linkedin': [e.id]}}
+    }
+    assert set(CandidateFlaggingService.detect_flagged_candidates(db_session)) == {a.id, b.id, c.id, e.id}
+
+    flagged = db_session.query(User.id).filter(CandidateFlaggingService.is_flagged(User.id))
+    assert {row.id for row in flagged} == {a.id, b.id, c.id, e.id}
+
+
+def test_profile_edits_keep_contact_keys_in_sync(db_session):
+    a = _student(db_session, 1, phone="555-0001", github="github.com/ada")
+    b = _student(db_session, 2, phone="5550001")
+    db_session.commit()
+    assert CandidateFlaggingService.get_flag_info_for_candidates([b.id], db_session)[b.id]['reasons'] == ['same_mobile']
+
+    a.phone = "555-9999"
+    a.github_url = None
+    CandidateFlaggingService.sync_contact_keys(db_session, a)
+    db_session.commit()
+
+    assert CandidateFlaggingService.get_flag_info_for_candidates([a.id, b.id], db_session) == {}
+    keys = db_session.query(CandidateContactKey).filter(CandidateContactKey.student_id == a.id).all()
+    assert [(k.key_type, k.key_value) for k in keys] == [('same_mobile', '5559999')]
+
+    assert CandidateFlaggingService.rebuild_contact_keys(db_session) == 2
@@ -0,0 +1,56 @@
+"""
+Embedding backend tests - ONNX pooling and cosine parity with the torch model
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding_backends import OnnxBackend, create_embedding_backend
+
+
+TEXTS = [
+    "Python developer with FastAPI, PostgreSQL and Docker experience",
+    "Frontend intern: React, TypeScript, CSS. Built dashboards for a startup.",
+    "Machine learning research assistant working on NLP with PyTorch and transformers " * 8,
+    "Java",
+]
+
+
+def test_mean_pool_ignores_padding_and_normalizes():
+    tokens = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+
+    pooled = OnnxBackend.mean_pool(tokens, mask)
+
+    np.testing.assert_allclose(pooled, [[1.0, 0.0]], atol=1e-6)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_embedding_backend("tensorrt")
+
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    try:
+        backend = create_embedding_backend("torch")
+    except Exception as e:
+        pytest.skip(f"torch embedding model not available: {e}")
+    return backend.encode(TEXTS)
+
+
+@pytest.mark.parametrize("name, min_cosine", [("onnx", 0.999), ("onnx-int8", 0.97)])
+def test_onnx_backends_agree_with_torch_model(torch_vectors, name, min_cosine):
+    try:
+        backend = create_embedding_backend(name)
+    except Exception as e:
+        pytest.skip(f"{name} embedding model not available: {e}")
+
+    vectors = backend.encode(TEXTS, batch_size=2)
+    cosine = np.sum(vectors * torch_vectors, axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(torch_vectors, axis=1)
+    )
+
+    assert vectors.shape == torch_vectors.shape
+    assert cosine.min() >= min_cosine
+    np.testing.assert_allclose(backend.encode(TEXTS[0]), vectors[0], atol=1e-5)
@@ -0,0 +1,36 @@
+"""
+Embedding cache tests - Persistent hits, model-scoped keys and LRU eviction
+"""
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+def test_vectors_persist_across_instances_and_models_do_not_collide(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache("model-a", path=path)
+    cache.put("hello", [0.25, 0.5, 1.0])
+
+    reopened = EmbeddingCache("model-a", path=path)
+    assert reopened.get("hello") == [0.25, 0.5, 1.0]
+    assert reopened.get("hello") == [0.25, 0.5, 1.0]
+    assert EmbeddingCache("model-b", path=path).get("hello") is None
+
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # 4 floats = 16 bytes per vector; budget fits three
+    cache = EmbeddingCache("model", path=str(tmp_path / "cache.db"), memory_items=2, max_disk_mb=48 / 1048576)
+    for text in ["a", "b", "c"]:
+        cache.put(text, [1.0, 2.0, 3.0, 4.0])
+    assert cache.get("a") is not None
+    cache.put("d", [1.0, 2.0, 3.0, 4.0])
+    cache.put("e", [1.0, 2.0, 3.0, 4.0])
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_bytes"] <= 48
+    assert stats["evictions"] >= 2
+    assert cache.get("b") is None
+    assert cache.get("e") is not None
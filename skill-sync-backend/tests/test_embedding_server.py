@@ -0,0 +1,54 @@
+"""
+Embedding server tests - Shared model process with cross-request micro-batching
+"""
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from app.services.embedding_backends import EmbeddingBackend
+from app.services.embedding_server import EmbeddingServer, EmbeddingServerClient
+
+
+class _FakeBackend(EmbeddingBackend):
+    name = "fake"
+
+    def _encode_batch(self, texts):
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts], dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+
+def test_concurrent_requests_are_batched_and_returned_in_order():
+    backend = _FakeBackend("test-model")
+    socket_path = os.path.join(tempfile.mkdtemp(), "embed.sock")
+    server = EmbeddingServer(backend=backend, socket_path=socket_path, max_batch=64, max_wait_ms=50)
+    server.start()
+    try:
+        client = EmbeddingServerClient("test-model", socket_path=socket_path)
+        assert client.cache_namespace == "test-model+fake"
+
+        texts = {i: [f"request {i} text {j}" * (j + 1) for j in range(3)] for i in range(8)}
+        results = {}
+
+        def call(i):
+            results[i] = client.encode(texts[i])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(8):
+            np.testing.assert_array_equal(results[i], backend.encode(texts[i]))
+        np.testing.assert_array_equal(client.encode("single"), backend.encode("single"))
+
+        stats = client.stats()
+        assert stats["requests"] == 9
+        assert stats["batches"] < stats["requests"]
+    finally:
+        server.stop()
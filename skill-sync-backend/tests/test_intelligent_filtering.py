@@ -0,0 +1,266 @@
+"""
+Intelligent filtering route tests - Applicant ranking issues a constant number of queries,
+scores each application once and pages/filters candidates in SQL; exports stream
+"""
+
+import asyncio
+import io
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import openpyxl
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User, UserRole
+from app.models.resume import Resume
+from app.models.internship import Internship
+from app.models.application import Application
+from app.models.student_internship_match import StudentInternshipMatch
+from app.routes import intelligent_filtering
+
+
+@pytest.fixture
+def embedding_calls(monkeypatch):
+    """Serve deterministic embeddings instead of reading ChromaDB, recording each bulk fetch"""
+    calls = []
+
+    def fake_bulk(kind):
+        def fetch(ids):
+            calls.append((kind, len(ids)))
+            matrix = np.array([[1.0, 0.5, float(len(str(i)))] for i in ids], dtype=np.float32).reshape(len(ids), 3)
+            return matrix, np.zeros(len(ids), dtype=bool)
+        return fetch
+
+    monkeypatch.setattr(intelligent_filtering.rag_engine, "get_resume_embeddings", fake_bulk("resume"))
+    monkeypatch.setattr(intelligent_filtering.rag_engine, "get_internship_embeddings", fake_bulk("internship"))
+    return calls
+
+
+def _seed(db):
+    company = User(email="hr@acme.test", hashed_password="x", full_name="Acme", role=UserRole.company)
+    db.add(company)
+    db.flush()
+    internship = Internship(company_id=company.id, title="Backend Intern", description="APIs",
+                            required_skills=['Python'], preferred_skills=['SQL'], is_active=1)
+    db.add(internship)
+    db.commit()
+    return company, internship
+
+
+def _add_applicants(db, internship, start, count):
+    """Applicants with a base resume and a pre-computed match; odd ones applied with a tailored resume"""
+    for i in range(start, start + count):
+        student = User(email=f"s{i}@uni.test", hashed_password="x", full_name=f"Student {i}",
+                       role=UserRole.student, is_active=1)
+        db.add(student)
+        db.flush()
+        parsed = {'all_skills': ['Python', 'SQL'][:i % 2 + 1], 'total_experience_years': i % 3}
+        base = Resume(student_id=student.id, file_path=f"/tmp/b{i}.pdf", file_name=f"b{i}.pdf",
+                      parsed_data=parsed, is_active=1, is_tailored=0, embedding_id=f"resume_b{i}")
+        db.add(base)
+        db.flush()
+        applied_with = base
+        if i % 2:
+            applied_with = Resume(student_id=student.id, file_path=f"/tmp/t{i}.pdf", file_name=f"t{i}.pdf",
+                                  parsed_data=parsed, is_active=0, is_tailored=1,
+                                  tailored_for_internship_id=internship.id, embedding_id=f"resume_t{i}")
+            db.add(applied_with)
+            db.flush()
+        db.add(Application(student_id=student.id, internship_id=internship.id, resume_id=applied_with.id))
+        db.add(StudentInternshipMatch(
+            student_id=student.id, internship_id=internship.id, resume_id=base.id,
+            base_similarity_score=50.0 + i, semantic_similarity=60.0, skills_match_score=70.0,
+            experience_match_score=80.0
+        ))
+    db.commit()
+    db.expire_all()
+
+
+def _rank(db, company, internship, **params):
+    arguments = dict(
+        internship_id=str(internship.id), include_explanations=True, limit=500, offset=0, only_applicants=True,
+        min_match_score=None, max_match_score=None, min_experience=None, max_experience=None,
+        filter_skills=None, education_level=None, exclude_flagged=False,
+        db=db, current_user=company
+    )
+    arguments.update(params)
+    return asyncio.run(intelligent_filtering.rank_candidates_for_internship(**arguments))
+
+
+def _count_queries(db, company, internship):
+    statements = []
+    engine = db.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = _rank(db, company, internship)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements), result
+
+
+def test_applicant_ranking_query_count_is_constant(db_session, embedding_calls):
+    company, internship = _seed(db_session)
+    _add_applicants(db_session, internship, 0, 4)
+    few_queries, few = _count_queries(db_session, company, internship)
+
+    _add_applicants(db_session, internship, 4, 36)
+    embedding_calls.clear()
+    many_queries, many = _count_queries(db_session, company, internship)
+
+    assert few["total_candidates"] == 4 and many["total_candidates"] == 40
+    assert many_queries == few_queries
+    # Only the 36 new applications were scored (18 of them tailored)
+    assert embedding_calls == [("resume", 18), ("internship", 1)]
+    assert sum(c["scoring_breakdown"]["has_tailored"] for c in many["ranked_candidates"]) == 20
+    assert all(c["match_details"]["base_resume_id"] for c in many["ranked_candidates"])
+
+    embedding_calls.clear()
+    _rank(db_session, company, internship)
+    assert embedding_calls == []
+
+
+def test_applicant_ranking_filters_and_pages_in_sql(db_session, embedding_calls):
+    company, internship = _seed(db_session)
+    _add_applicants(db_session, internship, 0, 30)
+    everyone = _rank(db_session, company, internship)["ranked_candidates"]
+    scores = [c["match_score"] for c in everyone]
+    assert scores == sorted(scores, reverse=True)
+
+    page = _rank(db_session, company, internship, limit=5, offset=5)
+    assert [c["application_id"] for c in page["ranked_candidates"]] == [c["application_id"] for c in everyone[5:10]]
+    assert page["total_candidates"] == 30 and page["total_before_filter"] == 30 and page["has_more"]
+
+    # Even students list both skills; experience is i % 3 years
+    filtered = _rank(db_session, company, internship, limit=3, filter_skills="sq", min_experience=1)
+    expected = [c for c in everyone if c["total_experience_years"] >= 1
+                and any("sq" in s.lower() for s in c["skills"])]
+    assert filtered["total_candidates"] == len(expected) == 10
+    assert [c["candidate_id"] for c in filtered["ranked_candidates"]] == [c["candidate_id"] for c in expected[:3]]
+
+    assert _rank(db_session, company, internship, education_level="Master")["total_candidates"] == 0
+    assert _rank(db_session, company, internship, exclude_flagged=True)["total_candidates"] == 30
+
+    discovery = _rank(db_session, company, internship, only_applicants=False, limit=4, min_match_score=70)
+    assert discovery["total_candidates"] == 10 and discovery["total_before_filter"] == 30
+    assert [c["match_score"] for c in discovery["ranked_candidates"]] == [79.0, 78.0, 77.0, 76.0]
+    assert all(c["has_applied"] for c in discovery["ranked_candidates"])
+
+
+def test_applicant_scores_refresh_when_inputs_change(db_session, embedding_calls):
+    """Internship edits rescore its applications; unscorable ones are stamped, not retried"""
+    company, internship = _seed(db_session)
+    _add_applicants(db_session, internship, 0, 4)
+    loner = User(email="loner@uni.test", hashed_password="x", full_name="Loner", role=UserRole.student, is_active=1)
+    db_session.add(loner)
+    db_session.flush()
+    resume = Resume(student_id=loner.id, file_path="/tmp/l.pdf", file_name="l.pdf", parsed_data={}, is_active=1)
+    db_session.add(resume)
+    db_session.flush()
+    db_session.add(Application(student_id=loner.id, internship_id=internship.id, resume_id=resume.id))
+    db_session.commit()
+
+    first = _rank(db_session, company, internship, limit=1000)
+    assert first["limit"] == 500 and first["total_candidates"] == 4
+    unscored = db_session.query(Application).filter(Application.student_id == loner.id).one()
+    assert unscored.ranking_score is None and unscored.ranking_computed_at is not None
+    assert intelligent_filtering.CandidateRankingService._stale_applications(db_session, internship.id) == []
+
+    # Scores computed an hour ago, then the internship's requirements are edited
+    db_session.query(Application).update(
+        {"ranking_computed_at": datetime.now(timezone.utc) - timedelta(hours=1)}, synchronize_session=False
+    )
+    internship.required_skills = ['Python', 'Go']
+    db_session.commit()
+    embedding_calls.clear()
+    _rank(db_session, company, internship)
+    assert ("resume", 2) in embedding_calls
+    assert intelligent_filtering.CandidateRankingService._stale_applications(db_session, internship.id) == []
+
+
+def test_filtered_rankings_use_typed_columns_and_resume_skills(db_session, embedding_calls):
+    company, internship = _seed(db_session)
+    _add_applicants(db_session, internship, 0, 12)
+
+    def filtered(**params):
+        arguments = dict(
+            internship_id=str(internship.id), page=1, page_size=100, min_score=None, max_score=None,
+            skills=None, experience_min=None, experience_max=None, education_level=None,
+            application_status=None, only_applicants=False, sort_by="score", sort_order="desc",
+            db=db_session, current_user=company
+        )
+        arguments.update(params)
+        return asyncio.run(intelligent_filtering.get_filtered_ranked_candidates(**arguments))
+
+    # Odd students list only Python; experience is i % 3 years
+    by_skill = filtered(skills="sq, golang")
+    assert by_skill["total"] == 6
+    assert all("SQL" in c["skills"] for c in by_skill["ranked_candidates"])
+
+    by_experience = filtered(experience_min=1, sort_by="experience", sort_order="asc")
+    assert by_experience["total"] == 8
+    assert [c["total_experience_years"] for c in by_experience["ranked_candidates"]][:4] == [1, 1, 1, 1]
+    assert filtered(education_level="Bachelor")["total"] == 0
+
+
+def _export(db, company, internship, monkeypatch, **params):
+    """Call export-candidates and drain its streamed body"""
+    monkeypatch.setattr(intelligent_filtering, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    arguments = dict(
+        internship_id=str(internship.id), format="csv", min_score=None, max_score=None, skills=None,
+        experience_min=None, experience_max=None, education_level=None, application_status=None,
+        only_applicants=False, export_type="filtered", page=1, page_size=10,
+        db=db, current_user=company
+    )
+    arguments.update(params)
+
+    async def run():
+        response = await intelligent_filtering.export_candidate_rankings(**arguments)
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(run())
+
+
+def test_export_streams_csv_and_xlsx(db_session, monkeypatch):
+    company, internship = _seed(db_session)
+    _add_applicants(db_session, internship, 0, 12)
+
+    response, body = _export(db_session, company, internship, monkeypatch, min_score=55)
+    lines = body.decode("utf-8").splitlines()
+    assert response.media_type == "text/csv"
+    assert lines[0].startswith("Candidate Name,Email,Phone,Match Score (%)")
+    # Students 5..11 scored 55..61, best first
+    assert [line.split(",")[0] for line in lines[1:]] == [f"Student {i}" for i in range(11, 4, -1)]
+
+    _, empty = _export(db_session, company, internship, monkeypatch, min_score=99)
+    assert empty == b""
+
+    _, workbook_bytes = _export(db_session, company, internship, monkeypatch, format="xlsx",
+                                only_applicants=True, application_status="pending")
+    sheet = openpyxl.load_workbook(io.BytesIO(workbook_bytes)).active
+    rows = list(sheet.iter_rows(min_row=5, values_only=True))
+    assert sheet["A2"].value.endswith("Total Candidates: 12")
+    assert [row[0] for row in rows[:2]] == ["Student 11", "Student 10"]
+    # Score 61 -> orange band, score 50 -> red band
+    assert sheet.cell(row=5, column=4).fill.start_color.rgb.endswith("FFE0B2")
+    assert sheet.cell(row=16, column=4).fill.start_color.rgb.endswith("FFCDD2")
+
+    with pytest.raises(HTTPException) as missing:
+        _export(db_session, company, internship, monkeypatch, format="xlsx", min_score=99)
+    assert missing.value.status_code == 404
+
+
+def test_rematch_queue_status_is_not_visible_to_students():
+    student = User(email="s@uni.test", hashed_password="x", full_name="Student", role=UserRole.student)
+    with pytest.raises(HTTPException) as denied:
+        asyncio.run(intelligent_filtering.get_rematch_queue_status(current_user=student))
+    assert denied.value.status_code == 403
+
+    company = User(email="hr@acme.test", hashed_password="x", full_name="Acme", role=UserRole.company)
+    assert "queue" in asyncio.run(intelligent_filtering.get_rematch_queue_status(current_user=company))
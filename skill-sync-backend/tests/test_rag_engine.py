@@ -0,0 +1,307 @@
+"""
+RAG engine tests - Batched embedding generation and bulk vector writes
+"""
+
+import threading
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache
+from app.services.rag_engine import RAGEngine
+from app.utils.text_chunker import chunk_document
+
+
+class _CountingModel:
+    """Deterministic stand-in for SentenceTransformer that records encode calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        self.calls.append(batch)
+        vectors = np.array([[float(len(t)), float(sum(map(ord, t)) % 97)] for t in batch], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+class _RecordingCollection:
+    def __init__(self):
+        self.writes = []
+        self.records = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.writes.append(len(ids))
+        for record in zip(ids, embeddings, documents, metadatas):
+            self.records[record[0]] = record
+
+    def delete(self, where):
+        parents = set(where["parent_id"]["$in"])
+        self.records = {key: record for key, record in self.records.items() if record[3]["parent_id"] not in parents}
+
+
+def _engine(batch_size=4, write_batch_size=3, cache=None):
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.embedding_model = _CountingModel()
+    engine.embedding_cache = cache or EmbeddingCache("test-model", enabled=False)
+    engine.embedding_batch_size = batch_size
+    engine.write_batch_size = write_batch_size
+    engine.chroma_client = None
+    engine.fetch_batch_size = 500
+    engine.chunking_enabled = False
+    engine.chunk_max_words = 160
+    engine.stats_cache_seconds = 30
+    engine.vector_index_enabled = False
+    engine.resume_collection = _RecordingCollection()
+    engine.internship_collection = _RecordingCollection()
+    engine.resume_chunk_collection = _RecordingCollection()
+    engine.internship_chunk_collection = _RecordingCollection()
+    return engine
+
+
+def test_generate_embeddings_batches_by_length_and_keeps_order():
+    engine = _engine()
+    texts = ["x" * n for n in (5, 1, 9, 3, 7, 2, 8, 4, 6, 10)]
+
+    batched = engine.generate_embeddings(texts)
+    calls = list(engine.embedding_model.calls)
+
+    assert batched == [engine.generate_embedding(text) for text in texts]
+    assert [len(call) for call in calls] == [4, 4, 2]
+    assert [len(t) for t in calls[0]] == [10, 9, 8, 7]
+
+
+def test_store_resume_embeddings_writes_in_bulk_and_reuses_precomputed_vectors():
+    engine = _engine()
+    batch = [
+        {"resume_id": str(i), "content": f"resume {i}", "skills": ["Python"], "metadata": {"student_id": i}}
+        for i in range(7)
+    ]
+    batch[0]["embedding"] = [0.5, 0.5]
+
+    ids = engine.store_resume_embeddings(batch)
+
+    assert ids == [f"resume_{i}" for i in range(7)]
+    assert engine.resume_collection.writes == [3, 3, 1]
+    assert sum(len(call) for call in engine.embedding_model.calls) == 6
+    _, embedding, document, meta = engine.resume_collection.records["resume_0"]
+    assert embedding == [0.5, 0.5]
+    assert document == "resume 0\n\nSkills: Python"
+    assert meta == {"student_id": 0, "resume_id": "0", "skills": "Python", "num_skills": 1}
+
+    calls = len(engine.embedding_model.calls)
+    assert engine.store_resume_embedding("9", "resume 9", [], embedding=[1.0, 1.0]) == "resume_9"
+    assert len(engine.embedding_model.calls) == calls
+
+
+def test_cached_text_is_encoded_once(tmp_path):
+    engine = _engine(cache=EmbeddingCache("test-model", path=str(tmp_path / "cache.db")))
+
+    first = engine.generate_embedding("same text")
+    batched = engine.generate_embeddings(["same text", "other", "other"])
+
+    assert batched[0] == first
+    assert engine.embedding_model.calls == [["same text"], ["other"]]
+    stats = engine.embedding_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+
+def test_chunk_document_splits_on_sections_within_word_budget():
+    text = "JOHN DOE\nEXPERIENCE\n" + "built things " * 30 + "\n\nEducation:\nBSc CS\n\n" + "word " * 25
+    chunks = chunk_document(text, max_words=20)
+
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+    assert any(chunk.startswith("Education:") for chunk in chunks)
+
+
+def test_chunked_mode_stores_pooled_vector_and_replaces_chunks():
+    engine = _engine()
+    engine.chunking_enabled = True
+    engine.chunk_max_words = 5
+    content = "Summary\none two three four\n\nProjects\nfive six seven eight"
+
+    engine.store_resume_embedding("1", content, ["Python"])
+    chunk_records = engine.resume_chunk_collection.records
+    assert sorted(chunk_records) == ["resume_1#0", "resume_1#1", "resume_1#2"]
+    _, pooled, _, _ = engine.resume_collection.records["resume_1"]
+    assert pooled == engine.document_embedding(engine.resume_embedding_text(content, ["Python"]))
+    assert np.isclose(np.linalg.norm(pooled), 1.0)
+
+    engine.store_resume_embedding("1", "short", [])
+    assert sorted(engine.resume_chunk_collection.records) == ["resume_1#0"]
+
+
+def test_model_loads_lazily_once_across_threads(monkeypatch, tmp_path):
+    from app.services import rag_engine as rag_engine_module
+
+    created = []
+
+    def fake_backend(model_name):
+        created.append(model_name)
+        model = _CountingModel()
+        model.name = "fake"
+        model.cache_namespace = model_name
+        return model
+
+    monkeypatch.setattr(rag_engine_module, "create_embedding_backend", fake_backend)
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "cache.db"))
+    engine = RAGEngine()
+    assert created == [] and not engine.is_ready
+
+    threads = [threading.Thread(target=engine.generate_embedding, args=(f"text {i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert created == ["all-MiniLM-L6-v2"]
+    assert "chroma_client" not in engine.__dict__
+
+
+class _SearchCollection:
+    """Collection that fails on full scans and counts count() calls"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.counts = 0
+
+    def count(self):
+        self.counts += 1
+        return len(self.vectors)
+
+    def get(self, ids=None, include=None, **kwargs):
+        assert ids, "full collection scan"
+        found = [key for key in ids if key in self.vectors]
+        return {"ids": found, "embeddings": [self.vectors[key] for key in found]}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.vectors.update(zip(ids, embeddings))
+
+    def delete(self, ids=None, where=None):
+        for key in ids or []:
+            self.vectors.pop(key, None)
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        ids = sorted(self.vectors)[:n_results]
+        return {
+            "ids": [ids],
+            "metadatas": [[{"internship_id": key.split("_")[1], "title": key} for key in ids]],
+            "distances": [[0.1 * (rank + 1) for rank in range(len(ids))]]
+        }
+
+
+def test_find_matching_internships_never_scans_collections():
+    engine = _engine()
+    engine.resume_collection = _SearchCollection({"resume_1": [1.0, 0.0]})
+    engine.internship_collection = _SearchCollection({f"internship_{i}": [0.0, 1.0] for i in range(50)})
+
+    first = engine.find_matching_internships("1", top_k=5)
+    second = engine.find_matching_internships("1", top_k=5)
+
+    assert len(first) == 5 and first == second
+    assert engine.internship_collection.counts == 1
+
+    engine.store_internship_embedding("99", "Backend intern", "APIs", ["Python"], embedding=[0.0, 1.0])
+    engine.find_matching_internships("1", top_k=5)
+    assert engine.internship_collection.counts == 2
+
+
+def test_vector_index_serves_queries_and_mirrors_writes():
+    from app.services.vector_index import VectorIndex
+
+    engine = _engine()
+    engine.vector_index_enabled = True
+    engine._init_lock = threading.RLock()
+    engine.resume_collection = _SearchCollection({"resume_1": [1.0, 0.0]})
+    engine.internship_collection = _SearchCollection({f"internship_{i}": [0.0, 1.0] for i in range(5)})
+    engine.resume_index = VectorIndex.from_collection(_PagedCollection("resumes", engine.resume_collection))
+    engine.internship_index = VectorIndex.from_collection(_PagedCollection("internships", engine.internship_collection))
+    engine.internship_collection.query = None  # ChromaDB must not be queried
+
+    engine.store_internship_embedding("9", "Backend intern", "APIs", ["Python"], embedding=[1.0, 0.0])
+    matches = engine.find_matching_internships("1", top_k=3)
+    assert matches[0]["internship_id"] == "9"
+
+    engine.delete_internship_embedding("9")
+    assert "internship_9" not in engine.internship_index
+    assert len(engine.find_matching_internships("1", top_k=10)) == 5
+
+
+class _PagedCollection:
+    """Read-only paginated view used to seed a VectorIndex from a _SearchCollection"""
+
+    def __init__(self, name, collection):
+        self.name = name
+        self.collection = collection
+
+    def get(self, limit, offset, include):
+        ids = sorted(self.collection.vectors)[offset:offset + limit]
+        return {
+            "ids": ids,
+            "embeddings": [self.collection.vectors[key] for key in ids],
+            "metadatas": [{"internship_id": key.split("_")[1]} for key in ids]
+        }
+
+
+def _resume(**fields):
+    from app.models.resume import Resume
+
+    return Resume(**{"student_id": 3, "file_name": "cv.pdf", **fields})
+
+
+def test_resume_metadata_matches_resume_filter():
+    from app.services.vector_index import compile_where
+
+    base = RAGEngine.resume_metadata(_resume(parsed_data={
+        "personal_info": {"location": " Pune, India "}, "total_experience_years": 2.5
+    }))
+    tailored = RAGEngine.resume_metadata(_resume(is_tailored=True, is_active=0, tailored_for_internship_id=8,
+                                                 parsed_data={"total_experience_years": "2-3 years"}))
+
+    assert base == {"student_id": 3, "file_name": "cv.pdf", "is_tailored": 0, "is_active": 1,
+                    "location": "pune, india", "experience_years": 2.5}
+    assert tailored["internship_id"] == 8 and "location" not in tailored
+    assert tailored["experience_years"] == 0.0
+
+    where = RAGEngine.resume_filter(is_active=True, location="Pune, India", min_experience=2)
+    assert compile_where(where)(base) and not compile_where(where)(tailored)
+    assert RAGEngine.resume_filter() is None
+    assert RAGEngine.resume_filter(internship_id=8) == {"internship_id": 8}
+
+
+def test_candidate_search_filters_inside_vector_index():
+    from app.services.vector_index import VectorIndex
+
+    engine = _engine()
+    engine.vector_index_enabled = True
+    engine._init_lock = threading.RLock()
+    engine.internship_index = VectorIndex("internships")
+    engine.internship_index.upsert(["internship_1"], [[1.0, 0.0]], [{"internship_id": "1"}])
+    engine.resume_index = VectorIndex("resumes")
+    engine.resume_index.upsert(
+        [f"resume_{i}" for i in range(30)],
+        [[1.0, i / 30] for i in range(30)],
+        [{"resume_id": str(i), "is_active": int(i % 3 == 0)} for i in range(30)]
+    )
+    engine.resume_collection = _MetadataCollection()
+    engine.resume_chunk_collection = _MetadataCollection()
+
+    matches = engine.find_matching_candidates("1", top_k=4, where=RAGEngine.resume_filter(is_active=True))
+    assert [m["resume_id"] for m in matches] == ["0", "3", "6", "9"]
+
+    assert engine.update_resume_metadata({"0": {"is_active": 0}, "1": {"is_active": 1}})
+    assert engine.resume_collection.updates == [(["resume_0", "resume_1"], [{"is_active": 0}, {"is_active": 1}])]
+    matches = engine.find_matching_candidates("1", top_k=4, where=RAGEngine.resume_filter(is_active=True))
+    assert [m["resume_id"] for m in matches] == ["1", "3", "6", "9"]
+
+
+class _MetadataCollection:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, ids, metadatas):
+        self.updates.append((ids, metadatas))
+
+    def get(self, where, include):
+        return {"ids": [], "metadatas": []}
@@ -0,0 +1,64 @@
+"""
+Resume skill normalization tests - Typed columns and resume_skills follow parsed_data
+"""
+
+from app.models.user import User, UserRole
+from app.models.resume import Resume
+from app.models.skill import Skill, ResumeSkill
+
+
+def _student(db):
+    student = User(email="s@uni.test", hashed_password="x", full_name="Student", role=UserRole.student)
+    db.add(student)
+    db.flush()
+    return student
+
+
+def test_parsed_data_writes_sync_skills_and_typed_columns(db_session):
+    student = _student(db_session)
+    first = Resume(student_id=student.id, file_path="/tmp/a.pdf", file_name="a.pdf", parsed_data={
+        'all_skills': ['Python', ' python', 'SQL'], 'total_experience_years': 1.5,
+        'education': [{'degree': 'Master of Science'}, {'degree': 'Bachelor of Arts'}]
+    })
+    second = Resume(student_id=student.id, file_path="/tmp/b.pdf", file_name="b.pdf",
+                    parsed_data={'all_skills': ['SQL', 'Docker']})
+    db_session.add_all([first, second])
+    db_session.commit()
+
+    assert (first.experience_years, first.education_level) == (1.5, 2)
+    assert (second.experience_years, second.education_level) == (0.0, 0)
+    assert [s.name for s in first.skills] == ['python', 'sql']
+    assert db_session.query(Skill).count() == 3  # 'sql' is shared
+
+    first.parsed_data = {'all_skills': ['Go'], 'total_experience_years': 'n/a', 'education': [{'degree': 'PhD'}]}
+    db_session.commit()
+
+    assert (first.experience_years, first.education_level) == (0.0, 3)
+    links = db_session.query(Skill.name).join(ResumeSkill).filter(ResumeSkill.resume_id == first.id).all()
+    assert [name for name, in links] == ['go']
+    assert db_session.query(ResumeSkill).count() == 3
+
+
+def test_concurrently_inserted_skill_is_reused(db_session, monkeypatch):
+    """A skill another upload inserted after our lookup does not fail the flush"""
+    from app.models import skill as skill_module
+
+    student = _student(db_session)
+    db_session.add(Skill(name="rust"))
+    db_session.commit()
+
+    load_skills = skill_module._load_skills
+    calls = []
+
+    def lookup_before_other_commit(session, names):
+        calls.append(list(names))
+        return {} if len(calls) == 1 else load_skills(session, names)
+
+    monkeypatch.setattr(skill_module, "_load_skills", lookup_before_other_commit)
+    resume = Resume(student_id=student.id, file_path="/tmp/r.pdf", file_name="r.pdf",
+                    parsed_data={'all_skills': ['Rust', 'Zig']})
+    db_session.add(resume)
+    db_session.commit()
+
+    assert [s.name for s in resume.skills] == ['rust', 'zig']
+    assert db_session.query(Skill).count() == 2
@@ -0,0 +1,53 @@
+"""
+Skill index tests - Batch relations agree with the substring matching rule
+"""
+
+import random
+
+from app.services.skill_index import SkillIndex
+
+
+SKILLS = ['Python', 'java', 'JavaScript', 'React', 'react native', 'SQL', 'NoSQL', 'C', 'c++', ' AWS ', 'aws lambda', '']
+
+
+def _substring_count(candidate_skills, required_skills):
+    candidates = [s.lower().strip() for s in candidate_skills]
+    return sum(
+        1 for skill in (s.lower().strip() for s in required_skills)
+        if any(skill in cand or cand in skill for cand in candidates)
+    )
+
+
+def test_skill_index_matches_substring_rule():
+    """Satisfied requirements (including duplicates) equal the nested substring scan"""
+    rng = random.Random(7)
+    index = SkillIndex()
+    for _ in range(300):
+        candidate_skills = rng.sample(SKILLS, rng.randint(0, 5))
+        required_skills = [rng.choice(SKILLS) for _ in range(rng.randint(0, 5))]
+
+        required_ids = index.encode(required_skills)
+        satisfied = index.satisfied(index.encode(candidate_skills), required_ids)
+        assert int(satisfied.sum()) == _substring_count(candidate_skills, required_skills)
+
+    candidate_ids = index.encode(SKILLS)
+    relation = index.relation_matrix(candidate_ids, candidate_ids)
+    for row, cand in enumerate(SKILLS):
+        for col, req in enumerate(SKILLS):
+            assert relation[row, col] == _substring_count([cand], [req])
+
+
+def test_skill_index_aliases_share_an_id():
+    index = SkillIndex(aliases={'JS': 'javascript'})
+    assert index.skill_id(' js ') == index.skill_id('JavaScript')
+
+
+def test_skill_index_is_bounded_by_its_batch():
+    """Assigning IDs does no pairwise work and each index only holds its own skills"""
+    index = SkillIndex()
+    index.encode(f"skill {i}" for i in range(5000))
+    assert len(index) == 5000
+    assert len(SkillIndex()) == 0
+
+    relation = index.relation_matrix(index.encode(["skill 12", "skill 1"]), index.encode(["skill 1"]))
+    assert relation[:, 0].tolist() == [1, 1]
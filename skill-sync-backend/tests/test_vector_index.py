@@ -0,0 +1,115 @@
+"""
+Vector index tests - Exact top-k, incremental updates, snapshots and ChromaDB parity
+"""
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex, compile_where
+
+
+def _vectors(count, dimension=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+
+def _brute_force(vectors, ids, query, top_k):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    order = np.argsort(distances, kind="stable")[:top_k]
+    return [ids[row] for row in order], distances[order]
+
+
+def test_query_matches_brute_force_after_incremental_updates():
+    vectors = _vectors(300)
+    ids = [f"doc_{i}" for i in range(300)]
+    index = VectorIndex("docs")
+    index.upsert(ids[:200], vectors[:200], [{"n": i} for i in range(200)])
+    index.upsert(ids[200:], vectors[200:], [{"n": i} for i in range(200, 300)])
+    index.delete(ids[:50] + ["missing"])
+    vectors[100] = -vectors[100]
+    index.upsert([ids[100]], vectors[100:101], [{"n": -100}])
+
+    query = _vectors(1, seed=1)[0]
+    result = index.query(query, top_k=10)
+    expected_ids, expected_distances = _brute_force(vectors[50:], ids[50:], query, 10)
+
+    assert len(index) == 250 and "doc_0" not in index
+    assert result['ids'][0] == expected_ids
+    np.testing.assert_allclose(result['distances'][0], expected_distances, rtol=1e-4)
+    assert all(meta["n"] == int(doc.split("_")[1]) or meta["n"] == -100
+               for doc, meta in zip(result['ids'][0], result['metadatas'][0]))
+    assert len(index.query(query, top_k=1000)['ids'][0]) == 250
+
+
+def test_where_filters_follow_chromadb_semantics():
+    match = compile_where({"$or": [
+        {"is_active": 1},
+        {"$and": [{"location": {"$in": ["remote", "pune"]}}, {"experience_years": {"$gte": 2}}]}
+    ]})
+
+    assert match({"is_active": 1})
+    assert not match({"is_active": True})  # bools never equal ints
+    assert match({"is_active": 0, "location": "pune", "experience_years": 2.5})
+    assert not match({"is_active": 0, "location": "pune"})
+    assert compile_where({"student_id": {"$ne": 7}})({})  # missing fields match $ne
+    assert not compile_where({"student_id": {"$gt": 7}})({"student_id": "9"})
+    with pytest.raises(ValueError):
+        compile_where({"location": {"$like": "p%"}})
+
+
+def test_filtered_query_returns_top_k_matching_documents():
+    vectors = _vectors(200)
+    ids = [f"resume_{i}" for i in range(200)]
+    index = VectorIndex("resumes")
+    index.upsert(ids, vectors, [{"is_active": int(i % 10 == 0)} for i in range(200)])
+    query = _vectors(1, seed=3)[0]
+
+    result = index.query(query, top_k=5, where={"is_active": 1})
+    expected_ids, _ = _brute_force(vectors[::10], ids[::10], query, 5)
+    assert result['ids'][0] == expected_ids
+
+    index.update_metadata({"resume_0": {"is_active": 0}, "unknown": {"is_active": 1}})
+    assert len(index.query(query, top_k=50, where={"is_active": 1})['ids'][0]) == 19
+    assert index.query(query, top_k=5, where={"is_active": 2})['ids'] == [[]]
+
+
+def test_snapshot_round_trip_is_memory_mapped_and_stays_writable(tmp_path):
+    vectors = _vectors(20)
+    index = VectorIndex("docs")
+    index.upsert([f"doc_{i}" for i in range(20)], vectors, [{"n": i} for i in range(20)])
+    index.save(str(tmp_path))
+
+    loaded = VectorIndex.load("docs", str(tmp_path))
+    assert isinstance(loaded._matrix, np.memmap)
+    assert loaded.query(vectors[3], top_k=1)['ids'][0] == ["doc_3"]
+
+    loaded.delete(["doc_3"])
+    loaded.upsert(["doc_new"], vectors[3:4], [{"n": 99}])
+    assert loaded.query(vectors[3], top_k=1)['ids'][0] == ["doc_new"]
+    assert VectorIndex.load("docs", str(tmp_path)).query(vectors[3], top_k=1)['ids'][0] == ["doc_3"]
+    assert VectorIndex.load("other", str(tmp_path)) is None
+
+
+def test_index_agrees_with_chromadb_and_rebuilds_stale_snapshot(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    client = chromadb.EphemeralClient()
+    collection = client.get_or_create_collection(name="vector_index_parity")
+    vectors = _vectors(120, dimension=16)
+    ids = [f"doc_{i}" for i in range(120)]
+    collection.upsert(ids=ids[:100], embeddings=vectors[:100].tolist(), metadatas=[{"n": i} for i in range(100)])
+
+    index = VectorIndex.open(collection, str(tmp_path), batch_size=30)
+    query = _vectors(1, dimension=16, seed=2)[0]
+    expected = collection.query(query_embeddings=[query.tolist()], n_results=5, include=["metadatas", "distances"])
+    result = index.query(query, top_k=5)
+
+    assert result['ids'] == expected['ids']
+    assert result['metadatas'] == expected['metadatas']
+    np.testing.assert_allclose(result['distances'][0], expected['distances'][0], rtol=1e-3)
+
+    where = {"$and": [{"n": {"$gte": 20}}, {"n": {"$nin": [21, 22]}}]}
+    expected = collection.query(query_embeddings=[query.tolist()], n_results=5, where=where, include=["metadatas"])
+    assert index.query(query, top_k=5, where=where)['ids'] == expected['ids']
+
+    # Another process adds records: the saved snapshot no longer matches the collection
+    collection.upsert(ids=ids[100:], embeddings=vectors[100:].tolist(), metadatas=[{"n": i} for i in range(100, 120)])
+    assert len(VectorIndex.open(collection, str(tmp_path), batch_size=30)) == 120
@@ -0,0 +1,107 @@
+"""
+Vectorized matching engine tests - Parity with per-pair MatchingEngine scoring
+"""
+
+import random
+import numpy as np
+import pytest
+
+from app.services.matching_engine import MatchingEngine
+from app.services.vectorized_matching_engine import VectorizedMatchingEngine
+
+
+SKILLS = ['Python', 'java', 'JavaScript', 'React', 'SQL', 'machine learning', 'ML', 'C', 'c++', ' AWS ', 'aws lambda']
+DEGREES = ['B.Tech (Bachelor)', 'Master of Science', 'PhD', 'Diploma', 'High School']
+
+
+def _random_candidate(rng):
+    return {
+        'all_skills': rng.sample(SKILLS, rng.randint(0, 6)),
+        'total_experience_years': rng.choice([0, 0.5, 1, 1.7, 2.5, 4, 12]),
+        'education': [{'degree': rng.choice(DEGREES)} for _ in range(rng.randint(0, 2))],
+        'projects': [{}] * rng.randint(0, 6),
+        'certifications': [{}] * rng.randint(0, 5)
+    }
+
+
+def _random_internship(rng):
+    return {
+        'required_skills': rng.sample(SKILLS, rng.randint(0, 4)),
+        'preferred_skills': rng.sample(SKILLS, rng.randint(0, 3)),
+        'min_experience': rng.choice([0, 1, 2, 3]),
+        'max_experience': rng.choice([1, 3, 10]),
+        'required_education': rng.choice(['', "Bachelor's in CS", 'Masters', 'PhD'])
+    }
+
+
+def test_vectorized_scores_match_matching_engine():
+    """Block scores should equal MatchingEngine.calculate_match_score pair by pair"""
+    rng = random.Random(42)
+    np_rng = np.random.default_rng(42)
+    candidates = [_random_candidate(rng) for _ in range(25)]
+    internships = [_random_internship(rng) for _ in range(15)]
+    candidate_embeddings = [np_rng.standard_normal(16).tolist() for _ in candidates]
+    internship_embeddings = [np_rng.standard_normal(16).tolist() for _ in internships]
+
+    matching_engine = MatchingEngine(rag_engine=None)
+    engine = VectorizedMatchingEngine(matching_engine)
+    candidate_features, internship_features = engine.build_features(candidates, internships)
+    candidate_matrix, candidate_valid = engine.build_embedding_matrix(candidate_embeddings)
+    internship_matrix, internship_valid = engine.build_embedding_matrix(internship_embeddings)
+
+    scores = engine.score_block(
+        candidate_features, candidate_matrix, candidate_valid,
+        internship_features, internship_matrix, internship_valid
+    )
+
+    for i, candidate in enumerate(candidates):
+        for j, internship in enumerate(internships):
+            expected = matching_engine.calculate_match_score(
+                candidate, internship, candidate_embeddings[i], internship_embeddings[j]
+            )
+            for key in ['skills_match', 'experience_match', 'education_match', 'projects_certifications']:
+                assert round(float(scores[key][i, j]), 2) == expected['component_scores'][key]
+            # Semantic block is computed in float32
+            assert float(scores['semantic_similarity'][i, j]) == pytest.approx(
+                expected['component_scores']['semantic_similarity'], abs=0.01
+            )
+            assert float(scores['overall_score'][i, j]) == pytest.approx(expected['overall_score'], abs=0.01)
+
+
+def test_missing_embeddings_are_marked_invalid():
+    """Pairs without usable embeddings are excluded, as MatchingEngine raises for them"""
+    engine = VectorizedMatchingEngine(MatchingEngine(rag_engine=None))
+    matrix, valid = engine.build_embedding_matrix([[1.0, 0.0], None, [0.0, 0.0]])
+
+    assert matrix.dtype == np.float32
+    assert valid.tolist() == [True, False, False]
+
+
+def test_pair_scoring_matches_block_scoring():
+    """Scoring an explicit pair list (two-stage mode) gives the same values as the dense block"""
+    rng = random.Random(3)
+    np_rng = np.random.default_rng(3)
+    candidates = [_random_candidate(rng) for _ in range(12)]
+    internships = [_random_internship(rng) for _ in range(9)]
+
+    engine = VectorizedMatchingEngine(MatchingEngine(rag_engine=None))
+    c_features, i_features = engine.build_features(candidates, internships)
+    c_matrix, c_valid = engine.normalize_embedding_matrix(np_rng.normal(size=(12, 8)).astype(np.float32))
+    i_matrix, i_valid = engine.normalize_embedding_matrix(np_rng.normal(size=(9, 8)).astype(np.float32))
+
+    block = engine.score_block(c_features, c_matrix, c_valid, i_features, i_matrix, i_valid)
+    rows, cols = np.nonzero(np_rng.random((12, 9)) > 0.5)
+    pairs = engine.score_block(c_features, c_matrix, c_valid, i_features, i_matrix, i_valid, rows=rows, cols=cols)
+    for key in ['overall_score', 'semantic_similarity', 'skills_match', 'experience_match', 'education_match']:
+        np.testing.assert_allclose(pairs[key], block[key][rows, cols], atol=1e-4)
+
+    shortlist = engine.nearest_internships(c_matrix, i_matrix, i_valid, 3)
+    assert (shortlist.sum(axis=1) == 3).all()
+    selected = engine.score_selected(
+        c_features, c_matrix, c_valid, i_features, i_matrix, i_valid,
+        pairs=np.ones((12, 9), dtype=bool), ann_candidates=3
+    )
+    assert len(selected['rows']) == 36
+    np.testing.assert_allclose(
+        selected['overall_score'], block['overall_score'][selected['rows'], selected['cols']], atol=1e-4
+    )